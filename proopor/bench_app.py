@@ -0,0 +1,91 @@
+"""
+Tempo de abertura e de rerun de cada aba do app.py.
+
+Cada aba é medida em um processo novo (AppTest do Streamlit, sem navegador):
+- partida: primeira execução do script (sempre abre no Dashboard);
+- 1ª visita: troca para a aba, incluindo as importações feitas só por ela;
+- rerun: mediana de novas execuções na mesma aba (o que o usuário sente a
+  cada mudança de widget).
+Também lista quais bibliotecas pesadas ficaram carregadas depois da visita.
+
+    python bench_app.py
+    python bench_app.py --reruns 10 --abas "Dashboard" "Folha de Pagamento"
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+ABAS = ["Dashboard", "Folha de Pagamento", "Lançamentos Contábeis", "Sobre / Export"]
+MODULOS_PESADOS = ["reportlab", "pypdf", "openpyxl", "holerite_pdf", "exportacao_xlsx"]
+
+
+def medir_aba(aba, reruns):
+    """Mede uma aba neste processo; retorna dicionário com os tempos em ms."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=120)
+    inicio = time.perf_counter()
+    at.run()
+    partida = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    at.sidebar.radio[0].set_value(aba).run()
+    visita = time.perf_counter() - inicio
+    tempos = []
+    for _ in range(reruns):
+        inicio = time.perf_counter()
+        at.run()
+        tempos.append(time.perf_counter() - inicio)
+    return {
+        "aba": aba,
+        "partida_ms": partida * 1000,
+        "visita_ms": visita * 1000,
+        "rerun_ms": statistics.median(tempos) * 1000 if tempos else None,
+        "erros": [str(e.value) for e in at.exception],
+        "carregados": [m for m in MODULOS_PESADOS if m in sys.modules],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--abas", nargs="+", default=ABAS)
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="saída em JSON")
+    parser.add_argument("--uma-aba", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.uma_aba:
+        print(json.dumps(medir_aba(args.uma_aba, args.reruns)))
+        return
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # livro de lançamentos descartável, para não tocar no banco do usuário
+        env = dict(os.environ, EFICICASH_DB=os.path.join(tmp, "bench.db"))
+        for aba in args.abas:
+            saida = subprocess.run(
+                [sys.executable, __file__, "--uma-aba", aba, "--reruns", str(args.reruns)],
+                capture_output=True, text=True, env=env, check=True,
+            )
+            resultados.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(resultados, indent=2, ensure_ascii=False))
+        return
+    print(f"{'Aba':<24}{'partida':>10}{'1ª visita':>11}{'rerun':>9}  carregados")
+    for r in resultados:
+        print(
+            f"{r['aba']:<24}{r['partida_ms']:>8.0f}ms{r['visita_ms']:>9.0f}ms{r['rerun_ms']:>7.0f}ms"
+            f"  {', '.join(r['carregados']) or '-'}"
+        )
+        for erro in r["erros"]:
+            print(f"    erro: {erro}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Benchmarks de desempenho com dados sintéticos em várias escalas.
+
+Cobre a folha (calc_holerite por funcionário, calcular_folha_lote e
+projetar_ano), o pipeline do financial-management-system (load_data,
+clean_data, normalize_data, build_cashflow, compute_metrics) e as
+exportações CSV, XLSX e PDF. Cada caso roda em cada tamanho (padrão: 1 mil, 100 mil e 1 milhão de
+linhas) e registra o tempo (execução sem rastreamento) e o pico de memória
+de uma segunda execução, feita num processo filho (fork): o aumento do
+ru_maxrss do filho e dos processos que ele cria (pool do PDF), o que inclui a
+memória alocada fora do Python. Sem fork/resource (Windows) o pico vem do
+tracemalloc, só do processo principal.
+
+Com --salvar os resultados viram a linha de base (JSON); com --comparar a
+execução falha (código 1) se algum caso ficar mais lento ou usar mais
+memória que a linha de base além do limite (--limite, padrão 20%).
+
+    python bench_suite.py --salvar bench_baseline.json
+    python bench_suite.py --comparar bench_baseline.json --limite 0.15
+    python bench_suite.py --tamanhos 1000 100000 --casos folha_lote build_cashflow
+
+Casos caros demais em escala total (holerite escalar, XLSX, PDF) têm um
+tamanho máximo; --todos ignora esse limite.
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import traceback
+import tracemalloc
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(AQUI, "financial-management-system", "src"))
+
+from dados_sinteticos import gerar_dataframe  # noqa: E402
+from faixas import FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO, compilar_faixas  # noqa: E402
+
+TAMANHOS = [1_000, 100_000, 1_000_000]
+LIMITE_PADRAO = 0.20
+# diferenças menores que isto (tempo) são ruído de medição e nunca contam como regressão
+FOLGA_SEGUNDOS = 0.005
+FOLGA_MB = 1.0
+# pico de memória pelo ru_maxrss de um processo filho (fork); senão, tracemalloc
+MEMORIA_RSS = resource is not None and "fork" in multiprocessing.get_all_start_methods()
+PARAMETROS_FOLHA = (189.59, 8.0, 20.0)  # dedução por dependente, FGTS %, INSS patronal %
+
+
+# ---------------- Dados sintéticos (dados_sinteticos.py) ----------------
+def roster_sintetico(n, semente=0):
+    return gerar_dataframe("roster", n, semente)
+
+
+def transacoes_sinteticas(n, semente=0):
+    """Extrato com as colunas Income/Expenses usadas por compute_metrics."""
+    return gerar_dataframe("transacoes", n, semente, perfil={"colunas_receita_despesa": True})
+
+
+def lancamentos_sinteticos(n, semente=0):
+    return gerar_dataframe("lancamentos", n, semente)
+
+
+# ---------------- Casos ----------------
+# cada caso: preparar(n, pasta) -> contexto (fora da medição) e executar(contexto)
+def _folha_escalar_preparar(n, pasta):
+    from folha_lote import CAMPOS_FOLHA
+
+    registros = roster_sintetico(n).to_dict("records")
+    padrao = {k: (None if v is None or (isinstance(v, float) and np.isnan(v)) else v) for k, v in CAMPOS_FOLHA.items()}
+    entradas = []
+    for r in registros:
+        inputs = dict(padrao, **{k: v for k, v in r.items() if k in CAMPOS_FOLHA})
+        # o formulário informa só uma forma de vale-transporte; NaN vira None como nos campos vazios
+        for campo in ("vale_transporte_percent", "vale_transporte_valor", "valor_hora"):
+            if inputs[campo] is not None and np.isnan(inputs[campo]):
+                inputs[campo] = None
+        entradas.append(inputs)
+    return entradas, compilar_faixas(FAIXAS_INSS_PADRAO), compilar_faixas(FAIXAS_IRRF_PADRAO)
+
+
+def _folha_escalar(ctx):
+    from folha import calc_holerite
+
+    entradas, inss, irrf = ctx
+    for inputs in entradas:
+        calc_holerite(inputs, inss, irrf, *PARAMETROS_FOLHA)
+
+
+def _folha_lote(ctx):
+    from folha_lote import calcular_folha_lote
+
+    calcular_folha_lote(ctx, FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO, *PARAMETROS_FOLHA)
+
+
+def _projecao_anual(ctx):
+    from projecao_anual import projetar_ano
+
+    projetar_ano(ctx, *PARAMETROS_FOLHA[1:], reajustes={5: 6.0})
+
+
+def _csv_transacoes(n, pasta):
+    caminho = os.path.join(pasta, f"transacoes_{n}.csv")
+    if not os.path.exists(caminho):
+        transacoes_sinteticas(n).to_csv(caminho, index=False)
+    return caminho
+
+
+def _load_data(caminho):
+    from data.input import load_data
+
+    load_data(caminho, use_cache=False)
+
+
+def _carregado(n, pasta):
+    from data.input import load_data
+
+    return load_data(_csv_transacoes(n, pasta), use_cache=False)
+
+
+def _clean_data(df):
+    from data.input import clean_data
+
+    clean_data(df)
+
+
+def _normalize_data(df):
+    from data.input import normalize_data
+
+    normalize_data(df.copy())
+
+
+def _build_cashflow(df):
+    from processing.financial_processing import build_cashflow
+
+    build_cashflow(df)
+
+
+def _compute_metrics(df):
+    from analysis.metrics import compute_metrics
+
+    compute_metrics(df)
+
+
+def _resultado_folha(n, pasta):
+    """Folha consolidada como a aba Folha (lote) a produz: identificação + salário base + resultado."""
+    from folha_lote import processar_roster
+
+    resultado, _ = processar_roster([roster_sintetico(n)], FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO, *PARAMETROS_FOLHA)
+    return resultado, pasta
+
+
+def _exportar_csv(ctx):
+    resultado, pasta = ctx
+    resultado.to_csv(os.path.join(pasta, "folha.csv"), index=False, sep=";", encoding="utf-8")
+
+
+def _exportar_xlsx(ctx):
+    from exportacao_xlsx import exportar_lancamentos_xlsx
+
+    df, pasta = ctx
+    exportar_lancamentos_xlsx(df, os.path.join(pasta, "lancamentos.xlsx"))
+
+
+def _exportar_pdf(ctx):
+    from holerite_pdf import gerar_holerites_lote
+
+    resultado, pasta = ctx
+    gerar_holerites_lote(resultado, os.path.join(pasta, "holerites.pdf"), formato="pdf")
+
+
+# nome -> (preparar, executar, tamanho máximo sem --todos)
+CASOS = {
+    "folha_escalar": (_folha_escalar_preparar, _folha_escalar, 100_000),
+    "folha_lote": (lambda n, pasta: roster_sintetico(n), _folha_lote, None),
+    "projecao_anual": (lambda n, pasta: roster_sintetico(n), _projecao_anual, None),
+    "load_data": (_csv_transacoes, _load_data, None),
+    "clean_data": (_carregado, _clean_data, None),
+    "normalize_data": (_carregado, _normalize_data, None),
+    "build_cashflow": (_carregado, _build_cashflow, None),
+    "compute_metrics": (_carregado, _compute_metrics, None),
+    "exportar_csv": (_resultado_folha, _exportar_csv, None),
+    "exportar_xlsx": (lambda n, pasta: (lancamentos_sinteticos(n), pasta), _exportar_xlsx, 100_000),
+    "exportar_pdf": (_resultado_folha, _exportar_pdf, 1_000),
+}
+
+
+def _maxrss_mb(quem):
+    pico = resource.getrusage(quem).ru_maxrss
+    # ru_maxrss: KiB no Linux, bytes no macOS
+    return pico / 2 ** 20 if sys.platform == "darwin" else pico / 1024
+
+
+def _executar_no_filho(executar, ctx, fila):
+    """Processo filho de _pico_rss: o ru_maxrss de um filho recém-criado parte do RSS atual (não do pico do pai)."""
+    try:
+        base = _maxrss_mb(resource.RUSAGE_SELF)
+        executar(ctx)
+        # RUSAGE_CHILDREN: processos do pool já encerrados (criados por fork, partem do RSS deste)
+        pico = max(_maxrss_mb(resource.RUSAGE_SELF), _maxrss_mb(resource.RUSAGE_CHILDREN))
+        fila.put((max(0.0, pico - base), None))
+    except BaseException:
+        fila.put((None, traceback.format_exc()))
+
+
+def _pico_rss(executar, ctx):
+    """Aumento do pico de memória residente (MB) de `executar(ctx)` num processo filho."""
+    contexto = multiprocessing.get_context("fork")
+    fila = contexto.Queue()
+    filho = contexto.Process(target=_executar_no_filho, args=(executar, ctx, fila))
+    filho.start()
+    try:
+        pico, erro = fila.get()
+    finally:
+        filho.join()
+    if erro is not None:
+        raise RuntimeError(f"falha no processo de medição de memória:\n{erro}")
+    return pico
+
+
+def _pico_tracemalloc(executar, ctx):
+    tracemalloc.start()
+    try:
+        executar(ctx)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico / 2 ** 20
+
+
+def medir(executar, ctx, repeticoes=1):
+    """
+    Menor tempo (s) entre `repeticoes` execuções e pico de memória (MB) de outra
+    (ver o início do módulo); "memoria" diz como o pico foi medido.
+    """
+    segundos = float("inf")
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        executar(ctx)
+        segundos = min(segundos, time.perf_counter() - inicio)
+    gc.collect()
+    if MEMORIA_RSS:
+        return {"segundos": segundos, "pico_mb": _pico_rss(executar, ctx), "memoria": "rss"}
+    return {"segundos": segundos, "pico_mb": _pico_tracemalloc(executar, ctx), "memoria": "tracemalloc"}
+
+
+def rodar(casos, tamanhos, todos=False, repeticoes=1, saida=sys.stdout):
+    resultados = {}
+    with tempfile.TemporaryDirectory(prefix="bench_") as pasta:
+        for nome in casos:
+            preparar, executar, maximo = CASOS[nome]
+            for n in tamanhos:
+                chave = f"{nome}@{n}"
+                if maximo is not None and n > maximo and not todos:
+                    print(f"{chave:<28} pulado (máximo {maximo:,}; use --todos)", file=saida)
+                    continue
+                ctx = preparar(n, pasta)
+                resultados[chave] = medir(executar, ctx, repeticoes)
+                del ctx
+                r = resultados[chave]
+                print(f"{chave:<28} {r['segundos']:>9.3f} s {r['pico_mb']:>9.1f} MB", file=saida, flush=True)
+    return resultados
+
+
+def comparar(resultados, base, limite):
+    """Lista de regressões (texto) em relação à linha de base."""
+    regressoes = []
+    for chave, r in resultados.items():
+        b = base.get(chave)
+        if b is None:
+            continue
+        medidas = [("segundos", FOLGA_SEGUNDOS, "s")]
+        # linhas de base antigas (sem "memoria") foram medidas com tracemalloc
+        if r.get("memoria", "tracemalloc") == b.get("memoria", "tracemalloc"):
+            medidas.append(("pico_mb", FOLGA_MB, "MB"))
+        for medida, folga, unidade in medidas:
+            atual, anterior = r[medida], b[medida]
+            if atual > anterior * (1 + limite) and atual - anterior > folga:
+                regressoes.append(
+                    f"{chave}: {medida} {anterior:.3f} -> {atual:.3f} {unidade} (+{(atual / anterior - 1) * 100:.0f}%)"
+                )
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", nargs="+", type=int, default=TAMANHOS)
+    parser.add_argument("--casos", nargs="+", choices=list(CASOS), default=list(CASOS))
+    parser.add_argument("--todos", action="store_true", help="ignora o tamanho máximo dos casos caros")
+    parser.add_argument("--repeticoes", type=int, default=1, help="execuções cronometradas por caso (vale a menor)")
+    parser.add_argument("--salvar", metavar="JSON", help="grava os resultados como linha de base")
+    parser.add_argument("--comparar", metavar="JSON", help="compara com a linha de base e falha se houver regressão")
+    parser.add_argument("--limite", type=float, default=LIMITE_PADRAO, help="piora tolerada (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    resultados = rodar(args.casos, args.tamanhos, todos=args.todos, repeticoes=args.repeticoes)
+
+    if args.salvar:
+        base = {}
+        if os.path.exists(args.salvar):
+            with open(args.salvar, encoding="utf-8") as f:
+                base = json.load(f)
+        base.update(resultados)
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump(base, f, indent=2, sort_keys=True)
+        print(f"Linha de base gravada em {args.salvar}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regressoes = comparar(resultados, base, args.limite)
+        for texto in regressoes:
+            print(f"REGRESSÃO {texto}")
+        if regressoes:
+            sys.exit(1)
+        print(f"Sem regressões acima de {args.limite:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
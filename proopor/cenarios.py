@@ -0,0 +1,188 @@
+"""
+Simulação de cenários (what-if) da folha inteira.
+
+Um cenário é um conjunto de parâmetros da barra lateral: tabelas de INSS e
+IRRF, dedução por dependente, FGTS % e INSS patronal %. A parte da folha que
+não depende deles (proventos, salário bruto, vale-transporte, faltas, ...)
+é calculada uma vez por funcionário com calcular_base_lote; o restante é
+calculado para todos os cenários de uma vez, em arrays cenários x
+funcionários (broadcasting do NumPy). Cada tabela de faixas distinta é
+aplicada uma única vez, às linhas dos cenários que a usam.
+
+Funcionários são divididos em blocos distribuídos entre processos; cada
+bloco devolve somas em centavos (int64), então o total não depende da
+divisão. Os valores por funcionário e cenário são exatamente os de
+calcular_folha_lote com os mesmos parâmetros.
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from dinheiro import arredondar, centavos, reais
+from faixas import FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO, compilar_faixas
+from folha_lote import calcular_base_lote
+
+PARAMETROS = {
+    # parâmetro: (rótulo no nome do cenário, valor padrão)
+    "inss_faixas": ("INSS {}", FAIXAS_INSS_PADRAO),
+    "irrf_faixas": ("IRRF {}", FAIXAS_IRRF_PADRAO),
+    "deducao_por_dependente": ("dedução R$ {}", 189.59),
+    "fgts_percent": ("FGTS {}%", 8.0),
+    "inss_patronal_percent": ("patronal {}%", 20.0),
+}
+# medidas somadas por cenário (coluna do resultado, rótulo na comparação)
+MEDIDAS = [
+    ("salario_bruto", "Salário bruto"),
+    ("inss", "INSS (empregado)"),
+    ("irrf", "IRRF"),
+    ("total_descontos", "Total descontos"),
+    ("salario_liquido", "Salário líquido"),
+    ("fgts", "FGTS"),
+    ("inss_patronal", "INSS patronal"),
+    ("custo_total_empregador", "Custo empregador"),
+]
+# tamanho do bloco: cenários x funcionários por bloco (limita a memória dos arrays 2D)
+ELEMENTOS_POR_BLOCO = 2_000_000
+# abaixo disto o pool de processos custa mais do que economiza
+MIN_FUNCIONARIOS_POOL = 20_000
+
+
+def grade_cenarios(base=None, **variacoes):
+    """
+    Produto cartesiano das variações sobre o cenário `base` (padrões de PARAMETROS).
+    Cada variação é uma lista de valores ou, para as tabelas, um dicionário
+    {rótulo: faixas}. Ex.: grade_cenarios(inss_patronal_percent=[20, 22], irrf_faixas={"atual": t1, "nova": t2}).
+    Retorna a lista de cenários (dicionários com os parâmetros e "nome").
+    """
+    cenario_base = {p: padrao for p, (_, padrao) in PARAMETROS.items()}
+    cenario_base.update(base or {})
+    eixos = []
+    for param, valores in variacoes.items():
+        if param not in PARAMETROS:
+            raise ValueError(f"Parâmetro de cenário desconhecido: {param}")
+        itens = valores.items() if isinstance(valores, dict) else ((f"{v:g}", v) for v in valores)
+        eixos.append([(param, rotulo, v) for rotulo, v in itens])
+    cenarios = []
+    for combinacao in itertools.product(*eixos):
+        cenario = dict(cenario_base)
+        nomes = []
+        for param, rotulo, valor in combinacao:
+            cenario[param] = valor
+            nomes.append(PARAMETROS[param][0].format(rotulo))
+        cenario["nome"] = ", ".join(nomes) or "base"
+        cenarios.append(cenario)
+    return cenarios
+
+
+def _tabelas_distintas(cenarios, param):
+    """{chave da tabela: (TabelaFaixas, índices dos cenários que a usam)}."""
+    grupos = {}
+    for i, c in enumerate(cenarios):
+        tabela = c[param]
+        grupos.setdefault(tabela.chave, (tabela, []))[1].append(i)
+    return grupos
+
+
+def _calcular_bloco(funcionarios, cenarios, por_funcionario=False):
+    """
+    Folha de um bloco de funcionários em todos os cenários.
+    Retorna ({medida: centavos por cenário}, {medida: array cenários x funcionários} ou None).
+    """
+    comum = calcular_base_lote(funcionarios)
+    n_cen, n_func = len(cenarios), len(funcionarios)
+    bruto = comum["salario_bruto"].to_numpy()
+    c_bruto = centavos(bruto)
+    c_fixos = sum(centavos(comum[c].to_numpy()) for c in (
+        "desconto_vt", "desconto_vr", "desconto_faltas", "desconto_atrasos", "desconto_pensao"))
+    c_provisoes = sum(centavos(comum[c].to_numpy()) for c in (
+        "provision_13_mensal", "provision_ferias_mensal", "provision_ferias_1_3_mensal"))
+    dependentes = comum["numero_dependentes"].to_numpy()
+    pensao = comum["pensao_alimenticia"].to_numpy()
+
+    def parametro(nome):
+        return np.array([c[nome] for c in cenarios], dtype="float64")[:, None]
+
+    # INSS: uma avaliação por tabela distinta, copiada para os cenários que a usam
+    inss = np.empty((n_cen, n_func))
+    for tabela, linhas in _tabelas_distintas(cenarios, "inss_faixas").values():
+        inss[linhas] = arredondar(tabela.inss(bruto))
+    # IRRF (mesma ordem de operações de calc_irrf_lote)
+    base_irrf = arredondar(np.maximum(0.0, (bruto - inss) - dependentes * parametro("deducao_por_dependente") - pensao))
+    irrf = np.empty((n_cen, n_func))
+    for tabela, linhas in _tabelas_distintas(cenarios, "irrf_faixas").values():
+        irrf[linhas] = arredondar(tabela.irrf(base_irrf[linhas]))
+    fgts = arredondar(bruto * (parametro("fgts_percent") / 100.0))
+    inss_patronal = arredondar(bruto * (parametro("inss_patronal_percent") / 100.0))
+
+    c_inss, c_irrf = centavos(inss), centavos(irrf)
+    c_descontos = c_fixos + c_inss + c_irrf
+    c_fgts, c_patronal = centavos(fgts), centavos(inss_patronal)
+    por_medida = {
+        "salario_bruto": np.broadcast_to(c_bruto, (n_cen, n_func)),
+        "inss": c_inss,
+        "irrf": c_irrf,
+        "total_descontos": c_descontos,
+        "salario_liquido": c_bruto - c_descontos,
+        "fgts": c_fgts,
+        "inss_patronal": c_patronal,
+        "custo_total_empregador": c_bruto + c_patronal + c_fgts + c_provisoes,
+    }
+    somas = {m: c.sum(axis=1, dtype="int64") for m, c in por_medida.items()}
+    return somas, (por_medida if por_funcionario else None)
+
+
+def _calcular_bloco_pool(args):
+    return _calcular_bloco(*args)
+
+
+def simular_cenarios(funcionarios, cenarios, processos=None, por_funcionario=False):
+    """
+    Folha de todos os funcionários (DataFrame no formato de calcular_folha_lote)
+    em todos os `cenarios` (ver grade_cenarios).
+
+    Retorna a tabela de comparação: uma linha por cenário com os totais em
+    reais e a diferença de custo para o primeiro cenário. Com `por_funcionario`
+    retorna (comparação, detalhe), onde o detalhe tem uma linha por
+    (cenário, funcionário) com as medidas em reais.
+    `processos`: tamanho do pool (padrão: nº de CPUs; 1 = sem pool).
+    """
+    if not cenarios:
+        raise ValueError("Informe ao menos um cenário")
+    cenarios = [
+        dict(c, inss_faixas=compilar_faixas(c["inss_faixas"]), irrf_faixas=compilar_faixas(c["irrf_faixas"]),
+             nome=c.get("nome", f"cenário {i + 1}"))
+        for i, c in enumerate(cenarios)
+    ]
+    n = len(funcionarios)
+    tamanho_bloco = max(1_000, ELEMENTOS_POR_BLOCO // len(cenarios))
+    blocos = [(funcionarios.iloc[i:i + tamanho_bloco], cenarios, por_funcionario) for i in range(0, n, tamanho_bloco)]
+    processos = processos or os.cpu_count() or 1
+    if processos > 1 and len(blocos) > 1 and n >= MIN_FUNCIONARIOS_POOL:
+        with ProcessPoolExecutor(max_workers=min(processos, len(blocos))) as pool:
+            resultados = list(pool.map(_calcular_bloco_pool, blocos))
+    else:
+        resultados = [_calcular_bloco(*b) for b in blocos]
+
+    somas = {m: np.zeros(len(cenarios), dtype="int64") for m, _ in MEDIDAS}
+    for parcial, _ in resultados:
+        for m in somas:
+            somas[m] += parcial[m]
+    comparacao = pd.DataFrame({"Cenário": [c["nome"] for c in cenarios], "Funcionários": n})
+    for m, rotulo in MEDIDAS:
+        comparacao[rotulo] = reais(somas[m])
+    custo = somas["custo_total_empregador"]
+    comparacao["Δ custo vs 1º"] = reais(custo - custo[0])
+    comparacao["Δ custo %"] = (custo - custo[0]) / custo[0] * 100.0 if custo[0] else 0.0
+    if not por_funcionario:
+        return comparacao
+
+    detalhe = pd.DataFrame({
+        "cenario": np.repeat([c["nome"] for c in cenarios], n),
+        "funcionario": np.tile(funcionarios.index.to_numpy(), len(cenarios)),
+    })
+    for m, _ in MEDIDAS:
+        detalhe[m] = reais(np.concatenate([d[m] for _, d in resultados], axis=1).ravel())
+    return comparacao, detalhe
@@ -0,0 +1,303 @@
+"""
+Dados sintéticos para teste de carga, gravados direto em disco em blocos.
+
+Três tipos de arquivo:
+- transacoes: extrato no formato de financial-management-system/src/data/sample_data.csv
+  (id, date, description, amount, category);
+- lancamentos: colunas da aba Lançamentos Contábeis (livro_lancamentos.COLUNAS);
+- roster: planilha de funcionários com os campos do formulário da folha
+  (folha_lote.CAMPOS_FOLHA) mais nome e matrícula.
+
+Cada bloco é gerado com um gerador aleatório próprio (semente + número do
+bloco) e escrito antes do próximo, então a memória depende só do tamanho do
+bloco, não do número de linhas; a mesma semente e o mesmo tamanho de bloco
+reproduzem o mesmo arquivo. Datas avançam ao longo do arquivo (ordem
+cronológica), como num extrato real. As distribuições ficam nos PERFIS e
+podem ser trocadas por parâmetro.
+
+    python dados_sinteticos.py transacoes 10000000 -o extrato.csv.gz
+    python dados_sinteticos.py lancamentos 2000000 -o livro.csv --semente 7 -p receita_share=0.4
+    python dados_sinteticos.py roster 50000 -o funcionarios.csv -p salario_mediana=4200
+    python dados_sinteticos.py lancamentos 1000000 --livro   # grava no livro SQLite (EFICICASH_DB)
+"""
+import argparse
+import gzip
+import json
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+TAMANHO_BLOCO = 250_000
+
+# Distribuições padrão; qualquer chave pode ser sobrescrita (parâmetro `perfil` ou -p chave=valor).
+# Valores monetários seguem uma lognormal (mediana, sigma); listas de categorias são (nome, peso).
+PERFIS = {
+    "transacoes": {
+        "inicio": "2020-01-01",
+        "dias": 5 * 365,
+        "receita_share": 0.15,
+        "receita_mediana": 3000.0,
+        "receita_sigma": 0.8,
+        "despesa_mediana": 80.0,
+        "despesa_sigma": 1.2,
+        "categorias_despesa": [
+            ("Groceries", 30), ("Utilities", 10), ("Rent", 5), ("Transport", 15),
+            ("Restaurants", 15), ("Suppliers", 15), ("Taxes", 5), ("Other", 5),
+        ],
+        # descrições: fornecedores com popularidade em lei de potência (poucos muito frequentes)
+        "fornecedores": 5000,
+        "fornecedores_zipf": 1.3,
+        "colunas_receita_despesa": False,  # acrescenta Income/Expenses (analysis.metrics)
+    },
+    "lancamentos": {
+        "inicio": "2023-01-01",
+        "dias": 2 * 365,
+        "receita_share": 0.35,
+        "transferencia_share": 0.05,
+        "receita_mediana": 2500.0,
+        "receita_sigma": 1.0,
+        "despesa_mediana": 400.0,
+        "despesa_sigma": 1.3,
+        "categorias_receita": [("Vendas", 70), ("Serviços", 25), ("Outros", 5)],
+        "categorias_despesa": [
+            ("CMV", 25), ("Pessoal", 20), ("Aluguel", 5), ("Impostos sobre vendas", 10),
+            ("Marketing", 10), ("Serviços", 15), ("Gasto", 10), ("Outros", 5),
+        ],
+        "contas": [("Banco", 80), ("Caixa", 20)],
+        "centros_custo": [("Administrativo", 30), ("Comercial", 40), ("Operação", 30)],
+        "clientes": 2000,
+        "fornecedores": 800,
+        "prazo_dias_max": 60,
+        "recebido_share": 0.8,
+    },
+    "roster": {
+        "salario_mediana": 3200.0,
+        "salario_sigma": 0.55,
+        "salario_minimo": 1412.0,
+        "horas_normais_mes": [(220.0, 80), (200.0, 10), (180.0, 10)],
+        "horas_extra_share": 0.35,
+        "horas_extra_media": 6.0,
+        "noturno_share": 0.15,
+        "periculosidade_share": 0.08,
+        "insalubridade_share": 0.10,
+        "dependentes_media": 0.9,
+        "pensao_share": 0.04,
+        "vt_percent_share": 0.7,
+        "vale_refeicao": [(0.0, 30), (200.0, 40), (450.0, 30)],
+        "faltas_media": 0.3,
+        "atrasos_media_minutos": 15.0,
+    },
+}
+
+
+def _escolher(rng, pares, n):
+    nomes = np.array([p[0] for p in pares], dtype=object)
+    pesos = np.array([p[1] for p in pares], dtype="float64")
+    return nomes[rng.choice(len(nomes), size=n, p=pesos / pesos.sum())]
+
+
+def _lognormal(rng, mediana, sigma, n):
+    return np.round(rng.lognormal(np.log(mediana), sigma, n), 2)
+
+
+def _zipf(rng, a, maximo, n):
+    """Índices 1..maximo com frequência em lei de potência."""
+    return (rng.zipf(a, n) - 1) % maximo + 1
+
+
+@lru_cache(maxsize=16)
+def _rotulos(prefixo, quantidade, largura):
+    """Nomes "<prefixo>0001".."<prefixo>N" (índice 0 = ""), montados uma vez e indexados por bloco."""
+    return np.array([""] + [f"{prefixo}{i:0{largura}d}" for i in range(1, quantidade + 1)], dtype=object)
+
+
+@lru_cache(maxsize=16)
+def _dias(inicio, dias):
+    return np.array([str(d) for d in np.datetime64(inicio, "D") + np.arange(dias + 1)], dtype=object)
+
+
+def _datas(inicio, dias, primeira, n, total):
+    """Datas crescentes ao longo do arquivo: a linha i cai no dia i * dias / total."""
+    i = np.arange(primeira, primeira + n, dtype="int64")
+    return _dias(inicio, dias)[i * dias // max(total, 1)]
+
+
+def bloco_transacoes(rng, primeira, n, total, perfil):
+    p = perfil
+    receita = rng.random(n) < p["receita_share"]
+    valor = np.where(
+        receita,
+        _lognormal(rng, p["receita_mediana"], p["receita_sigma"], n),
+        -_lognormal(rng, p["despesa_mediana"], p["despesa_sigma"], n),
+    )
+    fornecedor = _zipf(rng, p["fornecedores_zipf"], p["fornecedores"], n)
+    bloco = pd.DataFrame({
+        "id": np.arange(primeira + 1, primeira + n + 1, dtype="int64"),
+        "date": _datas(p["inicio"], p["dias"], primeira, n, total),
+        "description": np.where(receita, "Salary", _rotulos("Vendor ", p["fornecedores"], 5)[fornecedor]),
+        "amount": valor,
+        "category": np.where(receita, "Income", _escolher(rng, p["categorias_despesa"], n)),
+    })
+    if p["colunas_receita_despesa"]:
+        bloco["Income"] = np.where(receita, valor, 0.0)
+        bloco["Expenses"] = np.where(receita, 0.0, -valor)
+    return bloco
+
+
+def bloco_lancamentos(rng, primeira, n, total, perfil):
+    p = perfil
+    sorteio = rng.random(n)
+    tipo = np.where(sorteio < p["receita_share"], "receita",
+                    np.where(sorteio < p["receita_share"] + p["transferencia_share"], "transferência", "despesa"))
+    receita = tipo == "receita"
+    data = _datas(p["inicio"], p["dias"], primeira, n, total)
+    dia = np.arange(primeira, primeira + n, dtype="int64") * p["dias"] // max(total, 1)
+    vencimento = _dias(p["inicio"], p["dias"] + p["prazo_dias_max"])[dia + rng.integers(0, p["prazo_dias_max"] + 1, n)]
+    recebido = rng.random(n) < p["recebido_share"]
+    cliente = _rotulos("Cliente ", p["clientes"], 4)[rng.integers(1, p["clientes"] + 1, n)]
+    fornecedor = _rotulos("Fornecedor ", p["fornecedores"], 4)[rng.integers(1, p["fornecedores"] + 1, n)]
+    return pd.DataFrame({
+        "data": data,
+        "descrição": np.where(receita, "Recebimento de venda", np.where(tipo == "transferência", "Transferência entre contas", "Pagamento")),
+        "valor": np.where(
+            receita,
+            _lognormal(rng, p["receita_mediana"], p["receita_sigma"], n),
+            _lognormal(rng, p["despesa_mediana"], p["despesa_sigma"], n),
+        ),
+        "tipo": tipo,
+        "conta": _escolher(rng, p["contas"], n),
+        "categoria": np.where(
+            receita, _escolher(rng, p["categorias_receita"], n),
+            np.where(tipo == "transferência", "Outros", _escolher(rng, p["categorias_despesa"], n)),
+        ),
+        "data_vencimento": vencimento,
+        "data_recebimento": np.where(recebido, vencimento, ""),
+        "cliente": np.where(receita, cliente, ""),
+        "fornecedor": np.where(tipo == "despesa", fornecedor, ""),
+        "centro_custo": _escolher(rng, p["centros_custo"], n),
+    })
+
+
+def bloco_roster(rng, primeira, n, total, perfil):
+    p = perfil
+    matricula = np.arange(primeira + 1, primeira + n + 1, dtype="int64")
+    horas_extra = rng.random(n) < p["horas_extra_share"]
+    vt_percent = rng.random(n) < p["vt_percent_share"]
+    insalubre = rng.random(n) < p["insalubridade_share"]
+    return pd.DataFrame({
+        "matricula": matricula,
+        "nome": [f"Funcionário {m}" for m in matricula.tolist()],
+        "salario_base": np.maximum(_lognormal(rng, p["salario_mediana"], p["salario_sigma"], n), p["salario_minimo"]),
+        "dias_uteis_mes": 30,
+        "horas_normais_mes": _escolher(rng, p["horas_normais_mes"], n).astype("float64"),
+        "horas_extra_50": np.where(horas_extra, np.round(rng.exponential(p["horas_extra_media"], n) * 2) / 2, 0.0),
+        "horas_extra_100": np.where(horas_extra & (rng.random(n) < 0.3), np.round(rng.exponential(2.0, n) * 2) / 2, 0.0),
+        "horas_noturnas": np.where(rng.random(n) < p["noturno_share"], 40.0, 0.0),
+        "adicional_noturno_percent": 20.0,
+        "possui_periculosidade": rng.random(n) < p["periculosidade_share"],
+        "periculosidade_percent": 30.0,
+        "possui_insalubridade": insalubre,
+        "insalubridade_percent": np.where(insalubre, rng.choice([10.0, 20.0, 40.0], n), 0.0),
+        "numero_dependentes": rng.poisson(p["dependentes_media"], n),
+        "pensao_alimenticia": np.where(rng.random(n) < p["pensao_share"], _lognormal(rng, 600.0, 0.4, n), 0.0),
+        "vale_transporte_percent": np.where(vt_percent, 6.0, np.nan),
+        "vale_transporte_valor": np.where(vt_percent, np.nan, _lognormal(rng, 180.0, 0.3, n)),
+        "vale_refeicao": _escolher(rng, p["vale_refeicao"], n).astype("float64"),
+        "faltas": rng.poisson(p["faltas_media"], n),
+        "atrasos_minutos": rng.poisson(p["atrasos_media_minutos"], n),
+        "outros_proventos": 0.0,
+    })
+
+
+GERADORES = {"transacoes": bloco_transacoes, "lancamentos": bloco_lancamentos, "roster": bloco_roster}
+# separador de cada arquivo: o extrato segue o sample_data.csv; os demais, as exportações do app
+SEPARADORES = {"transacoes": ",", "lancamentos": ";", "roster": ";"}
+
+
+def gerar_blocos(tipo, linhas, semente=0, tamanho_bloco=TAMANHO_BLOCO, perfil=None):
+    """Gera os DataFrames do arquivo `tipo` em blocos de até `tamanho_bloco` linhas."""
+    parametros = dict(PERFIS[tipo], **(perfil or {}))
+    gerar = GERADORES[tipo]
+    for indice, primeira in enumerate(range(0, linhas, tamanho_bloco)):
+        rng = np.random.default_rng([semente, indice])
+        yield gerar(rng, primeira, min(tamanho_bloco, linhas - primeira), linhas, parametros)
+
+
+def gerar_dataframe(tipo, linhas, semente=0, perfil=None):
+    """Conveniência para testes em memória: o arquivo inteiro em um único DataFrame."""
+    return next(gerar_blocos(tipo, linhas, semente, tamanho_bloco=max(linhas, 1), perfil=perfil))
+
+
+def gravar_csv(tipo, destino, linhas, semente=0, tamanho_bloco=TAMANHO_BLOCO, perfil=None, progresso=None):
+    """Grava o arquivo em `destino` (".gz" comprime) bloco a bloco; retorna o número de linhas."""
+    abrir = gzip.open if str(destino).endswith(".gz") else open
+    gravadas = 0
+    with abrir(destino, "wt", encoding="utf-8", newline="") as f:
+        for bloco in gerar_blocos(tipo, linhas, semente, tamanho_bloco, perfil):
+            bloco.to_csv(f, index=False, header=gravadas == 0, sep=SEPARADORES[tipo])
+            gravadas += len(bloco)
+            if progresso is not None:
+                progresso(gravadas)
+    return gravadas
+
+
+def gravar_no_livro(livro, linhas, semente=0, tamanho_bloco=TAMANHO_BLOCO, perfil=None, progresso=None):
+    """Inclui lançamentos sintéticos no LivroLancamentos (um commit por bloco)."""
+    gravadas = 0
+    for bloco in gerar_blocos("lancamentos", linhas, semente, tamanho_bloco, perfil):
+        livro.adicionar_varios(bloco.to_dict("records"))
+        gravadas += len(bloco)
+        if progresso is not None:
+            progresso(gravadas)
+    return gravadas
+
+
+def _valor_parametro(texto):
+    chave, _, valor = texto.partition("=")
+    try:
+        return chave, json.loads(valor)
+    except json.JSONDecodeError:
+        return chave, valor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tipo", choices=list(GERADORES))
+    parser.add_argument("linhas", type=int)
+    parser.add_argument("-o", "--saida", help="arquivo CSV de saída (padrão: <tipo>.csv)")
+    parser.add_argument("--livro", action="store_true", help="lancamentos: grava no livro SQLite em vez de CSV")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO, help="linhas por bloco")
+    parser.add_argument("-p", "--param", action="append", default=[], metavar="CHAVE=VALOR",
+                        help="sobrescreve um item do perfil (valor em JSON)")
+    args = parser.parse_args()
+
+    perfil = dict(_valor_parametro(p) for p in args.param)
+    desconhecidas = set(perfil) - set(PERFIS[args.tipo])
+    if desconhecidas:
+        parser.error(f"parâmetros desconhecidos para {args.tipo}: {', '.join(sorted(desconhecidas))}")
+    inicio = time.perf_counter()
+
+    def progresso(n):
+        print(f"\r{n:,} / {args.linhas:,} linhas", end="", flush=True)
+
+    if args.livro:
+        if args.tipo != "lancamentos":
+            parser.error("--livro só vale para lancamentos")
+        from livro_lancamentos import LivroLancamentos
+
+        livro = LivroLancamentos()
+        gravadas = gravar_no_livro(livro, args.linhas, args.semente, args.bloco, perfil, progresso)
+        destino = livro.caminho
+        livro.fechar()
+    else:
+        destino = args.saida or f"{args.tipo}.csv"
+        gravadas = gravar_csv(args.tipo, destino, args.linhas, args.semente, args.bloco, perfil, progresso)
+    segundos = time.perf_counter() - inicio
+    print(f"\n{gravadas:,} linhas em {destino} ({segundos:.1f} s, {gravadas / max(segundos, 1e-9):,.0f} linhas/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Valores monetários em centavos (int64).
+
+Política única de arredondamento: cada valor calculado em reais (float) é
+convertido para centavos no momento em que vira um valor de holerite ou de
+lançamento, com meio centavo arredondado para longe do zero (arredondamento
+comercial). Daí em diante as somas são de inteiros — exatas, em qualquer
+ordem — e o float só volta a aparecer na exibição (reais()).
+"""
+import numpy as np
+
+
+def centavos(valor):
+    """
+    Reais (número ou array) -> centavos inteiros (int ou array int64).
+    Valor ausente ou não finito (None, NaN, inf) gera ValueError: convertido
+    para int64 ele viraria -9,2e16 centavos e contaminaria as somas.
+    """
+    v = np.asarray(valor, dtype="float64") * 100.0
+    if not np.isfinite(v).all():
+        raise ValueError("Valor monetário ausente ou não numérico (NaN/inf)")
+    # 1.005 * 100 = 100.49999999999999: o erro de representação não decide o arredondamento
+    v = np.round(v, 6)
+    c = (np.sign(v) * np.floor(np.abs(v) + 0.5)).astype("int64")
+    return int(c) if c.ndim == 0 else c
+
+
+def reais(valor_centavos):
+    """Centavos (int ou array) -> reais em float, para exibição e gráficos."""
+    r = np.asarray(valor_centavos, dtype="int64") / 100.0
+    return float(r) if r.ndim == 0 else r
+
+
+def arredondar(valor):
+    """Valor em reais arredondado ao centavo pela política deste módulo."""
+    return reais(centavos(valor))
+
+
+def somar(valores):
+    """Soma exata de valores em reais já arredondados ao centavo; retorna centavos."""
+    return int(np.sum(centavos(list(valores)), dtype="int64"))
@@ -0,0 +1,128 @@
+"""
+DRE (Demonstração do Resultado) montada a partir dos lançamentos.
+
+Cada lançamento é classificado em um grupo da DRE (receita bruta, deduções,
+custos, despesas operacionais) por tipo e categoria e todos os valores
+são somados em um único groupby por (mês, grupo, detalhe), em centavos.
+A hierarquia e os subtotais são montados sobre esse resultado agregado,
+sem um filtro por linha da DRE. Aceita tanto lançamentos individuais quanto
+linhas já agregadas (ex.: LivroLancamentos.totais_por_mes()).
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+from dinheiro import reais
+from indice_lancamentos import normalizar
+
+logger = logging.getLogger("eficicash")
+
+# ordem dos grupos na DRE e sinal com que entram no resultado
+GRUPOS_DRE = [
+    ("Receita Bruta", 1),
+    ("Deduções da Receita", -1),
+    ("Custos", -1),
+    ("Despesas Operacionais", -1),
+]
+SUBTOTAIS_DRE = {
+    # subtotal exibido depois do grupo: (rótulo, grupos somados)
+    "Deduções da Receita": ("Receita Líquida", ["Receita Bruta", "Deduções da Receita"]),
+    "Custos": ("Lucro Bruto", ["Receita Bruta", "Deduções da Receita", "Custos"]),
+    "Despesas Operacionais": ("Resultado Operacional", [g for g, _ in GRUPOS_DRE]),
+}
+# categorias com grupo próprio; as demais seguem o tipo do lançamento
+CATEGORIAS_DRE = {
+    "Deduções": "Deduções da Receita",
+    "Impostos sobre vendas": "Deduções da Receita",
+    "Devoluções": "Deduções da Receita",
+    "Custos": "Custos",
+    "CMV": "Custos",
+    "CPV": "Custos",
+}
+# tipos já normalizados (minúsculas, sem acento, sem espaços nas pontas)
+TIPOS_DRE = {"receita": "Receita Bruta", "despesa": "Despesas Operacionais"}
+# tipos que ficam fora da DRE de propósito; qualquer outro tipo sem grupo gera um aviso
+TIPOS_FORA_DRE = {"transferencia"}
+
+
+def _codigos_grupo(valores, mapa):
+    """Posição em GRUPOS_DRE de cada valor distinto (-1 = sem grupo)."""
+    posicao = {g: i for i, (g, _) in enumerate(GRUPOS_DRE)}
+    return np.array([posicao.get(mapa.get(v), -1) if isinstance(v, str) else -1 for v in valores], dtype="int64")
+
+
+def _grupos_tipo(tipos):
+    """Posição em GRUPOS_DRE de cada tipo distinto, comparando o texto normalizado ("Receita ", "DESPESA")."""
+    normalizados = [normalizar(t).strip() if isinstance(t, str) else "" for t in tipos]
+    grupos = _codigos_grupo(normalizados, TIPOS_DRE)
+    sem_grupo = sorted({t if n else "(vazio)" for t, n, g in zip(tipos, normalizados, grupos) if g < 0 and n not in TIPOS_FORA_DRE})
+    if sem_grupo:
+        logger.warning("DRE: lançamentos com tipo sem grupo ficaram fora do resultado: %s", sem_grupo)
+    return grupos
+
+
+def montar_dre(lancamentos, valor="valor_centavos", data="data", detalhe="categoria", por_mes=False, categorias=None):
+    """
+    DRE hierárquica. `lancamentos` precisa das colunas tipo, `detalhe`, `valor`
+    (centavos inteiros) e `data` (ou "mes" no formato AAAA-MM).
+    Retorna DataFrame com Conta, Nível (0 = grupo/subtotal, 1 = detalhe),
+    uma coluna por mês quando `por_mes` e a coluna Total, em reais.
+    O tipo é comparado sem diferenciar maiúsculas, acentos e espaços; transferências
+    ficam fora e os demais tipos sem grupo (ou vazios) também, com um aviso no log.
+    """
+    df = lancamentos
+    # textos são tratados só nos valores distintos (factorize); o groupby usa os códigos inteiros
+    cod_tipo, tipos = pd.factorize(df["tipo"])
+    cod_det, detalhes = pd.factorize(df[detalhe], use_na_sentinel=False)
+    if (cod_tipo < 0).any():
+        tipos = list(tipos) + [None]  # tipo vazio: código -1 aponta para o último
+    grupo_tipo = _grupos_tipo(list(tipos))[cod_tipo]
+    grupo_cat = _codigos_grupo(detalhes, CATEGORIAS_DRE if categorias is None else categorias)[cod_det]
+    # tipos fora de TIPOS_DRE (transferências) não entram, qualquer que seja a categoria
+    grupo = np.where(grupo_tipo < 0, -1, np.where(grupo_cat >= 0, grupo_cat, grupo_tipo))
+    if por_mes:
+        cod_mes, datas = pd.factorize(df["mes"] if "mes" in df.columns else df[data])
+        meses_distintos = pd.Series(datas).astype(str).str[:7]
+        cod_mes, meses = pd.factorize(meses_distintos.to_numpy()[cod_mes], sort=True)
+    else:
+        cod_mes, meses = np.zeros(len(df), dtype="int64"), np.array(["Total"])
+    nomes = pd.Series(detalhes, dtype="object").fillna("").astype(str).replace("", "(sem categoria)").to_numpy()
+
+    # o único groupby: (grupo, detalhe, mês) -> centavos
+    validos = grupo >= 0
+    if validos.any():
+        somas = (
+            pd.Series(df[valor].to_numpy(dtype="int64")[validos])
+            .groupby([grupo[validos], cod_det[validos], cod_mes[validos]]).sum()
+            .unstack(fill_value=0)
+            .reindex(columns=range(len(meses)), fill_value=0)
+        )
+        g_linha = somas.index.get_level_values(0).to_numpy()
+        d_linha = somas.index.get_level_values(1).to_numpy()
+        centavos = somas.to_numpy(dtype="int64")
+    else:
+        g_linha = d_linha = np.zeros(0, dtype="int64")
+        centavos = np.zeros((0, len(meses)), dtype="int64")
+    colunas = list(meses)
+    if por_mes:
+        centavos = np.column_stack([centavos, centavos.sum(axis=1)])
+        colunas.append("Total")
+    vazio = np.zeros(len(colunas), dtype="int64")
+
+    linhas, por_grupo = [], {}
+    for i, (grupo_nome, sinal) in enumerate(GRUPOS_DRE):
+        sel = g_linha == i
+        total = sinal * centavos[sel].sum(axis=0) if sel.any() else vazio
+        por_grupo[grupo_nome] = total
+        linhas.append((grupo_nome, 0, total))
+        for d, valores in sorted(zip(d_linha[sel], centavos[sel]), key=lambda x: nomes[x[0]]):
+            linhas.append((f"  {nomes[d]}", 1, sinal * valores))
+        if grupo_nome in SUBTOTAIS_DRE:
+            rotulo, grupos = SUBTOTAIS_DRE[grupo_nome]
+            linhas.append((rotulo, 0, sum(por_grupo.get(g, vazio) for g in grupos)))
+
+    return pd.DataFrame(
+        [[conta, nivel, *reais(np.asarray(valores, dtype="int64"))] for conta, nivel, valores in linhas],
+        columns=["Conta", "Nível", *colunas],
+    )
@@ -0,0 +1,189 @@
+"""
+Exportação para Excel (.xlsx) em modo write-only do openpyxl.
+
+As linhas são gravadas em sequência (o openpyxl as despeja em arquivo
+temporário à medida que chegam), os estilos são NamedStyles registrados uma
+vez por pasta de trabalho e a largura das colunas é calculada antes, pelo
+comprimento das strings de cada coluna (operação vetorizada do pandas, em
+blocos). Assim a memória não cresce com o número de linhas exportadas.
+
+Cada célula recebe uma cópia do StyleArray do seu estilo, montado uma vez no
+registro: `cell.style = nome` procuraria o nome na lista de estilos da pasta
+a cada célula (~2,5x mais lento na exportação de lançamentos).
+"""
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import Cell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side, numbers
+from openpyxl.utils import get_column_letter
+
+TAMANHO_BLOCO = 50_000
+FORMATO_MOEDA = '"R$"#,##0.00'
+COLUNAS_DATA = ("data", "data_vencimento", "data_recebimento")
+
+
+def _borda():
+    thin = Side(border_style="thin", color="000000")
+    return Border(left=thin, right=thin, top=thin, bottom=thin)
+
+
+def _registrar_estilos(wb, estilos):
+    """Registra os NamedStyles na pasta; devolve {nome: StyleArray} com o modelo de cada um para _celula."""
+    modelos = {}
+    for estilo in estilos:
+        wb.add_named_style(estilo)
+        modelos[estilo.name] = estilo.as_tuple()
+    return modelos
+
+
+def _blocos(df, tamanho_bloco=TAMANHO_BLOCO):
+    return (df.iloc[inicio:inicio + tamanho_bloco] for inicio in range(0, len(df), tamanho_bloco))
+
+
+def _larguras(df, minimo=None, maximo=None, extras=None, tamanho_bloco=TAMANHO_BLOCO):
+    """Maior comprimento de texto por coluna (cabeçalho incluído), calculado bloco a bloco."""
+    return _larguras_blocos(_blocos(df, tamanho_bloco), df.columns.tolist(), minimo, maximo, extras)[1]
+
+
+def _larguras_blocos(blocos, colunas=None, minimo=None, maximo=None, extras=None):
+    """Como _larguras, sobre um iterável de blocos; devolve (colunas, larguras), com as colunas do primeiro bloco se não informadas."""
+    larguras = None if colunas is None else np.array([len(str(c)) for c in colunas], dtype=int)
+    for bloco in blocos:
+        if larguras is None:
+            colunas = bloco.columns.tolist()
+            larguras = np.array([len(str(c)) for c in colunas], dtype=int)
+        comp = [bloco[c].astype(str).str.len().max() if len(bloco) else 0 for c in colunas]
+        larguras = np.maximum(larguras, np.nan_to_num(np.array(comp, dtype="float64")).astype(int))
+    if larguras is None:
+        return [], np.array([], dtype=int)
+    if extras:
+        for i, comp in extras.items():
+            larguras[i] = max(larguras[i], comp)
+    larguras = larguras + 2
+    if minimo is not None or maximo is not None:
+        larguras = np.clip(larguras, minimo, maximo)
+    return colunas, larguras
+
+
+def _celula(ws, valor, estilo=None):
+    """Célula do modo write-only; `estilo` é um modelo de _registrar_estilos (copiado para a célula)."""
+    return Cell(ws, row=1, column=1, value=valor, style_array=estilo)
+
+
+def _valor_planilha(v):
+    """Converte escalares do NumPy/pandas em tipos que o openpyxl grava."""
+    if v is None or (isinstance(v, float) and np.isnan(v)) or v is pd.NA or v is pd.NaT:
+        return None
+    if isinstance(v, np.generic):
+        return v.item()
+    return v
+
+
+def exportar_lancamentos_xlsx(lancamentos, destino, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Grava os lançamentos em `destino` (caminho ou arquivo binário): cabeçalho
+    destacado, valor com duas casas, vermelho para Gasto/despesa e verde para
+    Ganho/receita, datas centralizadas.
+
+    `lancamentos` é um DataFrame ou uma função sem argumentos que devolve os
+    blocos (DataFrames) a gravar, ex.: `lambda: livro.carregar_em_blocos()`;
+    ela é chamada duas vezes (larguras das colunas e linhas), de modo que o
+    livro nunca precisa estar inteiro em memória.
+    """
+    if isinstance(lancamentos, pd.DataFrame):
+        df = lancamentos
+        blocos = lambda: _blocos(df, tamanho_bloco)
+    else:
+        blocos = lancamentos
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Lançamentos")
+    borda = _borda()
+    estilo = _registrar_estilos(wb, [
+        NamedStyle("lanc_cabecalho", font=Font(bold=True, color="FFFFFF"), fill=PatternFill("solid", fgColor="1F4E78"),
+                   alignment=Alignment(horizontal="center"), border=borda),
+        NamedStyle("lanc_texto", border=borda),
+        NamedStyle("lanc_data", border=borda, alignment=Alignment(horizontal="center")),
+        NamedStyle("lanc_valor", border=borda, number_format=numbers.FORMAT_NUMBER_00),
+        NamedStyle("lanc_valor_gasto", border=borda, number_format=numbers.FORMAT_NUMBER_00,
+                   fill=PatternFill("solid", fgColor="FDE9E9")),
+        NamedStyle("lanc_valor_ganho", border=borda, number_format=numbers.FORMAT_NUMBER_00,
+                   fill=PatternFill("solid", fgColor="E7F9EE")),
+    ])
+    # no modo write-only as larguras precisam ser definidas antes da primeira linha
+    colunas, larguras = _larguras_blocos(blocos(), minimo=10, maximo=50)
+    for i, largura in enumerate(larguras, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = int(largura)
+
+    estilos_linha = [estilo["lanc_data"] if c in COLUNAS_DATA else estilo["lanc_texto"] for c in colunas]
+    pos_valor = colunas.index("valor") if "valor" in colunas else None
+    ws.append([_celula(ws, h, estilo["lanc_cabecalho"]) for h in colunas])
+    for bloco in blocos():
+        if pos_valor is not None:
+            valores = pd.to_numeric(bloco["valor"], errors="coerce")
+            categoria = bloco["categoria"] if "categoria" in bloco else pd.Series("", index=bloco.index)
+            tipo = bloco["tipo"] if "tipo" in bloco else pd.Series("", index=bloco.index)
+            estilo_valor = np.select(
+                [(categoria == "Gasto") | (tipo == "despesa"), (categoria == "Ganho") | (tipo == "receita")],
+                ["lanc_valor_gasto", "lanc_valor_ganho"],
+                default="lanc_valor",
+            )
+            estilo_valor = np.where(valores.isna(), "lanc_texto", estilo_valor)
+            bloco = bloco.assign(valor=valores.astype(object).where(valores.notna(), bloco["valor"]))
+        for n, linha in enumerate(bloco.itertuples(index=False, name=None)):
+            if pos_valor is not None:
+                estilos_linha[pos_valor] = estilo[estilo_valor[n]]
+            ws.append([_celula(ws, _valor_planilha(v), e) for v, e in zip(linha, estilos_linha)])
+    wb.save(destino)
+
+
+def exportar_holerite_xlsx(destino, holerite_df, resumo, rodape):
+    """
+    Holerite em Excel: título, `resumo` e `rodape` ({rótulo: valor em R$}) em
+    negrito com formato monetário e a tabela do holerite com cabeçalho destacado.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Holerite")
+    borda = _borda()
+    estilo = _registrar_estilos(wb, [
+        NamedStyle("hol_titulo", font=Font(size=14, bold=True)),
+        NamedStyle("hol_rotulo", font=Font(bold=True)),
+        NamedStyle("hol_moeda", number_format=FORMATO_MOEDA, alignment=Alignment(horizontal="right")),
+        NamedStyle("hol_cabecalho", font=Font(bold=True), fill=PatternFill("solid", fgColor="DDDDDD"),
+                   alignment=Alignment(horizontal="center")),
+        NamedStyle("hol_celula", border=borda),
+        NamedStyle("hol_celula_moeda", border=borda, number_format=FORMATO_MOEDA, alignment=Alignment(horizontal="right")),
+    ])
+    titulo = "Eficicash - Holerite"
+    # coluna A também recebe o título e os rótulos do resumo
+    extras = {0: max([len(titulo)] + [len(str(k)) for k in resumo])}
+    if len(holerite_df.columns) > 1:
+        extras[1] = max(len(f"{float(v)}") for v in resumo.values()) if resumo else 0
+    for i, largura in enumerate(_larguras(holerite_df, extras=extras), start=1):
+        ws.column_dimensions[get_column_letter(i)].width = int(largura)
+
+    ws.append([_celula(ws, titulo, estilo["hol_titulo"])])
+    ws.append([])
+    for rotulo, valor in resumo.items():
+        ws.append([_celula(ws, rotulo, estilo["hol_rotulo"]), _celula(ws, float(valor), estilo["hol_moeda"])])
+    ws.append([])
+    ws.append([_celula(ws, h, estilo["hol_cabecalho"]) for h in holerite_df.columns])
+    moeda_ultima = holerite_df.columns[-1] in ("valor", "Valor (R$)")
+    ultima = len(holerite_df.columns) - 1
+    for linha in holerite_df.itertuples(index=False, name=None):
+        celulas = []
+        for i, v in enumerate(linha):
+            v = _valor_planilha(v)
+            if moeda_ultima and i == ultima:
+                try:
+                    celulas.append(_celula(ws, float(v), estilo["hol_celula_moeda"]))
+                    continue
+                except (TypeError, ValueError):
+                    pass
+            celulas.append(_celula(ws, v, estilo["hol_celula"]))
+        ws.append(celulas)
+    ws.append([])
+    ws.append([])
+    for rotulo, valor in rodape.items():
+        ws.append([_celula(ws, rotulo, estilo["hol_rotulo"]), _celula(ws, float(valor), estilo["hol_moeda"])])
+    wb.save(destino)
@@ -0,0 +1,151 @@
+"""
+Tabelas de faixas do INSS e do IRRF compiladas uma única vez.
+
+O JSON da barra lateral é analisado e convertido em arrays ordenados
+(limites, alíquotas, parcelas a deduzir e INSS acumulado por faixa) apenas
+quando o texto muda; a consulta de uma faixa é uma busca binária
+(np.searchsorted), tanto para um valor quanto para um array de valores.
+"""
+import hashlib
+import json
+import logging
+
+import numpy as np
+
+logger = logging.getLogger("eficicash")
+
+# Padrões ilustrativos da barra lateral do app (o usuário pode editar o JSON)
+FAIXAS_INSS_PADRAO = [
+    {"min": 0.0, "max": 1212.00, "aliquota": 7.5},
+    {"min": 1212.01, "max": 2427.35, "aliquota": 9.0},
+    {"min": 2427.36, "max": 3641.03, "aliquota": 12.0},
+    {"min": 3641.04, "max": 7087.22, "aliquota": 14.0},
+]
+FAIXAS_IRRF_PADRAO = [
+    {"min": 0.0, "max": 1903.98, "aliquota": 0.0, "parcela": 0.0},
+    {"min": 1903.99, "max": 2826.65, "aliquota": 7.5, "parcela": 142.80},
+    {"min": 2826.66, "max": 3751.05, "aliquota": 15.0, "parcela": 354.80},
+    {"min": 3751.06, "max": 4664.68, "aliquota": 22.5, "parcela": 636.13},
+    {"min": 4664.69, "max": None, "aliquota": 27.5, "parcela": 869.36},
+]
+
+# tabelas compiladas, indexadas pelo hash do texto JSON e do padrão (mantém as mais recentes)
+_TABELAS_CACHE = {}
+_TABELAS_CACHE_MAX = 32
+
+
+def safe_load_json_list(txt, default):
+    try:
+        parsed = json.loads(txt)
+        if isinstance(parsed, list):
+            return parsed
+    except Exception as e:
+        logger.warning("Erro ao analisar JSON: %s", e)
+    return default
+
+
+class TabelaFaixas:
+    """
+    Tabela progressiva compilada. As faixas são ordenadas por "min" e não podem
+    se sobrepor (o "max" de uma faixa pode ser igual ao "min" da seguinte);
+    apenas a última pode ter "max" nulo (sem teto). Tabela vazia é inválida.
+    """
+
+    def __init__(self, faixas):
+        if not faixas:
+            raise ValueError("Tabela de faixas vazia")
+        faixas = sorted(faixas, key=lambda f: float(f.get("min", 0.0)))
+        self.faixas = faixas
+        self.minimos = np.array([float(f.get("min", 0.0)) for f in faixas], dtype="float64")
+        self.maximos = np.array(
+            [np.inf if f.get("max", None) is None else float(f.get("max")) for f in faixas], dtype="float64"
+        )
+        self.aliquotas = np.array([float(f.get("aliquota", 0.0)) / 100.0 for f in faixas], dtype="float64")
+        self.parcelas = np.array([float(f.get("parcela", 0.0)) for f in faixas], dtype="float64")
+        if np.any(self.maximos[:-1] > self.minimos[1:]):
+            raise ValueError("Faixas sobrepostas: o 'max' de uma faixa é maior que o 'min' da seguinte")
+        # INSS das faixas anteriores cheias; acumulado[k] = soma das faixas 0..k-1
+        acumulado = [0.0]
+        for fmin, fmax, ali in zip(self.minimos[:-1], self.maximos[:-1], self.aliquotas[:-1]):
+            acumulado.append(acumulado[-1] + (fmax - fmin) * ali)
+        self.acumulado = np.array(acumulado, dtype="float64")
+        self.chave = hashlib.sha1(json.dumps(faixas, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def __len__(self):
+        return len(self.faixas)
+
+    def __iter__(self):
+        return iter(self.faixas)
+
+    def inss(self, salario_bruto):
+        """INSS progressivo (total) para um valor ou array de salários brutos."""
+        sb = np.asarray(salario_bruto, dtype="float64")
+        # k = última faixa com min < salário; antes da primeira não há contribuição
+        k = np.searchsorted(self.minimos, sb, side="left") - 1
+        valido = k >= 0
+        k = np.where(valido, k, 0)
+        parcial = np.maximum(0.0, np.minimum(sb, self.maximos[k]) - self.minimos[k]) * self.aliquotas[k]
+        total = np.where(valido, self.acumulado[k] + parcial, 0.0)
+        return float(total) if total.ndim == 0 else total
+
+    def parcelas_inss(self, salario_bruto):
+        """Detalhe por faixa (para exibição), no mesmo formato de calc_inss_progressivo."""
+        parcelas = []
+        for f, fmin, fmax, ali in zip(self.faixas, self.minimos, self.maximos, self.aliquotas):
+            if salario_bruto <= fmin:
+                base_faixa = 0.0
+            else:
+                base_faixa = max(0.0, min(salario_bruto, fmax) - fmin)
+            parcelas.append({
+                "faixa": f"{fmin:.2f} - {('∞' if np.isinf(fmax) else f'{fmax:.2f}')}",
+                "base": float(base_faixa),
+                "aliquota": f.get("aliquota", 0.0),
+                "valor": float(base_faixa * ali),
+            })
+        return parcelas
+
+    def indice_faixa(self, base):
+        """Índice da faixa que contém `base` (primeira com max >= base), ou -1 se nenhuma."""
+        b = np.asarray(base, dtype="float64")
+        k = np.searchsorted(self.maximos, b, side="left")
+        dentro = k < len(self.faixas)
+        k = np.where(dentro, k, 0)
+        valido = dentro & (b >= self.minimos[k])
+        idx = np.where(valido, k, -1)
+        return int(idx) if idx.ndim == 0 else idx
+
+    def irrf(self, base):
+        """IRRF (alíquota x base - parcela a deduzir, mínimo zero) para um valor ou array de bases."""
+        b = np.asarray(base, dtype="float64")
+        k = np.asarray(self.indice_faixa(b))
+        kk = np.where(k >= 0, k, 0)
+        valor = np.where(k >= 0, np.maximum(0.0, b * self.aliquotas[kk] - self.parcelas[kk]), 0.0)
+        return float(valor) if valor.ndim == 0 else valor
+
+
+def compilar_faixas(faixas):
+    """Aceita uma lista de dicionários (ou uma TabelaFaixas já compilada)."""
+    if isinstance(faixas, TabelaFaixas):
+        return faixas
+    return TabelaFaixas(faixas)
+
+
+def carregar_tabela(texto_json, default):
+    """
+    Converte o JSON da barra lateral em TabelaFaixas, reaproveitando a tabela
+    compilada quando o mesmo texto já foi visto (cache pelo hash do texto e do padrão).
+    JSON inválido ou faixas inconsistentes usam a tabela `default`.
+    """
+    # o padrão entra na chave: o mesmo texto inválido cai em padrões diferentes no INSS e no IRRF
+    chave = hashlib.sha1((texto_json + json.dumps(default, sort_keys=True, default=str)).encode("utf-8")).hexdigest()
+    tabela = _TABELAS_CACHE.get(chave)
+    if tabela is None:
+        try:
+            tabela = TabelaFaixas(safe_load_json_list(texto_json, default))
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning("Faixas inválidas, usando padrão: %s", e)
+            tabela = TabelaFaixas(default)
+        if len(_TABELAS_CACHE) >= _TABELAS_CACHE_MAX:
+            _TABELAS_CACHE.pop(next(iter(_TABELAS_CACHE)))
+        _TABELAS_CACHE[chave] = tabela
+    return tabela
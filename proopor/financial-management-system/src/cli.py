@@ -0,0 +1,140 @@
+"""Headless batch runner for the financial pipeline.
+
+    python src/cli.py statements/ -o reports/
+    python src/cli.py january.csv february.xlsx -o reports/ --plot --timing
+
+For every input file it runs load_data -> clean_data -> build_cashflow ->
+metrics and writes <name>_report.xlsx (cleaned data), <name>_cashflow.csv
+and <name>_metrics.json to the output directory; --plot adds
+<name>_cashflow.png. Streamlit is never imported and matplotlib only with
+--plot, so a cron run starts in a fraction of a second. The exit status is
+non-zero if any file failed.
+"""
+import time
+
+_STARTED_WALL = time.time()
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+logger = logging.getLogger('fms.cli')
+
+INPUT_EXTENSIONS = ('.csv', '.xlsx')
+HEAVY_MODULES = ('streamlit', 'matplotlib', 'pyarrow', 'openpyxl', 'pandas')
+
+
+def find_inputs(paths):
+    """Expand directories into their CSV/XLSX files (sorted); files are kept as given."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith(INPUT_EXTENSIONS)
+            )
+        else:
+            found.append(path)
+    return found
+
+
+def _metrics(cleaned, cashflow):
+    """compute_metrics when the file has Income/Expenses columns, else the cashflow summary."""
+    if {'Income', 'Expenses'} <= set(cleaned.columns):
+        from analysis.metrics import compute_metrics
+        return compute_metrics(cleaned)
+    from processing.cashflow import CashflowEngine
+    return CashflowEngine.from_transactions(cashflow).summary()
+
+
+def _save_plot(cashflow, path):
+    from visualization.plots import create_cashflow_plot
+
+    with open(path, 'wb') as f:
+        f.write(create_cashflow_plot(cashflow))
+
+
+def process_file(path, output_dir, plot=False, use_cache=True):
+    """Run the pipeline on one file; returns {output name: path} and per-stage seconds."""
+    from data.input import clean_data, load_data
+    from processing.financial_processing import build_cashflow
+    from reporting.report import generate_excel_report
+
+    timings = {}
+    stem = os.path.splitext(os.path.basename(path))[0]
+    outputs = {}
+
+    def stage(name, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        timings[name] = time.perf_counter() - start
+        return result
+
+    data = stage('load', lambda: load_data(path, use_cache=use_cache))
+    cleaned = stage('clean', clean_data, data)
+    cashflow = stage('cashflow', build_cashflow, cleaned)
+    metrics = stage('metrics', _metrics, cleaned, cashflow)
+
+    outputs['report'] = os.path.join(output_dir, f'{stem}_report.xlsx')
+    stage('excel', generate_excel_report, cleaned, outputs['report'])
+    outputs['cashflow'] = os.path.join(output_dir, f'{stem}_cashflow.csv')
+    cashflow.to_csv(outputs['cashflow'], index=False)
+    outputs['metrics'] = os.path.join(output_dir, f'{stem}_metrics.json')
+    with open(outputs['metrics'], 'w', encoding='utf-8') as f:
+        json.dump(metrics, f, indent=2, default=str)
+    if plot:
+        outputs['plot'] = os.path.join(output_dir, f'{stem}_cashflow.png')
+        stage('plot', _save_plot, cashflow, outputs['plot'])
+    return outputs, timings
+
+
+def _process_age():
+    """Seconds since the interpreter process started (Linux /proc), else since this module loaded."""
+    try:
+        started = os.stat(f'/proc/{os.getpid()}').st_ctime
+    except OSError:
+        started = _STARTED_WALL
+    return time.time() - min(started, _STARTED_WALL)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Run the financial pipeline on CSV/XLSX files without the web UI.')
+    parser.add_argument('inputs', nargs='+', help='input files or directories')
+    parser.add_argument('-o', '--output-dir', default='reports', help='where reports are written (default: reports)')
+    parser.add_argument('--plot', action='store_true', help='also write a cashflow PNG (imports matplotlib)')
+    parser.add_argument('--no-cache', action='store_true', help='always re-parse inputs instead of using the parsed-file cache')
+    parser.add_argument('--timing', action='store_true', help='print cold-start and per-stage times to stderr')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format='%(levelname)s %(message)s')
+    cold_start = _process_age()
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    failures = 0
+    for path in find_inputs(args.inputs):
+        try:
+            outputs, timings = process_file(path, args.output_dir, plot=args.plot, use_cache=not args.no_cache)
+        except Exception as e:
+            failures += 1
+            logger.error('%s: %s', path, e)
+            continue
+        print(f"{path}: {', '.join(outputs.values())}")
+        if args.timing:
+            stages = ' '.join(f'{name}={seconds * 1000:.0f}ms' for name, seconds in timings.items())
+            print(f'  {stages}', file=sys.stderr)
+
+    if args.timing:
+        loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+        print(f'cold start {cold_start * 1000:.0f}ms; total {_process_age() * 1000:.0f}ms; '
+              f"heavy modules loaded: {', '.join(loaded) or 'none'}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""On-disk cache of parsed input files.
+
+Parsed frames are stored as Feather files named after a SHA-256 of the raw
+file content, so a re-upload of the same statement (or a Streamlit rerun)
+is a memory-mapped read instead of a CSV/XLSX parse. The cache directory is
+size-bounded; the least recently used entries are evicted first.
+
+pyarrow is optional: without it every call is a cache miss.
+"""
+import hashlib
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get(
+    "FMS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "financial-management-system")
+)
+CACHE_MAX_BYTES = int(os.environ.get("FMS_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# bumped whenever the parsing in load_data changes, so old entries stop matching
+CACHE_VERSION = "2"
+
+
+def _feather():
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        return None
+    return feather
+
+
+def file_digest(source, chunk_size=1024 * 1024):
+    """SHA-256 of a path or binary file-like object (the stream position is restored)."""
+    digest = hashlib.sha256()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    position = source.tell()
+    source.seek(0)
+    for chunk in iter(lambda: source.read(chunk_size), b""):
+        digest.update(chunk)
+    source.seek(position)
+    return digest.hexdigest()
+
+
+def cache_key(digest, *params):
+    """Combine the content digest with the parameters that affect parsing."""
+    return hashlib.sha256("|".join([CACHE_VERSION, digest, *map(str, params)]).encode("utf-8")).hexdigest()
+
+
+def _entry_path(key, cache_dir):
+    return os.path.join(cache_dir, f"{key}.feather")
+
+
+def get(key, cache_dir=None):
+    """Return the cached DataFrame for `key`, or None on a miss."""
+    feather = _feather()
+    if feather is None:
+        return None
+    path = _entry_path(key, cache_dir or CACHE_DIR)
+    try:
+        table = feather.read_table(path, memory_map=True)
+    except FileNotFoundError:
+        return None
+    except Exception as e:  # corrupt or truncated entry
+        logger.warning("Discarding unreadable cache entry %s: %s", path, e)
+        _remove(path)
+        return None
+    # mtime doubles as the LRU timestamp
+    os.utime(path)
+    return table.to_pandas()
+
+
+def put(key, data, cache_dir=None, max_bytes=None):
+    """Store `data` under `key` and evict old entries beyond `max_bytes`."""
+    feather = _feather()
+    if feather is None:
+        return False
+    cache_dir = cache_dir or CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _entry_path(key, cache_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        feather.write_feather(data.reset_index(drop=True), tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+    except Exception as e:  # e.g. mixed-type object columns Arrow cannot store
+        logger.warning("Could not cache parsed data: %s", e)
+        _remove(tmp_path)
+        return False
+    evict(cache_dir, CACHE_MAX_BYTES if max_bytes is None else max_bytes)
+    return True
+
+
+def evict(cache_dir=None, max_bytes=None):
+    """Delete least recently used entries until the cache fits in `max_bytes`."""
+    cache_dir = cache_dir or CACHE_DIR
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not os.path.isdir(cache_dir):
+        return 0
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".feather"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        _remove(path)
+        total -= size
+    return total
+
+
+def clear(cache_dir=None):
+    """Remove every cached entry."""
+    evict(cache_dir, 0)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
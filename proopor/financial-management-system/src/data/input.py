@@ -1,15 +1,70 @@
-def load_data(file_path):
+def _file_type(file_path, file_type=None):
+    if file_type is not None:
+        return {'xlsx': 'excel'}.get(file_type, file_type)
+    name = file_path if isinstance(file_path, str) else getattr(file_path, 'name', '')
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith('.xlsx'):
+        return 'excel'
+    raise ValueError("Unsupported file format. Please provide a CSV or Excel file.")
+
+def load_data(file_path, file_type=None, use_cache=True, schema=True):
+    """Load a CSV/XLSX path or uploaded file; parsed frames are cached by file content (see data/cache.py).
+
+    With `schema`, headers and types are normalized by data/schema.py.
+    """
     import pandas as pd
-    
-    if file_path.endswith('.csv'):
-        data = pd.read_csv(file_path)
-    elif file_path.endswith('.xlsx'):
-        data = pd.read_excel(file_path)
-    else:
+    from . import cache
+    from .schema import apply_schema, memory_report
+
+    file_type = _file_type(file_path, file_type)
+    if file_type not in ('csv', 'excel'):
         raise ValueError("Unsupported file format. Please provide a CSV or Excel file.")
-    
+
+    key = cache.cache_key(cache.file_digest(file_path), file_type, schema) if use_cache else None
+    if key is not None:
+        data = cache.get(key)
+        if data is not None:
+            return data
+
+    if hasattr(file_path, 'seek'):
+        file_path.seek(0)
+    if file_type == 'csv':
+        data = pd.read_csv(file_path, skipinitialspace=schema)
+    else:
+        data = pd.read_excel(file_path)
+    if schema:
+        typed = apply_schema(data)
+        memory_report(data, typed)
+        data = typed
+
+    if key is not None:
+        cache.put(key, data)
     return data
 
+def iter_data_chunks(file_path, chunksize=100_000, columns=None, schema=True):
+    """Yield a CSV path or uploaded file as DataFrames of at most `chunksize` rows.
+
+    `columns` restricts parsing to the columns actually needed (canonical
+    names, see data/schema.py). Excel files cannot be read incrementally and are rejected.
+    """
+    import pandas as pd
+    from .schema import apply_schema, canonical_name
+
+    if _file_type(file_path) != 'csv':
+        raise ValueError("Streaming is only supported for CSV files.")
+    if hasattr(file_path, 'seek'):
+        file_path.seek(0)
+    usecols = None if columns is None else (lambda c: canonical_name(c) in columns)
+    with pd.read_csv(file_path, chunksize=chunksize, usecols=usecols, skipinitialspace=schema) as reader:
+        for chunk in reader:
+            yield apply_schema(chunk) if schema else chunk
+
+def iter_clean_chunks(file_path, chunksize=100_000, columns=None, schema=True):
+    """Like iter_data_chunks, with clean_data applied to each chunk."""
+    for chunk in iter_data_chunks(file_path, chunksize, columns, schema):
+        yield clean_data(chunk)
+
 def clean_data(data):
     # Remove any rows with missing values
     cleaned_data = data.dropna()
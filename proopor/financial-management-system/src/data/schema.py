@@ -0,0 +1,116 @@
+"""Schema registry for the known financial columns.
+
+Applied by load_data right after parsing: header names are stripped and
+mapped to a canonical name (" amount", "Valor" -> "Amount"), dates become
+datetime64, amounts and ids get the smallest exact numeric type and
+low-cardinality text columns become categoricals. Columns not in the
+registry are kept with their stripped name and inferred type.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+# canonical name -> kind and lower-case aliases accepted in file headers
+SCHEMA = {
+    'Id': {'kind': 'integer', 'aliases': ('id', 'codigo', 'código')},
+    'Date': {'kind': 'datetime', 'aliases': ('date', 'data', 'dt')},
+    'Description': {'kind': 'text', 'aliases': ('description', 'descricao', 'descrição', 'historico', 'histórico')},
+    'Amount': {'kind': 'amount', 'aliases': ('amount', 'valor', 'value')},
+    'Category': {'kind': 'category', 'aliases': ('category', 'categoria')},
+    'Type': {'kind': 'category', 'aliases': ('type', 'tipo')},
+}
+
+_ALIASES = {alias: name for name, spec in SCHEMA.items() for alias in (name.lower(),) + spec['aliases']}
+
+# text columns with at most this share of distinct values become categoricals
+CATEGORICAL_MAX_RATIO = 0.5
+
+
+def canonical_name(column):
+    """Canonical name for a header, or the stripped header if it is not in the registry."""
+    stripped = str(column).strip()
+    return _ALIASES.get(stripped.lower(), stripped)
+
+
+def normalize_columns(data):
+    """Rename the columns of `data` in place to their canonical names."""
+    data.columns = [canonical_name(c) for c in data.columns]
+    return data
+
+
+def _to_datetime(values):
+    import pandas as pd
+
+    if values.dtype.kind == 'M':
+        return values
+    sample = values.dropna().astype(str).str.strip()
+    sample = sample.iloc[0] if len(sample) else ''
+    if sample[4:5] == '-':
+        return pd.to_datetime(values, errors='coerce', format='ISO8601')
+    # dd/mm/yyyy (bank statements) is parsed day first; everything else is inferred
+    dayfirst = sample[2:3] == '/'
+    return pd.to_datetime(values, errors='coerce', dayfirst=dayfirst)
+
+
+def _to_amount(values):
+    import numpy as np
+    import pandas as pd
+
+    numbers = pd.to_numeric(values, errors='coerce')
+    valid = numbers.dropna()
+    if len(valid) == len(numbers) and len(valid) and np.array_equal(valid, np.round(valid)):
+        # whole amounts; pandas promotes int32 sums to int64, so totals cannot overflow
+        return numbers.astype('int32' if valid.abs().max() < 2 ** 31 else 'int64')
+    # fractional amounts stay float64: float32 cannot hold cent-exact totals
+    return numbers.astype('float64')
+
+
+def _to_integer(values):
+    import pandas as pd
+
+    numbers = pd.to_numeric(values, errors='coerce')
+    if numbers.isna().any():
+        return numbers
+    return pd.to_numeric(numbers, downcast='integer')
+
+
+def _to_category(values, max_ratio):
+    if values.dtype.name == 'category' or len(values) == 0:
+        return values
+    if values.nunique(dropna=True) <= max_ratio * len(values):
+        return values.astype('category')
+    return values
+
+
+def apply_schema(data, categorical_max_ratio=CATEGORICAL_MAX_RATIO):
+    """Return `data` with canonical column names and the registry's compact types."""
+    from pandas.api.types import is_string_dtype
+
+    data = normalize_columns(data.copy(deep=False))
+    converters = {
+        'datetime': _to_datetime,
+        'amount': _to_amount,
+        'integer': _to_integer,
+        'category': lambda v: _to_category(v, 1.0),
+        'text': lambda v: _to_category(v, categorical_max_ratio),
+    }
+    for column in data.columns:
+        spec = SCHEMA.get(column)
+        if spec is not None:
+            data[column] = converters[spec['kind']](data[column])
+        elif is_string_dtype(data[column].dtype):
+            data[column] = _to_category(data[column], categorical_max_ratio)
+    return data
+
+
+def memory_report(before, after):
+    """Deep memory usage of two frames, in bytes, and the reduction factor."""
+    before_bytes = int(before.memory_usage(deep=True).sum())
+    after_bytes = int(after.memory_usage(deep=True).sum())
+    report = {
+        'before_bytes': before_bytes,
+        'after_bytes': after_bytes,
+        'ratio': before_bytes / after_bytes if after_bytes else float('inf'),
+    }
+    logger.info("Schema applied: %(before_bytes)d -> %(after_bytes)d bytes (%(ratio).1fx)", report)
+    return report
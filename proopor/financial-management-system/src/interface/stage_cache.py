@@ -0,0 +1,84 @@
+"""In-process cache for the pipeline stages run by the Streamlit entry points.
+
+Every widget interaction reruns the whole script; the stages (load, clean,
+cashflow, metrics) only need to run again when the uploaded file or the
+stage parameters change. Results are kept by (stage, file digest, params),
+returned as the same object on every hit (treat them as read-only), and
+evicted least-recently-used once the estimated total size passes a cap.
+
+One StageCache is shared by all sessions of the process (see
+`st.cache_resource` in main.py and streamlit_app.py).
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = int(os.environ.get("FMS_STAGE_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+
+def estimate_size(obj):
+    """Approximate memory footprint of a stage result, in bytes."""
+    memory_usage = getattr(obj, "memory_usage", None)
+    if memory_usage is not None:
+        usage = memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_size(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class StageCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def run(self, stage, digest, compute, *params):
+        """Return the cached result of `stage` for this file/params, calling `compute()` on a miss."""
+        key = (stage, digest, params)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+        value = compute()
+        self._store(key, value)
+        return value
+
+    def _store(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            if size > self.max_bytes:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total -= old[1]
+            self._entries[key] = (value, size)
+            self._total += size
+            while self._total > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._total -= evicted
+
+    def invalidate(self, digest=None, stage=None):
+        """Drop entries for one file and/or one stage; with no arguments, drop everything."""
+        with self._lock:
+            for key in list(self._entries):
+                if (digest is None or key[1] == digest) and (stage is None or key[0] == stage):
+                    self._total -= self._entries.pop(key)[1]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
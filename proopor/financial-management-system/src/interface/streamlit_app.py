@@ -1,44 +1,55 @@
 import streamlit as st
 import pandas as pd
+from src.data.cache import file_digest
 from src.data.input import load_data, clean_data
+from src.interface.stage_cache import StageCache
 from src.processing.financial_processing import build_cashflow, generate_cashflow_report
 from src.analysis.metrics import compute_metrics
-from src.visualization.plots import create_cashflow_plot, create_revenue_expense_bar
+from src.visualization.plots import create_cashflow_plot, create_category_donut, create_revenue_expense_bar
 from src.reporting.report import generate_excel_report
 
+@st.cache_resource
+def get_stage_cache():
+    return StageCache()
+
 def main():
     st.title("Financial Management System")
 
     st.sidebar.header("Upload Data")
     uploaded_file = st.sidebar.file_uploader("Choose a CSV or Excel file", type=["csv", "xlsx"])
 
-    if uploaded_file is not None:
-        if uploaded_file.name.endswith('.csv'):
-            data = load_data(uploaded_file)
-        else:
-            data = load_data(uploaded_file, file_type='excel')
+    cache = get_stage_cache()
+    if st.sidebar.button("Clear cache"):
+        cache.invalidate()
 
-        cleaned_data = clean_data(data)
+    if uploaded_file is not None:
+        # each stage reruns only when the file content changes
+        digest = file_digest(uploaded_file)
+        file_type = 'csv' if uploaded_file.name.endswith('.csv') else 'excel'
+        data = cache.run('load', digest, lambda: load_data(uploaded_file, file_type=file_type), file_type)
+        cleaned_data = cache.run('clean', digest, lambda: clean_data(data))
         st.write("Cleaned Data", cleaned_data)
 
         if st.sidebar.button("Generate Cashflow Report"):
-            cashflow = build_cashflow(cleaned_data)
+            cashflow = cache.run('cashflow', digest, lambda: build_cashflow(cleaned_data))
             report = generate_cashflow_report(cashflow)
             st.write("Cashflow Report", report)
 
             st.sidebar.download_button("Download Report", report, file_name="cashflow_report.xlsx")
 
         if st.sidebar.button("Show Metrics"):
-            metrics = compute_metrics(cleaned_data)
+            metrics = cache.run('metrics', digest, lambda: compute_metrics(cleaned_data))
             st.write("Financial Metrics", metrics)
 
         if st.sidebar.button("Visualize Cashflow"):
-            create_cashflow_plot(cleaned_data)
-            st.pyplot()
+            cashflow = cache.run('cashflow', digest, lambda: build_cashflow(cleaned_data))
+            st.image(create_cashflow_plot(cashflow))
 
         if st.sidebar.button("Revenue vs Expense"):
-            create_revenue_expense_bar(cleaned_data)
-            st.pyplot()
+            st.image(create_revenue_expense_bar(cleaned_data))
+
+        if st.sidebar.button("Expense Breakdown"):
+            st.image(create_category_donut(cleaned_data))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
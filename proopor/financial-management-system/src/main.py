@@ -1,35 +1,54 @@
 # filepath: financial-management-system/src/main.py
 
 import streamlit as st
+from data.cache import file_digest
 from data.input import load_data, clean_data
+from interface.stage_cache import StageCache
+from processing.cashflow import CashflowEngine
 from processing.financial_processing import build_cashflow, generate_cashflow_report
 from analysis.metrics import compute_metrics
 from visualization.plots import create_cashflow_plot
 from reporting.report import generate_excel_report
 
+@st.cache_resource
+def get_stage_cache():
+    return StageCache()
+
 def main():
     st.title("Financial Management System")
     
     st.sidebar.header("Upload Data")
     uploaded_file = st.sidebar.file_uploader("Choose a CSV or Excel file", type=["csv", "xlsx"])
     
+    cache = get_stage_cache()
+    if st.sidebar.button("Clear cache"):
+        cache.invalidate()
+
     if uploaded_file is not None:
-        data = load_data(uploaded_file)
-        cleaned_data = clean_data(data)
+        # each stage reruns only when the file content changes
+        digest = file_digest(uploaded_file)
+        data = cache.run('load', digest, lambda: load_data(uploaded_file))
+        cleaned_data = cache.run('clean', digest, lambda: clean_data(data))
         
         st.subheader("Cleaned Data")
         st.write(cleaned_data)
         
-        cashflow = build_cashflow(cleaned_data)
+        cashflow = cache.run('cashflow', digest, lambda: build_cashflow(cleaned_data))
         st.subheader("Cashflow")
         st.write(cashflow)
+
+        engine = cache.run('cashflow_engine', digest, lambda: CashflowEngine.from_transactions(cleaned_data))
+        granularity = st.radio("Period", ["Daily", "Weekly", "Monthly"], horizontal=True)
+        period_series = cache.run('cashflow_series', digest, lambda: engine.series(granularity[0]), granularity)
+        st.write(period_series)
+        st.write(engine.summary())
         
-        metrics = compute_metrics(cashflow)
+        metrics = cache.run('metrics', digest, lambda: compute_metrics(cashflow))
         st.subheader("Financial Metrics")
         st.write(metrics)
         
         st.subheader("Cashflow Plot")
-        create_cashflow_plot(cashflow)
+        st.image(create_cashflow_plot(cashflow))
         
         if st.button("Generate Cashflow Report"):
             report = generate_cashflow_report(cashflow)
@@ -0,0 +1,148 @@
+"""Cashflow engine: daily, weekly and monthly series from one pass over transactions.
+
+Transactions are reduced once to net cents per calendar day, kept in a dense
+day-indexed array (days without movement are zero). Everything else derives
+from that array and its cumulative sum:
+
+- balance on day i          = opening + cumsum[i]
+- rolling k-day net flow    = cumsum[i] - cumsum[i - k]
+- weekly/monthly net, end-of-period balance and min/max balance.
+
+New transactions are folded in with `add`: appending after the last day only
+extends the arrays; a back-dated entry shifts the cumulative sum from that
+day on. The history is never regrouped.
+"""
+from .money import from_cents, to_cents
+
+ROLLING_WINDOWS = (7, 30, 90)
+
+
+class CashflowEngine:
+    def __init__(self, opening_balance=0.0):
+        import numpy as np
+
+        self.opening_cents = to_cents(opening_balance)
+        self._start = None  # numpy datetime64[D] of index 0
+        self._daily = np.zeros(0, dtype='int64')
+        self._cumulative = np.zeros(0, dtype='int64')
+
+    @classmethod
+    def from_transactions(cls, data, date_column='Date', amount_column='Amount', opening_balance=0.0):
+        engine = cls(opening_balance)
+        engine.add(data, date_column, amount_column)
+        return engine
+
+    def __len__(self):
+        return len(self._daily)
+
+    def _day_totals(self, data, date_column, amount_column):
+        """Net cents per day of `data`, as (sorted unique days, cents)."""
+        import numpy as np
+        import pandas as pd
+
+        dates = pd.to_datetime(data[date_column], errors='coerce')
+        amounts = pd.to_numeric(data[amount_column], errors='coerce')
+        valid = dates.notna() & amounts.notna()
+        days = dates[valid].to_numpy().astype('datetime64[D]')
+        cents = to_cents(amounts[valid].to_numpy())
+        order = np.argsort(days, kind='stable')
+        days, cents = days[order], cents[order]
+        unique_days, starts = np.unique(days, return_index=True)
+        return unique_days, np.add.reduceat(cents, starts) if len(cents) else cents
+
+    def add(self, data, date_column='Date', amount_column='Amount'):
+        """Fold new transactions into the series."""
+        import numpy as np
+
+        days, cents = self._day_totals(data, date_column, amount_column)
+        if len(days) == 0:
+            return self
+        if self._start is None:
+            self._start = days[0]
+        elif days[0] < self._start:
+            # earlier than anything seen: shift the arrays right
+            shift = int((self._start - days[0]).astype(int))
+            self._daily = np.concatenate([np.zeros(shift, dtype='int64'), self._daily])
+            self._cumulative = np.concatenate([np.zeros(shift, dtype='int64'), self._cumulative])
+            self._start = days[0]
+        positions = (days - self._start).astype('int64')
+        end = int(positions[-1]) + 1
+        old_len = len(self._daily)
+        if end > old_len:
+            last = self._cumulative[-1] if old_len else 0
+            self._daily = np.concatenate([self._daily, np.zeros(end - old_len, dtype='int64')])
+            self._cumulative = np.concatenate([self._cumulative, np.full(end - old_len, last, dtype='int64')])
+        np.add.at(self._daily, positions, cents)
+        # only the suffix from the first affected day changes
+        delta = np.zeros(len(self._daily) - int(positions[0]), dtype='int64')
+        np.add.at(delta, positions - positions[0], cents)
+        self._cumulative[int(positions[0]):] += np.cumsum(delta)
+        return self
+
+    def _dates(self):
+        import numpy as np
+        import pandas as pd
+
+        return pd.DatetimeIndex(self._start + np.arange(len(self._daily)), name='Date') if len(self._daily) else pd.DatetimeIndex([], name='Date')
+
+    def daily(self, windows=ROLLING_WINDOWS):
+        """Per-day net flow, balance and rolling k-day net flows."""
+        import numpy as np
+        import pandas as pd
+
+        balance = self.opening_cents + self._cumulative
+        frame = {'Amount': from_cents(self._daily), 'Balance': from_cents(balance)}
+        padded = np.concatenate([[0], self._cumulative])
+        for k in windows:
+            previous = padded[np.maximum(np.arange(len(self._daily)) + 1 - k, 0)]
+            frame[f'Rolling{k}'] = from_cents(self._cumulative - previous)
+        return pd.DataFrame(frame, index=self._dates()).reset_index()
+
+    def series(self, freq='D'):
+        """Cashflow by period: 'D' (see daily), 'W' (weeks ending Sunday) or 'M' (calendar months).
+
+        Coarser periods carry net flow, end-of-period balance and min/max daily balance.
+        """
+        import pandas as pd
+
+        if freq == 'D':
+            return self.daily()
+        rule = {'W': 'W-SUN', 'M': 'ME'}[freq]
+        daily = pd.DataFrame(
+            {'Amount': self._daily, 'Balance': self.opening_cents + self._cumulative}, index=self._dates()
+        )
+        grouped = daily.resample(rule)
+        result = pd.DataFrame({
+            'Amount': grouped['Amount'].sum(),
+            'Balance': grouped['Balance'].last(),
+            'MinBalance': grouped['Balance'].min(),
+            'MaxBalance': grouped['Balance'].max(),
+        })
+        for column in result.columns:
+            result[column] = from_cents(result[column].to_numpy())
+        return result.reset_index()
+
+    def weekly(self):
+        return self.series('W')
+
+    def monthly(self):
+        return self.series('M')
+
+    def summary(self):
+        """Totals and balance extremes over the whole history."""
+        import numpy as np
+
+        if not len(self._daily):
+            return {'Total Cashflow': 0.0, 'Average Daily Cashflow': 0.0, 'Min Balance': None, 'Max Balance': None}
+        balance = self.opening_cents + self._cumulative
+        dates = self._dates()
+        low, high = int(np.argmin(balance)), int(np.argmax(balance))
+        return {
+            'Total Cashflow': from_cents(self._cumulative[-1]),
+            'Average Daily Cashflow': from_cents(self._cumulative[-1]) / len(self._daily),
+            'Closing Balance': from_cents(balance[-1]),
+            'Min Balance': from_cents(balance[low]),
+            'Min Balance Date': dates[low],
+            'Max Balance': from_cents(balance[high]),
+            'Max Balance Date': dates[high],
+        }
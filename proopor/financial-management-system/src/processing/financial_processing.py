@@ -1,12 +1,171 @@
+from .money import from_cents, to_cents
+
+def _cents(amounts):
+    import pandas as pd
+
+    amounts = amounts.dropna()
+    return pd.Series(to_cents(amounts), index=amounts.index, name=amounts.name)
+
 def build_cashflow(data):
-    cashflow = data.groupby('Date')['Amount'].sum().reset_index()
+    # summed in cents so daily totals are exact
+    cashflow = _cents(data['Amount']).groupby(data['Date']).sum().reset_index()
+    cashflow['Amount'] = from_cents(cashflow['Amount'])
+    return cashflow
+
+def build_cashflow_streaming(chunks, date_column='Date', amount_column='Amount'):
+    """Daily cashflow from an iterable of DataFrames (e.g. data.input.iter_clean_chunks).
+
+    Each chunk is reduced to per-date sums and merged into a running total, so
+    memory grows with the number of distinct dates, not with the number of rows.
+    Rows whose amount is not numeric or whose date is missing are dropped.
+    """
+    import pandas as pd
+
+    totals = None
+    for chunk in chunks:
+        amounts = pd.to_numeric(chunk[amount_column], errors='coerce')
+        valid = amounts.notna() & chunk[date_column].notna()
+        # partial sums in int64 cents: merging chunks is exact
+        partial = _cents(amounts[valid]).groupby(chunk.loc[valid, date_column]).sum()
+        totals = partial if totals is None else totals.add(partial, fill_value=0).astype('int64')
+    if totals is None:
+        return pd.DataFrame({date_column: [], amount_column: []})
+    totals = totals.sort_index()
+    totals.index.name = date_column
+    cashflow = totals.rename(amount_column).reset_index()
+    cashflow[amount_column] = from_cents(cashflow[amount_column])
     return cashflow
 
-def compute_dre(data):
-    revenue = data[data['Type'] == 'Revenue']['Amount'].sum()
-    expenses = data[data['Type'] == 'Expense']['Amount'].sum()
-    dre = revenue - expenses
-    return dre
+# DRE (income statement) hierarchy: the same groups, subtotals and category
+# overrides as proopor/dre.py (montar_dre). Duplicated for the same reason as
+# money.py; proopor/tests/test_dre.py checks that both build the same DRE.
+DRE_GROUPS = [
+    ('Receita Bruta', 1),
+    ('Deduções da Receita', -1),
+    ('Custos', -1),
+    ('Despesas Operacionais', -1),
+]
+DRE_SUBTOTALS = {
+    'Deduções da Receita': ('Receita Líquida', ['Receita Bruta', 'Deduções da Receita']),
+    'Custos': ('Lucro Bruto', ['Receita Bruta', 'Deduções da Receita', 'Custos']),
+    'Despesas Operacionais': ('Resultado Operacional', [g for g, _ in DRE_GROUPS]),
+}
+DRE_CATEGORY_GROUPS = {
+    'Deduções': 'Deduções da Receita',
+    'Impostos sobre vendas': 'Deduções da Receita',
+    'Devoluções': 'Deduções da Receita',
+    'Custos': 'Custos',
+    'CMV': 'Custos',
+    'CPV': 'Custos',
+}
+# Type values after normalize_type
+DRE_TYPE_GROUPS = {
+    'receita': 'Receita Bruta',
+    'revenue': 'Receita Bruta',
+    'income': 'Receita Bruta',
+    'despesa': 'Despesas Operacionais',
+    'expense': 'Despesas Operacionais',
+}
+# left out of the DRE on purpose; any other unmapped Type is logged
+DRE_EXCLUDED_TYPES = {'transferencia', 'transfer'}
+DRE_NO_CATEGORY = '(sem categoria)'
+
+
+def normalize_type(value):
+    """Lower case, no accents, no surrounding spaces ('Receita ', 'TRANSFERÊNCIA' -> 'receita', 'transferencia')."""
+    import unicodedata
+
+    decomposed = unicodedata.normalize('NFKD', str(value).strip())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def _type_groups(types):
+    """Position in DRE_GROUPS of each distinct Type (-1 = left out), warning about unmapped values."""
+    import logging
+
+    import numpy as np
+
+    position = {g: i for i, (g, _) in enumerate(DRE_GROUPS)}
+    normalized = [normalize_type(t) if isinstance(t, str) else '' for t in types]
+    groups = np.array([position.get(DRE_TYPE_GROUPS.get(n), -1) for n in normalized], dtype='int64')
+    unmapped = sorted({t if n else '(empty)' for t, n, g in zip(types, normalized, groups)
+                       if g < 0 and n not in DRE_EXCLUDED_TYPES})
+    if unmapped:
+        logging.getLogger(__name__).warning('DRE: rows with an unmapped Type were left out: %s', unmapped)
+    return groups
+
+
+def compute_dre(data, by_month=False, category_column='Category', type_column='Type',
+                amount_column='Amount', date_column='Date'):
+    """Hierarchical DRE from raw transactions in a single groupby.
+
+    Rows are classified by Type (by the sign of Amount when there is no Type
+    column); categories in DRE_CATEGORY_GROUPS move to their own group.
+    Amounts enter as absolute values, in cents, with the sign of their group.
+    Returns Account, Level (0 = group or subtotal, 1 = category), one column
+    per month (YYYY-MM) when `by_month`, and Total.
+    """
+    import numpy as np
+    import pandas as pd
+
+    position = {g: i for i, (g, _) in enumerate(DRE_GROUPS)}
+    amounts = pd.to_numeric(data[amount_column], errors='coerce').to_numpy(dtype='float64')
+    if type_column in data.columns:
+        type_codes, types = pd.factorize(data[type_column].astype(object))
+        types = list(types)
+        if (type_codes < 0).any():
+            types.append(None)  # missing Type: code -1 points at the last entry
+        group = _type_groups(types)[type_codes]
+    else:
+        group = np.where(amounts < 0, position['Despesas Operacionais'], position['Receita Bruta'])
+    cat_codes, categories = pd.factorize(data[category_column].astype(object), use_na_sentinel=False)
+    cat_group = np.array([position.get(DRE_CATEGORY_GROUPS.get(c), -1) if isinstance(c, str) else -1
+                          for c in categories], dtype='int64')[cat_codes]
+    group = np.where(group < 0, -1, np.where(cat_group >= 0, cat_group, group))
+    if by_month:
+        month_codes, months = pd.factorize(
+            pd.to_datetime(data[date_column], errors='coerce').dt.strftime('%Y-%m'), sort=True
+        )
+    else:
+        month_codes, months = np.zeros(len(data), dtype='int64'), np.array(['Total'])
+    names = pd.Series(categories, dtype='object').fillna('').astype(str).replace('', DRE_NO_CATEGORY).to_numpy()
+
+    # the only groupby: (group, category, month) -> cents
+    valid = (group >= 0) & ~np.isnan(amounts) & (month_codes >= 0)
+    if valid.any():
+        sums = (
+            pd.Series(to_cents(np.abs(amounts[valid])))
+            .groupby([group[valid], cat_codes[valid], month_codes[valid]]).sum()
+            .unstack(fill_value=0)
+            .reindex(columns=range(len(months)), fill_value=0)
+        )
+        row_group = sums.index.get_level_values(0).to_numpy()
+        row_category = sums.index.get_level_values(1).to_numpy()
+        cents = sums.to_numpy(dtype='int64')
+    else:
+        row_group = row_category = np.zeros(0, dtype='int64')
+        cents = np.zeros((0, len(months)), dtype='int64')
+    columns = list(months)
+    if by_month:
+        cents = np.column_stack([cents, cents.sum(axis=1)])
+        columns.append('Total')
+    zero = np.zeros(len(columns), dtype='int64')
+
+    lines, by_group = [], {}
+    for i, (name, sign) in enumerate(DRE_GROUPS):
+        selected = row_group == i
+        total = sign * cents[selected].sum(axis=0) if selected.any() else zero
+        by_group[name] = total
+        lines.append((name, 0, total))
+        for c, values in sorted(zip(row_category[selected], cents[selected]), key=lambda x: names[x[0]]):
+            lines.append((f'  {names[c]}', 1, sign * values))
+        if name in DRE_SUBTOTALS:
+            label, groups = DRE_SUBTOTALS[name]
+            lines.append((label, 0, sum(by_group.get(g, zero) for g in groups)))
+    return pd.DataFrame(
+        [[account, level, *from_cents(np.asarray(values, dtype='int64'))] for account, level, values in lines],
+        columns=['Account', 'Level', *columns],
+    )
 
 def generate_cashflow_report(cashflow):
     report = {
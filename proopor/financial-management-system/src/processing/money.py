@@ -0,0 +1,35 @@
+"""Money as int64 cents.
+
+Amounts are converted to cents once, rounding half a cent away from zero,
+and every aggregation is an integer sum; floats are produced again only for
+the returned frames. Totals therefore reconcile to the cent regardless of
+summation order or chunking.
+
+This is the same rounding policy as proopor/dinheiro.py (centavos/reais).
+The helpers are duplicated on purpose: this package is installed and run on
+its own and cannot import the payroll app's top-level modules. Keep the two
+in sync; proopor/tests/test_dinheiro.py checks that they agree.
+"""
+
+
+def to_cents(amounts):
+    """Amounts in currency units (scalar, array or Series) -> int64 cents.
+
+    Missing or non-finite amounts (None, NaN, inf) raise ValueError instead of
+    being cast to INT64_MIN; callers drop or mask them first.
+    """
+    import numpy as np
+
+    values = np.round(np.asarray(amounts, dtype='float64') * 100.0, 6)
+    if not np.isfinite(values).all():
+        raise ValueError('Missing or non-finite amount (NaN/inf)')
+    cents = (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype('int64')
+    return int(cents) if cents.ndim == 0 else cents
+
+
+def from_cents(cents):
+    """int64 cents -> float currency units."""
+    import numpy as np
+
+    values = np.asarray(cents, dtype='int64') / 100.0
+    return float(values) if values.ndim == 0 else values
@@ -1,49 +1,256 @@
-def create_cashflow_plot(cashflow_data):
-    import matplotlib.pyplot as plt
-
-    plt.figure(figsize=(10, 6))
-    plt.plot(cashflow_data['Date'], cashflow_data['Cashflow'], marker='o')
-    plt.title('Cashflow Over Time')
-    plt.xlabel('Date')
-    plt.ylabel('Cashflow')
-    plt.grid()
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.show()
-
-def create_revenue_expense_bar(revenue_data, expense_data):
-    import matplotlib.pyplot as plt
+"""Charts rendered off-screen to PNG/SVG bytes.
+
+Every function draws on its own matplotlib Figure (no pyplot global state,
+no GUI backend) and returns the encoded image, ready for st.image, a file or
+an HTTP response. Rendered images are kept in a small in-process LRU cache
+keyed by a hash of the plotted data and the drawing parameters, so a rerun
+with the same data does not draw again.
+
+Long cashflow series are reduced with LTTB (Largest-Triangle-Three-Buckets)
+before drawing: the first and last points are kept and each bucket
+contributes the point that spans the largest triangle with its neighbours,
+which preserves peaks and troughs that plain striding would drop.
+
+The category charts accept raw transactions: revenue and expense are summed
+per category in one groupby (by the Type column, read with the DRE vocabulary
+of processing.financial_processing, falling back to the sign of Amount when
+Type is missing or unknown) and everything past the top N categories is
+folded into a single "Outros" slice.
+"""
+import hashlib
+from collections import OrderedDict
+
+MAX_POINTS = 2000
+# markers only when they can still be told apart
+MARKER_MAX_POINTS = 100
+CACHE_MAX_ENTRIES = 32
+TOP_CATEGORIES = 10
+OTHER_LABEL = 'Outros'
+MIN_LABEL_SHARE = 0.02
+
+_rendered = OrderedDict()
+
+
+def lttb(x, y, threshold):
+    """Indices of the `threshold` points LTTB keeps from the series (x sorted ascending)."""
+    import numpy as np
+
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    # threshold - 2 buckets over the points between the first and the last
+    edges = np.linspace(1, n - 1, threshold - 1).astype('int64')
+    keep = np.empty(threshold, dtype='int64')
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def _data_key(name, frames, *params):
+    import pandas as pd
+
+    digest = hashlib.sha256(name.encode('utf-8'))
+    for frame in frames:
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+        digest.update('|'.join(map(str, frame.columns)).encode('utf-8'))
+    digest.update(repr(params).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _cached(key, draw, fmt):
+    """Encoded image for `key`, drawing it with `draw(figure)` on a miss."""
+    from io import BytesIO
+    from matplotlib.figure import Figure
+
+    if key in _rendered:
+        _rendered.move_to_end(key)
+        return _rendered[key]
+    fig = Figure()
+    draw(fig)
+    buffer = BytesIO()
+    fig.savefig(buffer, format=fmt)
+    image = buffer.getvalue()
+    _rendered[key] = image
+    while len(_rendered) > CACHE_MAX_ENTRIES:
+        _rendered.popitem(last=False)
+    return image
+
+
+def clear_cache():
+    _rendered.clear()
+
+
+def _kinds(transactions, amounts, type_column):
+    """'Revenue', 'Expense' or None (left out) per row.
+
+    Type is read with the DRE vocabulary (normalize_type + DRE_TYPE_GROUPS, so
+    'receita', 'Despesa ' and 'income' all count); DRE_EXCLUDED_TYPES are left
+    out and missing or unmapped values fall back to the sign of Amount.
+    """
+    import numpy as np
+    import pandas as pd
+
+    from ..processing.financial_processing import DRE_EXCLUDED_TYPES, DRE_TYPE_GROUPS, normalize_type
+
+    by_sign = np.where(amounts < 0, 'Expense', 'Revenue')
+    if type_column not in transactions.columns:
+        return pd.Series(by_sign, index=transactions.index)
+    kind_of_group = {'Receita Bruta': 'Revenue', 'Despesas Operacionais': 'Expense'}
+    codes, types = pd.factorize(transactions[type_column].astype(object))
+    known = []
+    for t in types:
+        normalized = normalize_type(t) if isinstance(t, str) else ''
+        known.append('' if normalized in DRE_EXCLUDED_TYPES else kind_of_group.get(DRE_TYPE_GROUPS.get(normalized)))
+    known = np.array(known + [None], dtype=object)[codes]  # code -1 (missing Type) -> None
+    kind = np.where(pd.isna(known), by_sign, known)
+    return pd.Series(kind, index=transactions.index).replace('', None)
+
+
+def category_totals(transactions, category_column='Category', amount_column='Amount', type_column='Type'):
+    """Revenue and Expense (both positive) per category from raw transactions, largest total first."""
+    import pandas as pd
+
+    amounts = pd.to_numeric(transactions[amount_column], errors='coerce')
+    kind = _kinds(transactions, amounts, type_column)
+    totals = (
+        amounts.abs().groupby([transactions[category_column].astype(str), kind], observed=True).sum()
+        .unstack(fill_value=0)
+        .reindex(columns=['Revenue', 'Expense'], fill_value=0)
+    )
+    totals.index.name = category_column
+    return totals.loc[totals.sum(axis=1).sort_values(ascending=False, kind='stable').index]
+
+
+def _aligned_totals(revenue_data, expense_data, category_column='Category', amount_column='Amount'):
+    """Pre-aggregated revenue/expense frames aligned on category name rather than row position."""
+    import pandas as pd
+
+    totals = pd.concat(
+        {
+            'Revenue': revenue_data.groupby(revenue_data[category_column].astype(str))[amount_column].sum(),
+            'Expense': expense_data.groupby(expense_data[category_column].astype(str))[amount_column].sum(),
+        },
+        axis=1,
+    ).fillna(0)
+    totals.index.name = category_column
+    return totals.loc[totals.sum(axis=1).sort_values(ascending=False, kind='stable').index]
+
+
+def fold_tail(totals, top_n=TOP_CATEGORIES, label=OTHER_LABEL):
+    """Keep the first `top_n` rows of a sorted Series/DataFrame and sum the rest into `label`."""
+    if top_n is None or len(totals) <= top_n:
+        return totals
+    head = totals.iloc[:top_n].copy()
+    head.loc[label] = totals.iloc[top_n:].sum()
+    return head
+
+
+def create_cashflow_plot(cashflow_data, fmt='png', max_points=MAX_POINTS, date_column='Date', value_column=None):
+    """Cashflow line chart; `value_column` defaults to 'Cashflow' or, if absent, 'Amount'."""
     import numpy as np
 
-    categories = revenue_data['Category'].tolist()
-    revenue_values = revenue_data['Amount'].tolist()
-    expense_values = expense_data['Amount'].tolist()
-
-    x = np.arange(len(categories))
-    width = 0.35
-
-    fig, ax = plt.subplots(figsize=(10, 6))
-    bars1 = ax.bar(x - width/2, revenue_values, width, label='Revenue')
-    bars2 = ax.bar(x + width/2, expense_values, width, label='Expense')
-
-    ax.set_xlabel('Categories')
-    ax.set_ylabel('Amount')
-    ax.set_title('Revenue and Expense by Category')
-    ax.set_xticks(x)
-    ax.set_xticklabels(categories)
-    ax.legend()
-    plt.tight_layout()
-    plt.show()
-
-def create_category_donut(category_data):
-    import matplotlib.pyplot as plt
-
-    plt.figure(figsize=(8, 8))
-    plt.pie(category_data['Amount'], labels=category_data['Category'], autopct='%1.1f%%', startangle=140)
-    centre_circle = plt.Circle((0, 0), 0.70, fc='white')
-    fig = plt.gcf()
-    fig.gca().add_artist(centre_circle)
-    plt.title('Expense Distribution by Category')
-    plt.axis('equal')
-    plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    if value_column is None:
+        value_column = 'Cashflow' if 'Cashflow' in cashflow_data.columns else 'Amount'
+    series = cashflow_data[[date_column, value_column]]
+    key = _data_key('cashflow', [series], fmt, max_points)
+
+    def draw(fig):
+        data = series.dropna()
+        if not data[date_column].is_monotonic_increasing:
+            data = data.sort_values(date_column, kind='stable')
+        dates = data[date_column].to_numpy()
+        values = data[value_column].to_numpy(dtype='float64')
+        x = dates.astype('datetime64[ns]').astype('int64') if np.issubdtype(dates.dtype, np.datetime64) else np.arange(len(dates))
+        keep = lttb(x, values, max_points)
+        fig.set_size_inches(10, 6)
+        ax = fig.add_subplot()
+        ax.plot(dates[keep], values[keep], marker='o' if len(keep) <= MARKER_MAX_POINTS else None)
+        ax.set_title('Cashflow Over Time')
+        ax.set_xlabel('Date')
+        ax.set_ylabel('Cashflow')
+        ax.grid()
+        fig.autofmt_xdate(rotation=45)
+        fig.tight_layout()
+
+    return _cached(key, draw, fmt)
+
+
+def create_revenue_expense_bar(revenue_data, expense_data=None, fmt='png', top_n=TOP_CATEGORIES):
+    """Revenue vs expense per category.
+
+    Pass raw transactions alone, or the legacy pair of aggregated revenue and
+    expense frames (Category, Amount); the pair is matched by category name.
+    """
+    frames = [revenue_data] if expense_data is None else [revenue_data, expense_data]
+    key = _data_key('revenue_expense', frames, fmt, top_n)
+
+    def draw(fig):
+        import numpy as np
+
+        if expense_data is None:
+            totals = category_totals(revenue_data)
+        else:
+            totals = _aligned_totals(revenue_data, expense_data)
+        totals = fold_tail(totals, top_n)
+        categories = totals.index.tolist()
+        revenue_values = totals['Revenue'].tolist()
+        expense_values = totals['Expense'].tolist()
+
+        x = np.arange(len(categories))
+        width = 0.35
+
+        fig.set_size_inches(10, 6)
+        ax = fig.add_subplot()
+        ax.bar(x - width/2, revenue_values, width, label='Revenue')
+        ax.bar(x + width/2, expense_values, width, label='Expense')
+
+        ax.set_xlabel('Categories')
+        ax.set_ylabel('Amount')
+        ax.set_title('Revenue and Expense by Category')
+        ax.set_xticks(x)
+        ax.set_xticklabels(categories, rotation=45 if len(categories) > 6 else 0, ha='right' if len(categories) > 6 else 'center')
+        ax.legend()
+        fig.tight_layout()
+
+    return _cached(key, draw, fmt)
+
+
+def create_category_donut(category_data, fmt='png', top_n=TOP_CATEGORIES):
+    """Expense share per category, from raw transactions or one row per category."""
+    key = _data_key('category_donut', [category_data], fmt, top_n)
+
+    def draw(fig):
+        totals = category_totals(category_data)
+        expenses = totals['Expense']
+        if not expenses.any() and 'Type' not in category_data.columns:
+            # one row per category with positive amounts and no Type: already expense totals
+            expenses = totals['Revenue']
+        expenses = fold_tail(expenses[expenses > 0].sort_values(ascending=False, kind='stable'), top_n)
+        fig.set_size_inches(8, 8)
+        ax = fig.add_subplot()
+        if expenses.empty:
+            ax.text(0.5, 0.5, 'No expenses to show', ha='center', va='center', fontsize=14)
+            ax.set_title('Expense Distribution by Category')
+            ax.axis('off')
+            return
+        # wedge width 0.3 leaves the same hole as the old white 0.70 circle
+        # slivers keep their wedge but not their text, so the labels do not pile up
+        share = expenses / expenses.sum()
+        labels = [name if part >= MIN_LABEL_SHARE else '' for name, part in share.items()]
+        ax.pie(expenses.to_numpy(), labels=labels, startangle=140, pctdistance=0.85, wedgeprops={'width': 0.3},
+               autopct=lambda pct: f'{pct:.1f}%' if pct >= MIN_LABEL_SHARE * 100 else '')
+        ax.set_title('Expense Distribution by Category')
+        ax.axis('equal')
+        fig.tight_layout()
+
+    return _cached(key, draw, fmt)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the package is imported as `src`, as in src/interface/streamlit_app.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.processing.cashflow import CashflowEngine
+
+OPENING = 1500.25
+
+
+def _transactions(n=3000, seed=4):
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 600, n), unit='D')
+    data = pd.DataFrame({
+        'Date': days.strftime('%Y-%m-%d'),
+        'Amount': np.round(rng.normal(0, 400, n), 2),
+    })
+    # rows the engine skips: unparseable date or amount
+    data.loc[rng.choice(n, 20, replace=False), 'Amount'] = np.nan
+    data.loc[rng.choice(n, 10, replace=False), 'Date'] = None
+    return data
+
+
+def _chunks(data, seed=4):
+    """Shuffled chunks; the third one is entirely earlier than everything added before it."""
+    dates = pd.to_datetime(data['Date'], errors='coerce')
+    early = data[dates < '2023-04-01']
+    middle = data[(dates >= '2024-03-01') & (dates < '2024-07-01')]
+    rest = data.drop(early.index).drop(middle.index).sample(frac=1.0, random_state=seed)
+    parts = [rest.iloc[i::4] for i in range(4)]
+    return [middle, parts[0], early.sample(frac=1.0, random_state=seed)] + parts[1:]
+
+
+def _reference(data):
+    """Daily, weekly and monthly cashflow computed directly with pandas."""
+    dates = pd.to_datetime(data['Date'], errors='coerce')
+    amounts = pd.to_numeric(data['Amount'], errors='coerce')
+    valid = dates.notna() & amounts.notna()
+    per_day = amounts[valid].groupby(dates[valid].dt.normalize()).sum()
+    per_day = per_day.reindex(pd.date_range(per_day.index.min(), per_day.index.max(), freq='D'), fill_value=0.0)
+    daily = pd.DataFrame({'Amount': per_day, 'Balance': OPENING + per_day.cumsum()})
+    for k in (7, 30, 90):
+        daily[f'Rolling{k}'] = per_day.rolling(k, min_periods=1).sum()
+    periods = {}
+    for freq, rule in (('W', 'W-SUN'), ('M', 'ME')):
+        grouped = daily.resample(rule)
+        periods[freq] = pd.DataFrame({
+            'Amount': grouped['Amount'].sum(),
+            'Balance': grouped['Balance'].last(),
+            'MinBalance': grouped['Balance'].min(),
+            'MaxBalance': grouped['Balance'].max(),
+        })
+    return daily, periods
+
+
+def _same(result, expected):
+    result = result.set_index('Date')
+    assert list(result.index) == list(expected.index)
+    for column in expected.columns:
+        np.testing.assert_allclose(result[column].to_numpy(), expected[column].to_numpy(), rtol=0, atol=1e-6)
+
+
+@pytest.mark.parametrize('seed', [4, 9])
+def test_add_in_shuffled_chunks_matches_pandas(seed):
+    data = _transactions(seed=seed)
+    chunks = _chunks(data, seed)
+    engine = CashflowEngine(OPENING)
+    for i, chunk in enumerate(chunks):
+        if i == 2:
+            start = engine._start
+            assert pd.to_datetime(chunk['Date'], errors='coerce').max() < start
+        engine.add(chunk)
+    assert engine._start < start
+
+    daily, periods = _reference(data)
+    _same(engine.daily(), daily)
+    _same(engine.weekly(), periods['W'])
+    _same(engine.monthly(), periods['M'])
+
+    single = CashflowEngine.from_transactions(data, opening_balance=OPENING)
+    pd.testing.assert_frame_equal(engine.daily(), single.daily())
+    assert engine.summary() == single.summary()
+
+
+def test_add_without_valid_rows_changes_nothing():
+    engine = CashflowEngine.from_transactions(_transactions(200), opening_balance=OPENING)
+    before = engine.daily()
+    engine.add(pd.DataFrame({'Date': ['2023-02-01', 'not a date'], 'Amount': [None, 10.0]}))
+    pd.testing.assert_frame_equal(engine.daily(), before)
@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from src.visualization.plots import (
+    category_totals, clear_cache, create_category_donut, create_revenue_expense_bar,
+)
+
+
+@pytest.fixture(autouse=True)
+def _no_cache():
+    clear_cache()
+
+
+def test_type_read_with_the_dre_vocabulary():
+    transactions = pd.DataFrame({
+        'Category': ['Sales', 'Rent', 'Rent', 'Sales', 'Bank', 'Misc', 'Misc', 'Fees'],
+        'Amount': [100.0, -30.0, 20.0, 40.0, 999.0, -7.0, 5.0, 3.0],
+        'Type': ['receita', 'despesa', 'Despesa ', 'Income', 'Transferência', None, 'bonus', 'EXPENSE'],
+    })
+    totals = category_totals(transactions)
+    assert totals.loc['Sales'].tolist() == [140.0, 0.0]
+    assert totals.loc['Rent'].tolist() == [0.0, 50.0]
+    # missing and unknown Type fall back to the sign of Amount
+    assert totals.loc['Misc'].tolist() == [5.0, 7.0]
+    assert totals.loc['Fees'].tolist() == [0.0, 3.0]
+    # transfers are left out
+    assert 'Bank' not in totals.index
+
+
+def test_donut_without_expenses_does_not_crash():
+    revenue_only = pd.DataFrame({'Category': ['Sales'], 'Amount': [10.0], 'Type': ['receita']})
+    assert create_category_donut(revenue_only).startswith(b'\x89PNG')
+
+
+def test_legacy_pair_of_frames_matches_raw_transactions():
+    revenue = pd.DataFrame({'Category': ['Sales', 'Services'], 'Amount': [100.0, 50.0]})
+    expense = pd.DataFrame({'Category': ['Rent', 'Sales'], 'Amount': [30.0, 10.0]})
+    raw = pd.DataFrame({
+        'Category': ['Sales', 'Services', 'Rent', 'Sales'],
+        'Amount': [100.0, 50.0, 30.0, 10.0],
+        'Type': ['Receita', 'revenue', 'DESPESA', 'expense'],
+    })
+    assert create_revenue_expense_bar(revenue, expense) == create_revenue_expense_bar(raw)
+    # the raw path keeps a positive expense amount on the Expense side
+    assert category_totals(raw).loc['Sales'].tolist() == [100.0, 10.0]
@@ -0,0 +1,136 @@
+"""
+Cálculos da Folha de Pagamento (um funcionário por vez).
+Funções puras, sem Streamlit, usadas pela aba "Folha de Pagamento" em app.py
+e como referência para o cálculo em lote de folha_lote.py.
+As faixas de INSS/IRRF podem ser listas de dicionários ou TabelaFaixas (faixas.py).
+Cada valor de holerite é arredondado ao centavo quando é calculado e os
+totais são somas de centavos (dinheiro.py).
+"""
+from dinheiro import arredondar, centavos, reais, somar
+from faixas import compilar_faixas
+
+def calc_valor_hora(salario_base, horas_normais_mes):
+    if horas_normais_mes and horas_normais_mes > 0:
+        return salario_base / horas_normais_mes
+    return 0.0
+
+def calc_proventos(inputs):
+    sb = inputs["salario_base"]
+    vh = inputs["valor_hora"] if inputs["valor_hora"] is not None else calc_valor_hora(sb, inputs["horas_normais_mes"])
+    proventos = []
+    proventos.append({"desc": "Salário Base", "base": sb, "aliquota": None, "valor": arredondar(sb)})
+    he50 = arredondar(vh * inputs["horas_extra_50"] * 1.5)
+    if inputs["horas_extra_50"] > 0:
+        proventos.append({"desc": "Horas Extra 50%", "base": f"{vh:.2f} x {inputs['horas_extra_50']}", "aliquota": "50%", "valor": he50})
+    he100 = arredondar(vh * inputs["horas_extra_100"] * 2.0)
+    if inputs["horas_extra_100"] > 0:
+        proventos.append({"desc": "Horas Extra 100%", "base": f"{vh:.2f} x {inputs['horas_extra_100']}", "aliquota": "100%", "valor": he100})
+    adicional_noturno_valor = arredondar(vh * inputs["horas_noturnas"] * (inputs["adicional_noturno_percent"] / 100.0))
+    if inputs["horas_noturnas"] > 0:
+        proventos.append({"desc": "Adicional Noturno", "base": f"{vh:.2f} x {inputs['horas_noturnas']}", "aliquota": f"{inputs['adicional_noturno_percent']}%", "valor": adicional_noturno_valor})
+    if inputs["possui_periculosidade"]:
+        perc_val = arredondar(sb * (inputs["periculosidade_percent"] / 100.0))
+        proventos.append({"desc": "Periculosidade", "base": sb, "aliquota": f"{inputs['periculosidade_percent']}%", "valor": perc_val})
+    if inputs["possui_insalubridade"]:
+        insal_val = arredondar(sb * (inputs["insalubridade_percent"] / 100.0))
+        proventos.append({"desc": "Insalubridade", "base": sb, "aliquota": f"{inputs['insalubridade_percent']}%", "valor": insal_val})
+    if inputs["vale_refeicao"] and inputs["vale_refeicao"] > 0:
+        proventos.append({"desc": "Vale Refeição (benefício informado)", "base": inputs["vale_refeicao"], "aliquota": None, "valor": arredondar(inputs["vale_refeicao"])})
+    if inputs["outros_proventos"] and inputs["outros_proventos"] > 0:
+        proventos.append({"desc": "Outros Proventos", "base": inputs["outros_proventos"], "aliquota": None, "valor": arredondar(inputs["outros_proventos"])})
+    bruto = reais(somar(p["valor"] for p in proventos))
+    return {"proventos": proventos, "salario_bruto": bruto, "valor_hora": vh, "he50": he50, "he100": he100}
+
+def calc_inss_progressivo(salario_bruto, faixas):
+    tabela = compilar_faixas(faixas)
+    return tabela.parcelas_inss(salario_bruto), arredondar(tabela.inss(salario_bruto))
+
+def calc_irrf(base_irrf, faixas, deducao_dependentes, num_dependentes, pensao):
+    tabela = compilar_faixas(faixas)
+    ded_depend = num_dependentes * deducao_dependentes
+    base = base_irrf - ded_depend - pensao
+    base = arredondar(max(0.0, base))
+    k = tabela.indice_faixa(base)
+    aplicada = tabela.faixas[k] if k >= 0 else None
+    valor_irrf = arredondar(tabela.irrf(base))
+    return {"base": base, "irrf": valor_irrf, "faixa_aplicada": aplicada, "deducao_dependentes": ded_depend}
+
+def calc_descontos(inputs, valor_hora, salario_bruto, total_inss, irrf_res):
+    """Lista de descontos do holerite (VT, VR, faltas, atrasos, pensão, INSS e IRRF)."""
+    descontos = []
+    vt_desconto = 0.0
+    if inputs["vale_transporte_percent"] is not None:
+        vt_desconto = arredondar(inputs["salario_base"] * (inputs["vale_transporte_percent"] / 100.0))
+        descontos.append({"desc": "Vale-transporte (desconto %)", "base": inputs["salario_base"], "aliquota": f"{inputs['vale_transporte_percent']}%", "valor": vt_desconto})
+    elif inputs["vale_transporte_valor"] is not None:
+        vt_desconto = arredondar(inputs["vale_transporte_valor"])
+        descontos.append({"desc": "Vale-transporte (valor fixo)", "base": inputs["vale_transporte_valor"], "aliquota": None, "valor": vt_desconto})
+
+    if inputs["vale_refeicao"] and inputs["vale_refeicao"] > 0:
+        descontos.append({"desc": "Vale-refeição (desconto informado)", "base": inputs["vale_refeicao"], "aliquota": None, "valor": arredondar(inputs["vale_refeicao"])})
+
+    desconto_faltas = arredondar((inputs["salario_base"] / inputs["dias_uteis_mes"]) * inputs["faltas"])
+    if inputs["faltas"] > 0:
+        descontos.append({"desc": "Desconto por faltas", "base": f"{inputs['salario_base']:.2f}/{inputs['dias_uteis_mes']}", "aliquota": None, "valor": desconto_faltas})
+
+    atraso_horas = inputs["atrasos_minutos"] / 60.0
+    desconto_atrasos = arredondar(atraso_horas * valor_hora)
+    if inputs["atrasos_minutos"] > 0:
+        descontos.append({"desc": "Desconto por atrasos (horas)", "base": f"{atraso_horas:.2f}h x {valor_hora:.2f}", "aliquota": None, "valor": desconto_atrasos})
+
+    if inputs["pensao_alimenticia"] > 0:
+        descontos.append({"desc": "Pensão alimentícia", "base": inputs["pensao_alimenticia"], "aliquota": None, "valor": arredondar(inputs["pensao_alimenticia"])})
+
+    # INSS e IRRF como descontos
+    descontos.append({"desc": "INSS (empregado)", "base": salario_bruto, "aliquota": None, "valor": total_inss})
+    descontos.append({"desc": "IRRF", "base": irrf_res["base"], "aliquota": float(irrf_res["faixa_aplicada"]["aliquota"]) if irrf_res["faixa_aplicada"] else 0.0, "valor": irrf_res["irrf"]})
+    return descontos
+
+def calc_fgts_provisoes(salario_base, salario_bruto, fgts_percent, inss_patronal_percent):
+    fgts = arredondar(salario_bruto * (fgts_percent / 100.0))
+    inss_patronal = arredondar(salario_bruto * (inss_patronal_percent / 100.0))
+    provision_13 = arredondar(salario_base / 12.0)
+    provision_ferias = arredondar(salario_base / 12.0)
+    provision_ferias_1_3 = arredondar(provision_ferias / 3.0)
+    return {
+        "fgts": fgts,
+        "inss_patronal": inss_patronal,
+        "provision_13_mensal": provision_13,
+        "provision_ferias_mensal": provision_ferias,
+        "provision_ferias_1_3_mensal": provision_ferias_1_3
+    }
+
+def calc_custo_total_empregador(salario_bruto, prov):
+    return reais(somar([salario_bruto, prov["inss_patronal"], prov["fgts"], prov["provision_13_mensal"], prov["provision_ferias_mensal"], prov["provision_ferias_1_3_mensal"]]))
+
+def calc_holerite(inputs, inss_faixas, irrf_faixas, deducao_por_dependente, fgts_percent, inss_patronal_percent):
+    """
+    Pipeline completo de um holerite: proventos -> INSS -> IRRF -> descontos -> provisões.
+    Retorna um dicionário com os resultados intermediários usados na exibição.
+    """
+    det = calc_proventos(inputs)
+    salario_bruto = det["salario_bruto"]
+
+    parcelas_inss, total_inss = calc_inss_progressivo(salario_bruto, inss_faixas)
+    irrf_res = calc_irrf(salario_bruto - total_inss, irrf_faixas, deducao_por_dependente, inputs["numero_dependentes"], inputs["pensao_alimenticia"])
+
+    descontos = calc_descontos(inputs, det["valor_hora"], salario_bruto, total_inss, irrf_res)
+    total_descontos = reais(somar(d["valor"] for d in descontos))
+    total_proventos = salario_bruto
+    salario_liquido = reais(centavos(total_proventos) - centavos(total_descontos))
+
+    prov = calc_fgts_provisoes(inputs["salario_base"], salario_bruto, fgts_percent, inss_patronal_percent)
+    custo_total_empregador = calc_custo_total_empregador(salario_bruto, prov)
+    return {
+        "det": det,
+        "salario_bruto": salario_bruto,
+        "parcelas_inss": parcelas_inss,
+        "total_inss": total_inss,
+        "irrf_res": irrf_res,
+        "descontos": descontos,
+        "total_descontos": total_descontos,
+        "total_proventos": total_proventos,
+        "salario_liquido": salario_liquido,
+        "prov": prov,
+        "custo_total_empregador": custo_total_empregador,
+    }
@@ -0,0 +1,375 @@
+"""
+Folha de Pagamento em lote: calcula o holerite de todos os funcionários de um
+DataFrame de uma só vez, com operações de coluna do NumPy/pandas.
+
+Cada coluna de entrada tem o mesmo nome do campo do formulário da aba
+"Folha de Pagamento" (salario_base, horas_extra_50, numero_dependentes, ...).
+As contas seguem a mesma ordem das funções de folha.py, de modo que cada
+linha produz exatamente os mesmos valores de calc_holerite: os valores são
+arredondados ao centavo nos mesmos pontos e os totais são somas de centavos
+em int64 (dinheiro.py).
+"""
+import numpy as np
+import pandas as pd
+
+from dinheiro import arredondar, centavos, reais
+from faixas import compilar_faixas
+
+# Campos do formulário e valor usado quando a coluna não existe no DataFrame.
+# vale_transporte_percent/valor_hora: NaN significa "não informado", como o None do formulário.
+CAMPOS_FOLHA = {
+    "salario_base": None,  # obrigatório
+    "dias_uteis_mes": 30,
+    "horas_normais_mes": 220.0,
+    "horas_extra_50": 0.0,
+    "horas_extra_100": 0.0,
+    "valor_hora": np.nan,
+    "horas_noturnas": 0.0,
+    "adicional_noturno_percent": 20.0,
+    "possui_periculosidade": False,
+    "periculosidade_percent": 30.0,
+    "possui_insalubridade": False,
+    "insalubridade_percent": 0.0,
+    "numero_dependentes": 0,
+    "pensao_alimenticia": 0.0,
+    "vale_transporte_percent": np.nan,
+    "vale_transporte_valor": np.nan,
+    "vale_refeicao": 0.0,
+    "faltas": 0,
+    "atrasos_minutos": 0,
+    "outros_proventos": 0.0,
+}
+
+# Quando o funcionário não informa nenhuma forma de vale-transporte vale o padrão do formulário (6%)
+VT_PERCENT_PADRAO = 6.0
+
+COLUNAS_RESULTADO = [
+    "valor_hora", "he50", "he100", "adicional_noturno", "periculosidade", "insalubridade",
+    "provento_vr", "provento_outros", "salario_bruto", "inss", "base_irrf", "irrf",
+    "desconto_vt", "desconto_vr", "desconto_faltas", "desconto_atrasos", "desconto_pensao",
+    "total_descontos", "salario_liquido",
+    "fgts", "inss_patronal", "provision_13_mensal", "provision_ferias_mensal", "provision_ferias_1_3_mensal",
+    "custo_total_empregador",
+]
+# colunas que dependem das tabelas de faixas e dos parâmetros (calcular_encargos_lote)
+COLUNAS_ENCARGOS = [
+    "inss", "base_irrf", "irrf", "total_descontos", "salario_liquido", "fgts", "inss_patronal", "custo_total_empregador",
+]
+# demais colunas do resultado e as entradas do IRRF (calcular_base_lote)
+COLUNAS_BASE = [
+    "valor_hora", "he50", "he100", "adicional_noturno", "periculosidade", "insalubridade",
+    "provento_vr", "provento_outros", "salario_bruto", "numero_dependentes", "pensao_alimenticia",
+    "desconto_vt", "desconto_vr", "desconto_faltas", "desconto_atrasos", "desconto_pensao",
+    "provision_13_mensal", "provision_ferias_mensal", "provision_ferias_1_3_mensal",
+]
+
+
+def _coluna(df, nome):
+    """Coluna como array float64, preenchendo com o padrão de CAMPOS_FOLHA quando ausente."""
+    padrao = CAMPOS_FOLHA[nome]
+    if nome not in df.columns:
+        if padrao is None:
+            raise ValueError(f"Coluna obrigatória ausente: {nome}")
+        return np.full(len(df), padrao, dtype="float64")
+    serie = pd.to_numeric(df[nome], errors="coerce").astype("float64")
+    if padrao is None and serie.isna().any():
+        # sem isto o NaN só apareceria em centavos(), sem dizer qual coluna
+        raise ValueError(f"{nome} vazio ou não numérico em {int(serie.isna().sum())} linha(s); use validar_roster")
+    if padrao is not None and not (isinstance(padrao, float) and np.isnan(padrao)):
+        serie = serie.fillna(float(padrao))
+    return serie.to_numpy()
+
+
+def _flag(df, nome):
+    if nome not in df.columns:
+        return np.full(len(df), bool(CAMPOS_FOLHA[nome]))
+    serie = df[nome]
+    if serie.dtype == object:
+        serie = serie.astype(str).str.strip().str.lower().isin(["1", "true", "sim", "s", "x", "yes"])
+    return serie.fillna(False).astype(bool).to_numpy()
+
+
+def calc_inss_lote(salario_bruto, faixas):
+    """Mesma regra de calc_inss_progressivo, aplicada a um array de salários brutos."""
+    return arredondar(compilar_faixas(faixas).inss(salario_bruto))
+
+
+def calc_irrf_lote(base_irrf, faixas, deducao_dependentes, num_dependentes, pensao):
+    """Mesma regra de calc_irrf: retorna (base após deduções, IRRF) por funcionário."""
+    ded_depend = num_dependentes * deducao_dependentes
+    base = arredondar(np.maximum(0.0, base_irrf - ded_depend - pensao))
+    return base, arredondar(compilar_faixas(faixas).irrf(base))
+
+
+def calcular_base_lote(funcionarios):
+    """
+    Parte da folha que não depende das tabelas de faixas nem dos parâmetros
+    (proventos, salário bruto, descontos fixos e provisões), com o número de
+    dependentes e a pensão usados pelo IRRF.
+    Retorna um DataFrame com o mesmo índice de `funcionarios` e as colunas de COLUNAS_BASE.
+    """
+    df = funcionarios
+    sb = _coluna(df, "salario_base")
+    horas_normais = _coluna(df, "horas_normais_mes")
+    h50 = _coluna(df, "horas_extra_50")
+    h100 = _coluna(df, "horas_extra_100")
+    hn = _coluna(df, "horas_noturnas")
+    not_pct = _coluna(df, "adicional_noturno_percent")
+    peric_pct = _coluna(df, "periculosidade_percent")
+    insal_pct = _coluna(df, "insalubridade_percent")
+    vr = _coluna(df, "vale_refeicao")
+    outros = _coluna(df, "outros_proventos")
+
+    # valor-hora informado (0 ou vazio = calcular automaticamente)
+    vh_inf = _coluna(df, "valor_hora")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vh_auto = np.where(horas_normais > 0, sb / horas_normais, 0.0)
+    vh = np.where(np.isnan(vh_inf) | (vh_inf == 0.0), vh_auto, vh_inf)
+
+    # proventos (mesmos arredondamentos de calc_proventos)
+    he50 = arredondar(vh * h50 * 1.5)
+    he100 = arredondar(vh * h100 * 2.0)
+    noturno = arredondar(vh * hn * (not_pct / 100.0))
+    peric = np.where(_flag(df, "possui_periculosidade"), arredondar(sb * (peric_pct / 100.0)), 0.0)
+    insal = np.where(_flag(df, "possui_insalubridade"), arredondar(sb * (insal_pct / 100.0)), 0.0)
+    provento_vr = np.where(vr > 0, arredondar(vr), 0.0)
+    provento_outros = np.where(outros > 0, arredondar(outros), 0.0)
+    bruto = reais(
+        centavos(sb)
+        + centavos(np.where(h50 > 0, he50, 0.0))
+        + centavos(np.where(h100 > 0, he100, 0.0))
+        + centavos(np.where(hn > 0, noturno, 0.0))
+        + centavos(peric) + centavos(insal) + centavos(provento_vr) + centavos(provento_outros)
+    )
+    dependentes = _coluna(df, "numero_dependentes")
+    pensao = _coluna(df, "pensao_alimenticia")
+
+    # descontos fixos (mesma ordem de calc_descontos)
+    vt_pct = _coluna(df, "vale_transporte_percent")
+    vt_valor = _coluna(df, "vale_transporte_valor")
+    vt_pct = np.where(np.isnan(vt_pct) & np.isnan(vt_valor), VT_PERCENT_PADRAO, vt_pct)
+    desconto_vt = arredondar(np.where(~np.isnan(vt_pct), sb * (vt_pct / 100.0), np.nan_to_num(vt_valor)))
+    dias = _coluna(df, "dias_uteis_mes")
+    faltas = _coluna(df, "faltas")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        desconto_faltas = arredondar(np.where(faltas > 0, (sb / dias) * faltas, 0.0))
+    atrasos = _coluna(df, "atrasos_minutos")
+    desconto_atrasos = arredondar(np.where(atrasos > 0, (atrasos / 60.0) * vh, 0.0))
+    desconto_pensao = arredondar(np.where(pensao > 0, pensao, 0.0))
+
+    # provisões (calc_fgts_provisoes)
+    p13 = arredondar(sb / 12.0)
+    pferias = arredondar(sb / 12.0)
+    pferias_1_3 = arredondar(pferias / 3.0)
+
+    return pd.DataFrame({
+        "valor_hora": vh,
+        "he50": he50,
+        "he100": he100,
+        "adicional_noturno": noturno,
+        "periculosidade": peric,
+        "insalubridade": insal,
+        "provento_vr": provento_vr,
+        "provento_outros": provento_outros,
+        "salario_bruto": bruto,
+        "numero_dependentes": dependentes,
+        "pensao_alimenticia": pensao,
+        "desconto_vt": desconto_vt,
+        "desconto_vr": provento_vr,
+        "desconto_faltas": desconto_faltas,
+        "desconto_atrasos": desconto_atrasos,
+        "desconto_pensao": desconto_pensao,
+        "provision_13_mensal": p13,
+        "provision_ferias_mensal": pferias,
+        "provision_ferias_1_3_mensal": pferias_1_3,
+    }, index=df.index)
+
+
+def calcular_encargos_lote(base, inss_faixas, irrf_faixas, deducao_por_dependente, fgts_percent, inss_patronal_percent):
+    """
+    Parte da folha que depende das tabelas e dos parâmetros (INSS, IRRF,
+    totais, FGTS, INSS patronal e custo), a partir do resultado de calcular_base_lote.
+    Retorna um DataFrame com o mesmo índice de `base` e as colunas de COLUNAS_ENCARGOS.
+    """
+    bruto = base["salario_bruto"].to_numpy()
+    inss = calc_inss_lote(bruto, inss_faixas)
+    base_irrf, irrf = calc_irrf_lote(
+        bruto - inss, irrf_faixas, deducao_por_dependente,
+        base["numero_dependentes"].to_numpy(), base["pensao_alimenticia"].to_numpy(),
+    )
+    total_centavos = centavos(inss) + centavos(irrf)
+    for col in ("desconto_vt", "desconto_vr", "desconto_faltas", "desconto_atrasos", "desconto_pensao"):
+        total_centavos = total_centavos + centavos(base[col].to_numpy())
+    fgts = arredondar(bruto * (fgts_percent / 100.0))
+    inss_patronal = arredondar(bruto * (inss_patronal_percent / 100.0))
+    c_bruto = centavos(bruto)
+    custo = c_bruto + centavos(inss_patronal) + centavos(fgts)
+    for col in ("provision_13_mensal", "provision_ferias_mensal", "provision_ferias_1_3_mensal"):
+        custo = custo + centavos(base[col].to_numpy())
+    return pd.DataFrame({
+        "inss": inss,
+        "base_irrf": base_irrf,
+        "irrf": irrf,
+        "total_descontos": reais(total_centavos),
+        "salario_liquido": reais(c_bruto - total_centavos),
+        "fgts": fgts,
+        "inss_patronal": inss_patronal,
+        "custo_total_empregador": reais(custo),
+    }, index=base.index)
+
+
+def juntar_folha_lote(base, encargos):
+    """Resultado de calcular_folha_lote a partir das duas partes (colunas de COLUNAS_RESULTADO)."""
+    return pd.DataFrame(
+        {col: (encargos[col] if col in encargos.columns else base[col]).to_numpy() for col in COLUNAS_RESULTADO},
+        index=base.index,
+    )
+
+
+def calcular_folha_lote(funcionarios, inss_faixas, irrf_faixas, deducao_por_dependente, fgts_percent, inss_patronal_percent):
+    """
+    Calcula a folha de todos os funcionários (uma linha por funcionário).
+    `inss_faixas`/`irrf_faixas` podem ser listas de dicionários ou TabelaFaixas.
+    Retorna um DataFrame com o mesmo índice de `funcionarios` e as colunas de COLUNAS_RESULTADO.
+    """
+    base = calcular_base_lote(funcionarios)
+    encargos = calcular_encargos_lote(base, inss_faixas, irrf_faixas, deducao_por_dependente, fgts_percent, inss_patronal_percent)
+    return juntar_folha_lote(base, encargos)
+
+
+# ---------------- Planilha de funcionários (upload em lote) ----------------
+CAMPOS_NUMERICOS = [c for c in CAMPOS_FOLHA if not c.startswith("possui_")]
+# campos usados como divisor: precisam ser estritamente positivos
+CAMPOS_POSITIVOS = ["horas_normais_mes", "dias_uteis_mes"]
+
+COLUNAS_TOTAIS = [
+    "salario_bruto", "inss", "irrf", "total_descontos", "salario_liquido",
+    "fgts", "inss_patronal", "provision_13_mensal", "provision_ferias_mensal", "provision_ferias_1_3_mensal",
+    "custo_total_empregador",
+]
+
+
+def _separador_csv(arquivo):
+    """Detecta ';' ou ',' pela linha de cabeçalho e volta o arquivo ao início."""
+    arquivo.seek(0)
+    cabecalho = arquivo.readline()
+    arquivo.seek(0)
+    if isinstance(cabecalho, bytes):
+        cabecalho = cabecalho.decode("utf-8", errors="ignore")
+    return ";" if cabecalho.count(";") > cabecalho.count(",") else ","
+
+
+def contar_linhas_roster(arquivo, nome_arquivo):
+    """Número de funcionários (linhas de dados) sem carregar o arquivo inteiro na memória."""
+    if nome_arquivo.lower().endswith(".xlsx"):
+        from openpyxl import load_workbook
+        arquivo.seek(0)
+        wb = load_workbook(arquivo, read_only=True)
+        ws = wb.active
+        if ws.max_row is None:
+            # planilha gravada sem a dimensão (ex.: openpyxl write-only): conta percorrendo as linhas
+            ws.calculate_dimension(force=True)
+        total = max(0, (ws.max_row or 1) - 1)
+        wb.close()
+        arquivo.seek(0)
+        return total
+    arquivo.seek(0)
+    linhas = 0
+    ultimo = b""
+    for bloco in iter(lambda: arquivo.read(1 << 20), b""):
+        linhas += bloco.count(b"\n")
+        ultimo = bloco
+    if ultimo and not ultimo.endswith(b"\n"):
+        linhas += 1
+    arquivo.seek(0)
+    return max(0, linhas - 1)
+
+
+def ler_roster_em_blocos(arquivo, nome_arquivo, tamanho_bloco=5000):
+    """Gera DataFrames de até `tamanho_bloco` funcionários lidos de um CSV ou XLSX."""
+    if nome_arquivo.lower().endswith(".xlsx"):
+        from openpyxl import load_workbook
+        arquivo.seek(0)
+        wb = load_workbook(arquivo, read_only=True, data_only=True)
+        linhas = wb.active.iter_rows(values_only=True)
+        cabecalho = [str(c).strip() if c is not None else "" for c in next(linhas, [])]
+        bloco = []
+        for linha in linhas:
+            if linha is None or all(v is None for v in linha):
+                continue
+            bloco.append(linha)
+            if len(bloco) >= tamanho_bloco:
+                yield pd.DataFrame(bloco, columns=cabecalho)
+                bloco = []
+        if bloco:
+            yield pd.DataFrame(bloco, columns=cabecalho)
+        wb.close()
+    elif nome_arquivo.lower().endswith(".csv"):
+        sep = _separador_csv(arquivo)
+        for bloco in pd.read_csv(arquivo, sep=sep, chunksize=tamanho_bloco, skipinitialspace=True):
+            bloco.columns = [str(c).strip() for c in bloco.columns]
+            yield bloco
+    else:
+        raise ValueError("Formato não suportado. Envie um arquivo CSV ou XLSX.")
+
+
+def validar_roster(bloco):
+    """
+    Valida as colunas conhecidas de um bloco da planilha.
+    Retorna (linhas válidas com colunas numéricas convertidas, {coluna: nº de linhas inválidas}).
+    """
+    if "salario_base" not in bloco.columns:
+        raise ValueError("Coluna obrigatória ausente: salario_base")
+    bloco = bloco.copy()
+    invalidas = np.zeros(len(bloco), dtype=bool)
+    contagem = {}
+    for col in CAMPOS_NUMERICOS:
+        if col not in bloco.columns:
+            continue
+        valores = pd.to_numeric(bloco[col], errors="coerce")
+        ruins = (valores.isna() & bloco[col].notna()) | (valores < 0)
+        if col == "salario_base":
+            ruins |= valores.isna()
+        if col in CAMPOS_POSITIVOS:
+            ruins |= valores == 0
+        n = int(ruins.sum())
+        if n:
+            contagem[col] = n
+            invalidas |= ruins.to_numpy()
+        bloco[col] = valores
+    return bloco.loc[~invalidas], contagem
+
+
+def processar_roster(blocos, inss_faixas, irrf_faixas, deducao_por_dependente, fgts_percent, inss_patronal_percent, progresso=None, memo=None):
+    """
+    Valida e calcula cada bloco de funcionários e consolida o resultado.
+    `progresso(n)` é chamado com o número de linhas lidas até o momento.
+    Com `memo` (folha_memo.MemoFolha) só os funcionários novos ou alterados são calculados.
+    Retorna (DataFrame consolidado, lista de avisos de validação).
+    """
+    partes = []
+    invalidas = {}
+    lidas = 0
+    for bloco in blocos:
+        lidas += len(bloco)
+        validos, contagem = validar_roster(bloco)
+        for col, n in contagem.items():
+            invalidas[col] = invalidas.get(col, 0) + n
+        if not validos.empty:
+            calcular = calcular_folha_lote if memo is None else memo.folha_lote
+            resultado = calcular(validos, inss_faixas, irrf_faixas, deducao_por_dependente, fgts_percent, inss_patronal_percent)
+            identificacao = [c for c in validos.columns if c not in CAMPOS_FOLHA]
+            partes.append(pd.concat([validos[identificacao + ["salario_base"]], resultado], axis=1))
+        if progresso is not None:
+            progresso(lidas)
+    avisos = [f"{col}: {n} linha(s) com valor inválido foram ignoradas" for col, n in invalidas.items()]
+    if not partes:
+        return pd.DataFrame(columns=["salario_base"] + COLUNAS_RESULTADO), avisos
+    return pd.concat(partes, ignore_index=True), avisos
+
+
+def totais_folha(resultado):
+    """Totais da folha consolidada (uma linha por coluna monetária), somados em centavos."""
+    return pd.Series(
+        {col: reais(int(centavos(resultado[col].to_numpy()).sum())) for col in COLUNAS_TOTAIS}, dtype="float64"
+    )
@@ -0,0 +1,180 @@
+"""
+Folha de pagamento memorizada por etapa.
+
+Cada etapa do holerite (proventos, INSS, IRRF, descontos, provisões e DRE)
+guarda seus resultados em um cache próprio, indexado só pelo que ela lê: os
+campos do funcionário que usa, os valores produzidos pelas etapas anteriores
+e a impressão digital das tabelas de faixas (TabelaFaixas.chave) e dos
+parâmetros. Mudar a receita da DRE recalcula só a DRE; mudar o FGTS %
+recalcula só as provisões; mudar horas extras recalcula proventos e o que
+vem depois, mas o INSS volta do cache se o salário bruto não mudar.
+
+Na folha em lote cada funcionário é identificado pelo hash da sua linha de
+entrada; a parte que não depende dos parâmetros (calcular_base_lote) e a
+que depende (calcular_encargos_lote) ficam em caches separados, e uma nova
+execução calcula só as linhas ainda não vistas.
+
+Os resultados devolvidos são compartilhados com o cache: não os altere.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from dinheiro import centavos, reais, somar
+from faixas import compilar_faixas
+from folha import (
+    calc_custo_total_empregador, calc_descontos, calc_fgts_provisoes, calc_inss_progressivo, calc_irrf,
+    calc_proventos,
+)
+from folha_lote import CAMPOS_FOLHA, calcular_base_lote, calcular_encargos_lote, juntar_folha_lote
+
+# campos do formulário lidos por cada etapa (ver folha.py)
+CAMPOS_PROVENTOS = [
+    "salario_base", "valor_hora", "horas_normais_mes", "horas_extra_50", "horas_extra_100",
+    "horas_noturnas", "adicional_noturno_percent", "possui_periculosidade", "periculosidade_percent",
+    "possui_insalubridade", "insalubridade_percent", "vale_refeicao", "outros_proventos",
+]
+CAMPOS_DESCONTOS = [
+    "salario_base", "vale_transporte_percent", "vale_transporte_valor", "vale_refeicao",
+    "dias_uteis_mes", "faltas", "atrasos_minutos", "pensao_alimenticia",
+]
+MAX_ENTRADAS = 256  # por etapa do holerite
+MAX_LINHAS_LOTE = 1_000_000  # funcionários guardados por conjunto de colunas/parâmetros
+MAX_PARAMETROS_LOTE = 4  # conjuntos de parâmetros guardados na folha em lote
+
+
+class MemoFolha:
+    """Caches por etapa (LRU) e contadores de acertos/cálculos por etapa."""
+
+    def __init__(self, max_entradas=MAX_ENTRADAS, max_linhas_lote=MAX_LINHAS_LOTE):
+        self.max_entradas = max_entradas
+        self.max_linhas_lote = max_linhas_lote
+        self._caches = {}
+        self._lotes = {"base": OrderedDict(), "encargos": OrderedDict()}
+        self._trava = threading.Lock()
+        self.acertos = {}
+        self.calculos = {}
+
+    def etapa(self, nome, chave, calcular):
+        """Resultado de `calcular()` para (`nome`, `chave`), calculado só na primeira vez."""
+        with self._trava:
+            cache = self._caches.setdefault(nome, OrderedDict())
+            if chave in cache:
+                cache.move_to_end(chave)
+                self.acertos[nome] = self.acertos.get(nome, 0) + 1
+                return cache[chave]
+        valor = calcular()
+        with self._trava:
+            cache[chave] = valor
+            while len(cache) > self.max_entradas:
+                cache.popitem(last=False)
+            self.calculos[nome] = self.calculos.get(nome, 0) + 1
+        return valor
+
+    def limpar(self):
+        with self._trava:
+            self._caches.clear()
+            for cache in self._lotes.values():
+                cache.clear()
+            self.acertos.clear()
+            self.calculos.clear()
+
+    def holerite(self, inputs, inss_faixas, irrf_faixas, deducao_por_dependente, fgts_percent, inss_patronal_percent):
+        """Mesmo resultado de folha.calc_holerite, recalculando só as etapas afetadas."""
+        inss_tabela = compilar_faixas(inss_faixas)
+        irrf_tabela = compilar_faixas(irrf_faixas)
+
+        det = self.etapa(
+            "proventos", tuple(inputs[c] for c in CAMPOS_PROVENTOS), lambda: calc_proventos(inputs)
+        )
+        salario_bruto = det["salario_bruto"]
+        parcelas_inss, total_inss = self.etapa(
+            "inss", (salario_bruto, inss_tabela.chave), lambda: calc_inss_progressivo(salario_bruto, inss_tabela)
+        )
+        chave_irrf = (
+            salario_bruto - total_inss, irrf_tabela.chave, deducao_por_dependente,
+            inputs["numero_dependentes"], inputs["pensao_alimenticia"],
+        )
+        irrf_res = self.etapa("irrf", chave_irrf, lambda: calc_irrf(
+            salario_bruto - total_inss, irrf_tabela, deducao_por_dependente,
+            inputs["numero_dependentes"], inputs["pensao_alimenticia"],
+        ))
+        descontos = self.etapa(
+            "descontos",
+            (tuple(inputs[c] for c in CAMPOS_DESCONTOS), det["valor_hora"], salario_bruto, total_inss, chave_irrf),
+            lambda: calc_descontos(inputs, det["valor_hora"], salario_bruto, total_inss, irrf_res),
+        )
+        total_descontos = reais(somar(d["valor"] for d in descontos))
+        salario_liquido = reais(centavos(salario_bruto) - centavos(total_descontos))
+
+        def provisoes():
+            prov = calc_fgts_provisoes(inputs["salario_base"], salario_bruto, fgts_percent, inss_patronal_percent)
+            return prov, calc_custo_total_empregador(salario_bruto, prov)
+
+        prov, custo_total_empregador = self.etapa(
+            "provisoes", (inputs["salario_base"], salario_bruto, fgts_percent, inss_patronal_percent), provisoes
+        )
+        return {
+            "det": det,
+            "salario_bruto": salario_bruto,
+            "parcelas_inss": parcelas_inss,
+            "total_inss": total_inss,
+            "irrf_res": irrf_res,
+            "descontos": descontos,
+            "total_descontos": total_descontos,
+            "total_proventos": salario_bruto,
+            "salario_liquido": salario_liquido,
+            "prov": prov,
+            "custo_total_empregador": custo_total_empregador,
+        }
+
+    def _linhas(self, etapa, chave, hashes, calcular):
+        """
+        Linhas de `etapa` para os `hashes` (uma por funcionário), calculando com
+        `calcular(posições)` só as que ainda não estão no cache de `chave`.
+        """
+        lotes = self._lotes[etapa]
+        with self._trava:
+            tabela = lotes.get(chave)
+            if tabela is not None:
+                lotes.move_to_end(chave)
+        posicoes = np.full(len(hashes), -1) if tabela is None else tabela.index.get_indexer(hashes)
+        faltam = posicoes < 0
+        novas = int(faltam.sum())
+        if novas:
+            calculadas = calcular(np.flatnonzero(faltam))
+            calculadas.index = hashes[faltam]
+            calculadas = calculadas[~calculadas.index.duplicated()]
+            anteriores = 0 if tabela is None else len(tabela)
+            posicoes[faltam] = anteriores + calculadas.index.get_indexer(hashes[faltam])
+            tabela = calculadas if tabela is None else pd.concat([tabela, calculadas])
+        resultado = tabela.take(posicoes)
+        if len(tabela) > self.max_linhas_lote:
+            tabela = tabela.iloc[-self.max_linhas_lote:]
+        with self._trava:
+            lotes[chave] = tabela
+            lotes.move_to_end(chave)
+            while len(lotes) > MAX_PARAMETROS_LOTE:
+                lotes.popitem(last=False)
+            self.acertos[etapa] = self.acertos.get(etapa, 0) + len(hashes) - novas
+            self.calculos[etapa] = self.calculos.get(etapa, 0) + novas
+        return resultado
+
+    def folha_lote(self, funcionarios, inss_faixas, irrf_faixas, deducao_por_dependente, fgts_percent, inss_patronal_percent):
+        """Mesmo resultado de folha_lote.calcular_folha_lote, calculando só os funcionários novos ou alterados."""
+        entradas = funcionarios[[c for c in CAMPOS_FOLHA if c in funcionarios.columns]]
+        # colunas ausentes usam o padrão de CAMPOS_FOLHA: o conjunto de colunas faz parte da chave
+        colunas = tuple(entradas.columns)
+        hashes = pd.util.hash_pandas_object(entradas, index=False).to_numpy()
+        base = self._linhas("base", colunas, hashes, lambda pos: calcular_base_lote(funcionarios.iloc[pos]))
+        parametros = (
+            colunas, compilar_faixas(inss_faixas).chave, compilar_faixas(irrf_faixas).chave,
+            deducao_por_dependente, fgts_percent, inss_patronal_percent,
+        )
+        encargos = self._linhas("encargos", parametros, hashes, lambda pos: calcular_encargos_lote(
+            base.iloc[pos], inss_faixas, irrf_faixas, deducao_por_dependente, fgts_percent, inss_patronal_percent,
+        ))
+        base.index = encargos.index = funcionarios.index
+        return juntar_folha_lote(base, encargos)
@@ -0,0 +1,274 @@
+"""
+Holerites em PDF: um holerite avulso (aba Folha de Pagamento) ou a folha
+inteira em lote, como um único PDF de várias páginas ou um ZIP com um PDF
+por funcionário. No lote, as páginas são desenhadas em um pool de processos
+e gravadas em disco à medida que ficam prontas.
+"""
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+from datetime import date
+from io import BytesIO
+
+import pandas as pd
+
+logger = logging.getLogger("eficicash")
+
+# --- Tratamento das bibliotecas opcionais (PDF) ---
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    PDF_AVAILABLE = True
+except Exception:
+    PDF_AVAILABLE = False
+    logger.warning("reportlab não encontrado — exportação para PDF desabilitada")
+
+# pypdf junta as partes geradas em paralelo em um único PDF
+try:
+    from pypdf import PdfWriter
+    PDF_MERGE_AVAILABLE = True
+except Exception:
+    PDF_MERGE_AVAILABLE = False
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# (coluna do resultado de calcular_folha_lote, descrição no holerite)
+PROVENTOS_LOTE = [
+    ("salario_base", "Salário Base"),
+    ("he50", "Horas Extra 50%"),
+    ("he100", "Horas Extra 100%"),
+    ("adicional_noturno", "Adicional Noturno"),
+    ("periculosidade", "Periculosidade"),
+    ("insalubridade", "Insalubridade"),
+    ("provento_vr", "Vale Refeição (benefício informado)"),
+    ("provento_outros", "Outros Proventos"),
+]
+DESCONTOS_LOTE = [
+    ("desconto_vt", "Vale-transporte"),
+    ("desconto_vr", "Vale-refeição (desconto informado)"),
+    ("desconto_faltas", "Desconto por faltas"),
+    ("desconto_atrasos", "Desconto por atrasos (horas)"),
+    ("desconto_pensao", "Pensão alimentícia"),
+    ("inss", "INSS (empregado)"),
+    ("irrf", "IRRF"),
+]
+COLUNAS_IDENTIFICACAO = ["matricula", "nome", "cpf", "cargo"]
+# o PDF único é montado inteiro em memória (canvas do reportlab / PdfWriter do
+# pypdf, ~10 KB por página); acima disso só o ZIP, gravado à medida que sai
+LIMITE_PDF_UNICO = 5_000
+
+
+def desenhar_holerite(c, proventos, descontos, salario_base, salario_liquido, total_proventos, total_descontos, identificacao=None):
+    """
+    Desenha um holerite no canvas `c`, quebrando a página quando necessário.
+    `proventos`/`descontos` são listas de (descrição, valor). Retorna o nº de páginas usadas.
+    """
+    pagina_inicial = c.getPageNumber()
+    width, height = A4
+    x = 40
+    y = height - 40
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(x, y, "Holerite - Eficicash")
+    c.setFont("Helvetica", 10)
+    if identificacao:
+        y -= 20
+        c.drawString(x, y, identificacao)
+    y -= 20
+    c.drawString(x, y, f"Data: {date.today().isoformat()}")
+    y -= 20
+    c.drawString(x, y, f"Salário Base: R$ {salario_base:.2f}  | Salário Líquido: R$ {salario_liquido:.2f}")
+    y -= 30
+    for titulo, linhas in (("Proventos:", proventos), ("Descontos:", descontos)):
+        c.setFont("Helvetica-Bold", 11)
+        c.drawString(x, y, titulo)
+        y -= 18
+        c.setFont("Helvetica", 10)
+        for descricao, valor in linhas:
+            if y < 80:
+                c.showPage(); y = height - 40
+                c.setFont("Helvetica", 10)
+            c.drawString(x, y, f"- {descricao}: R$ {float(valor):.2f}")
+            y -= 14
+        y -= 10
+    y -= 10
+    c.setFont("Helvetica-Bold", 11)
+    c.drawString(x, y, f"Total Proventos: R$ {total_proventos:.2f}   Total Descontos: R$ {total_descontos:.2f}")
+    y -= 16
+    c.drawString(x, y, f"Salário Líquido: R$ {salario_liquido:.2f}")
+    c.showPage()
+    return c.getPageNumber() - pagina_inicial
+
+
+def generate_pdf_bytes(holerite_df, resumo, salario_base, salario_liquido, total_proventos, total_descontos):
+    proventos, descontos = [], []
+    for tipo, descricao, valor in holerite_df[["tipo", "descricao", "valor"]].itertuples(index=False, name=None):
+        (proventos if tipo == "Provento" else descontos).append((descricao, valor))
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    desenhar_holerite(c, proventos, descontos, salario_base, salario_liquido, total_proventos, total_descontos)
+    c.save()
+    buffer.seek(0)
+    return buffer
+
+
+# ---------------- Holerites em lote ----------------
+def _preenchido(reg, col):
+    """Campo presente e não vazio (células vazias da planilha chegam como NaN/None)."""
+    return col in reg and not pd.isna(reg[col])
+
+
+def _identificacao(reg):
+    partes = [f"{col.capitalize()}: {reg[col]}" for col in COLUNAS_IDENTIFICACAO if _preenchido(reg, col)]
+    return "  | ".join(partes)
+
+
+def _desenhar_registro(c, reg):
+    proventos = [(desc, reg[col]) for col, desc in PROVENTOS_LOTE if col == "salario_base" or reg.get(col, 0.0) > 0]
+    descontos = [(desc, reg[col]) for col, desc in DESCONTOS_LOTE if col in ("inss", "irrf") or reg.get(col, 0.0) > 0]
+    return desenhar_holerite(
+        c, proventos, descontos, reg["salario_base"], reg["salario_liquido"],
+        reg["salario_bruto"], reg["total_descontos"], identificacao=_identificacao(reg),
+    )
+
+
+def _nome_arquivo(reg, posicao):
+    rotulo = "_".join(str(reg[col]) for col in ("matricula", "nome") if _preenchido(reg, col))
+    rotulo = re.sub(r"[^\w-]+", "_", rotulo).strip("_")[:60]
+    return f"holerite_{posicao:06d}{'_' + rotulo if rotulo else ''}.pdf"
+
+
+def _pico_memoria_mb():
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss: KiB no Linux, bytes no macOS
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def _renderizar_bloco(indice, inicio, registros, pasta, por_funcionario):
+    """Executado nos processos do pool: grava os PDFs do bloco em `pasta`."""
+    arquivos = []
+    paginas = 0
+    if por_funcionario:
+        for posicao, reg in enumerate(registros, start=inicio):
+            caminho = os.path.join(pasta, _nome_arquivo(reg, posicao))
+            c = canvas.Canvas(caminho, pagesize=A4)
+            paginas += _desenhar_registro(c, reg)
+            c.save()
+            arquivos.append(caminho)
+    else:
+        caminho = os.path.join(pasta, f"parte_{indice:06d}.pdf")
+        c = canvas.Canvas(caminho, pagesize=A4)
+        for reg in registros:
+            paginas += _desenhar_registro(c, reg)
+        c.save()
+        arquivos.append(caminho)
+    return indice, arquivos, paginas, _pico_memoria_mb()
+
+
+def gerar_holerites_lote(resultado, destino, formato="pdf", processos=None, tamanho_bloco=250, progresso=None):
+    """
+    Gera os holerites de todos os funcionários de `resultado` (saída de
+    calcular_folha_lote/processar_roster) em `destino` (caminho de arquivo).
+
+    formato="pdf": um único PDF com todas as páginas (até LIMITE_PDF_UNICO
+    funcionários); formato="zip": um PDF por funcionário.
+    `processos`: tamanho do pool (padrão: nº de CPUs; 1 = sem pool).
+    Retorna estatísticas: funcionários, páginas, segundos, páginas por segundo e
+    pico de memória (MB, o maior entre o processo principal e os do pool).
+    """
+    if not PDF_AVAILABLE:
+        raise RuntimeError("reportlab não instalado — instale com: python -m pip install reportlab")
+    if formato not in ("pdf", "zip"):
+        raise ValueError("formato deve ser 'pdf' ou 'zip'")
+    if formato == "pdf" and len(resultado) > LIMITE_PDF_UNICO:
+        raise ValueError(f"PDF único limitado a {LIMITE_PDF_UNICO} funcionários — use o formato ZIP")
+    if formato == "pdf" and not PDF_MERGE_AVAILABLE:
+        # sem pypdf não há como juntar as partes: desenha tudo em um único canvas, em série
+        processos = 1
+    inicio = time.perf_counter()
+    por_funcionario = formato == "zip"
+    processos = processos or os.cpu_count() or 1
+    total = len(resultado)
+    blocos = (
+        (indice, pos, resultado.iloc[pos:pos + tamanho_bloco].to_dict("records"))
+        for indice, pos in enumerate(range(0, total, tamanho_bloco))
+    )
+    pasta = tempfile.mkdtemp(prefix="holerites_")
+    paginas = 0
+    picos = [_pico_memoria_mb()]
+    prontos = 0
+    partes = {}
+    try:
+        with zipfile.ZipFile(destino, "w", zipfile.ZIP_DEFLATED) if por_funcionario else nullcontext() as zf:
+
+            def concluir(indice, arquivos, n_paginas, pico, n_registros):
+                nonlocal paginas, prontos
+                paginas += n_paginas
+                picos.append(pico)
+                prontos += n_registros
+                if por_funcionario:
+                    for caminho in arquivos:
+                        zf.write(caminho, arcname=os.path.basename(caminho))
+                        os.remove(caminho)
+                elif arquivos:
+                    partes[indice] = arquivos[0]
+                if progresso is not None:
+                    progresso(prontos, total)
+
+            if processos == 1 and not por_funcionario:
+                # série: todas as páginas direto no arquivo de destino
+                c = canvas.Canvas(destino, pagesize=A4)
+                for _, _, registros in blocos:
+                    n = sum(_desenhar_registro(c, reg) for reg in registros)
+                    concluir(None, [], n, _pico_memoria_mb(), len(registros))
+                c.save()
+            elif processos == 1:
+                for indice, pos, registros in blocos:
+                    concluir(*_renderizar_bloco(indice, pos, registros, pasta, True), len(registros))
+            else:
+                with ProcessPoolExecutor(max_workers=processos) as pool:
+                    pendentes = {}
+                    for indice, pos, registros in blocos:
+                        # limita os blocos em voo para não acumular registros na fila do pool
+                        if len(pendentes) >= 2 * processos:
+                            feitos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                            for f in feitos:
+                                concluir(*f.result(), pendentes.pop(f))
+                        fut = pool.submit(_renderizar_bloco, indice, pos, registros, pasta, por_funcionario)
+                        pendentes[fut] = len(registros)
+                    for f in list(pendentes):
+                        concluir(*f.result(), pendentes.pop(f))
+                if not por_funcionario:
+                    writer = PdfWriter()
+                    for indice in sorted(partes):
+                        writer.append(partes[indice])
+                    with open(destino, "wb") as saida:
+                        writer.write(saida)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+    # depois de salvar/juntar o PDF, a etapa que mais ocupa memória no processo principal
+    picos.append(_pico_memoria_mb())
+
+    segundos = time.perf_counter() - inicio
+    picos = [p for p in picos if p is not None]
+    estatisticas = {
+        "funcionarios": total,
+        "paginas": paginas,
+        "segundos": segundos,
+        "paginas_por_segundo": paginas / segundos if segundos > 0 else 0.0,
+        "pico_memoria_mb": max(picos) if picos else None,
+    }
+    logger.info("Holerites em lote: %s", estatisticas)
+    return estatisticas
+
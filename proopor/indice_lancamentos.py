@@ -0,0 +1,322 @@
+"""
+Índices em memória para filtrar e buscar lançamentos do livro.
+
+- data e valor: posições das linhas ordenadas pela coluna; um intervalo é
+  uma busca binária (np.searchsorted) que devolve um trecho contíguo;
+- tipo, categoria e centro_custo: lista de linhas por valor (listas
+  invertidas em formato CSR: linhas agrupadas por código + deslocamentos);
+- texto (descrição, cliente, fornecedor): índice invertido de palavras
+  normalizadas (minúsculas, sem acento), com o vocabulário ordenado; cada
+  palavra da busca casa por prefixo ("forn" encontra "fornecedor") e todas
+  precisam aparecer no lançamento.
+
+Uma consulta começa pelo filtro mais seletivo (o tamanho de cada um sai dos
+índices sem tocar nas linhas) e confere os demais só nas linhas candidatas.
+O texto é tokenizado uma vez por valor distinto (pd.factorize), não por linha.
+"""
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from dinheiro import centavos, reais
+
+COLUNAS_CATEGORICAS = ["tipo", "categoria", "centro_custo"]
+COLUNAS_TEXTO = ["descrição", "cliente", "fornecedor"]
+
+_SEPARADOR = re.compile(r"[^0-9a-z]+")
+# datas que não puderam ser lidas ficam antes de qualquer intervalo
+_DATA_INVALIDA = np.iinfo("int64").min
+
+
+def normalizar(texto):
+    """Texto em minúsculas, sem acentos."""
+    decomposto = unicodedata.normalize("NFKD", str(texto))
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def _dia(d):
+    """AAAA-MM-DD ou date -> dias desde 1970-01-01."""
+    return int(np.datetime64(pd.Timestamp(d).date(), "D").astype("int64"))
+
+
+def palavras(texto):
+    return [p for p in _SEPARADOR.split(normalizar(texto)) if p]
+
+
+def _agrupar(codigos, n_grupos):
+    """Linhas agrupadas por código (CSR): (linhas, início), linhas do grupo g = linhas[início[g]:início[g + 1]]."""
+    linhas = np.argsort(codigos, kind="stable").astype("int64")
+    contagem = np.bincount(codigos, minlength=n_grupos)
+    inicio = np.zeros(n_grupos + 1, dtype="int64")
+    np.cumsum(contagem, out=inicio[1:])
+    return linhas, inicio
+
+
+def _entre(valores, minimo, maximo):
+    ok = np.ones(len(valores), dtype=bool)
+    if minimo is not None:
+        ok &= valores >= minimo
+    if maximo is not None:
+        ok &= valores <= maximo
+    return ok
+
+
+def _filtro_intervalo(ordem, ordenados, valores, minimo, maximo):
+    """
+    Filtro por intervalo (inclusivo; None = aberto) sobre uma coluna com
+    `ordem` = argsort e `ordenados` = valores[ordem]: (tamanho, candidatas(), conferir(linhas)).
+    """
+    ini = 0 if minimo is None else int(np.searchsorted(ordenados, minimo, side="left"))
+    fim = len(ordenados) if maximo is None else int(np.searchsorted(ordenados, maximo, side="right"))
+    fim = max(ini, fim)
+    return fim - ini, lambda: np.sort(ordem[ini:fim]), lambda linhas: _entre(valores[linhas], minimo, maximo)
+
+
+def _filtro_grupos(codigos, linhas, inicio, grupos):
+    """Filtro por lista invertida (CSR) de `grupos`: (tamanho, candidatas(), conferir(linhas))."""
+    tamanho = int((inicio[grupos + 1] - inicio[grupos]).sum())
+
+    def candidatas():
+        partes = [linhas[inicio[g]:inicio[g + 1]] for g in grupos]
+        return np.sort(np.concatenate(partes)) if partes else np.array([], dtype="int64")
+
+    return tamanho, candidatas, lambda l: np.isin(codigos[l], grupos)
+
+
+def _unicos_ordenados(valores):
+    """Valores distintos em ordem crescente (ordenação + vizinhos; mais rápido que np.unique para int64 grandes)."""
+    valores = np.sort(valores)
+    if len(valores) == 0:
+        return valores
+    return valores[np.concatenate(([True], valores[1:] != valores[:-1]))]
+
+
+def _contem(ordenado, linhas):
+    """Máscara: quais `linhas` estão no array ordenado `ordenado`."""
+    if len(ordenado) == 0:
+        return np.zeros(len(linhas), dtype=bool)
+    pos = np.searchsorted(ordenado, linhas)
+    return ordenado[np.minimum(pos, len(ordenado) - 1)] == linhas
+
+
+class IndiceLancamentos:
+    """
+    Índices de um DataFrame no formato de LivroLancamentos.carregar(em_centavos=True)
+    (índice = id, "valor" em centavos). O DataFrame não deve ser alterado depois.
+    """
+
+    def __init__(self, lancamentos):
+        self.lancamentos = lancamentos
+        n = len(lancamentos)
+        self._n = n
+        # datas como dias (int64); datas inválidas ficam fora de qualquer intervalo
+        datas = pd.to_datetime(lancamentos["data"], errors="coerce", format="%Y-%m-%d")
+        self._datas = datas.to_numpy().astype("datetime64[D]").astype("int64")
+        self._datas[datas.isna().to_numpy()] = _DATA_INVALIDA
+        self._ordem_data = np.argsort(self._datas, kind="stable")
+        self._datas_ordenadas = self._datas[self._ordem_data]
+        self._valores = lancamentos["valor"].to_numpy(dtype="int64")
+        self._ordem_valor = np.argsort(self._valores, kind="stable")
+        self._valores_ordenados = self._valores[self._ordem_valor]
+
+        self._categorias = {}
+        for col in COLUNAS_CATEGORICAS:
+            codigos, rotulos = pd.factorize(lancamentos[col].fillna(""), sort=True)
+            linhas, inicio = _agrupar(codigos, len(rotulos))
+            self._categorias[col] = (codigos, {r: i for i, r in enumerate(rotulos)}, linhas, inicio)
+
+        self._vocabulario, self._linhas_texto, self._inicio_texto = self._indexar_texto()
+
+    def _indexar_texto(self):
+        """Índice invertido (vocabulário ordenado, linhas, início) das palavras de COLUNAS_TEXTO."""
+        por_coluna = []
+        for col in COLUNAS_TEXTO:
+            codigos, distintos = pd.factorize(self.lancamentos[col])
+            # palavras de cada valor distinto (índice = código do valor)
+            por_distinto = pd.Series([palavras(v) for v in distintos], dtype=object).explode().dropna()
+            if not por_distinto.empty:
+                por_coluna.append((codigos, len(distintos), por_distinto))
+        if not por_coluna:
+            return np.array([], dtype=str), np.array([], dtype="int64"), np.zeros(1, dtype="int64")
+        vocabulario = np.unique(np.concatenate([p.to_numpy(dtype=str) for _, _, p in por_coluna]))
+
+        pares_palavra, pares_linha = [], []
+        for codigos, n_distintos, por_distinto in por_coluna:
+            # linhas de cada valor distinto, repetidas para cada palavra dele
+            validos = codigos >= 0
+            linhas, inicio = _agrupar(codigos[validos], n_distintos)
+            linhas = np.flatnonzero(validos)[linhas]
+            distinto = por_distinto.index.to_numpy()
+            tamanho = inicio[distinto + 1] - inicio[distinto]
+            deslocamento = np.arange(tamanho.sum()) - np.repeat(np.cumsum(tamanho) - tamanho, tamanho)
+            pares_linha.append(linhas[np.repeat(inicio[distinto], tamanho) + deslocamento])
+            palavra = np.searchsorted(vocabulario, por_distinto.to_numpy(dtype=str))
+            pares_palavra.append(np.repeat(palavra, tamanho))
+        # ordena por (palavra, linha) e remove repetições (mesma palavra em mais de uma coluna)
+        n = max(self._n, 1)
+        chave = _unicos_ordenados(np.concatenate(pares_palavra).astype("int64") * n + np.concatenate(pares_linha))
+        palavra, linha = np.divmod(chave, n)
+        inicio = np.zeros(len(vocabulario) + 1, dtype="int64")
+        np.cumsum(np.bincount(palavra, minlength=len(vocabulario)), out=inicio[1:])
+        return vocabulario, linha, inicio
+
+    def __len__(self):
+        return self._n
+
+    def valores(self, coluna):
+        """Valores distintos de uma coluna categórica (para as opções dos filtros)."""
+        return list(self._categorias[coluna][1])
+
+    def _palavra(self, termo):
+        """Linhas (ordenadas) com alguma palavra que começa por `termo`."""
+        ini = int(np.searchsorted(self._vocabulario, termo, side="left"))
+        # primeiro texto maior que todos os que começam por `termo`
+        fim = int(np.searchsorted(self._vocabulario, termo[:-1] + chr(ord(termo[-1]) + 1), side="left"))
+        trecho = self._linhas_texto[self._inicio_texto[ini]:self._inicio_texto[fim]]
+        return trecho if fim - ini <= 1 else _unicos_ordenados(trecho)
+
+    def buscar_linhas(self, data_inicial=None, data_final=None, tipos=None, categorias=None, centros_custo=None,
+                      valor_minimo=None, valor_maximo=None, texto=None):
+        """
+        Posições (ordem do livro) das linhas que atendem a todos os filtros informados.
+        Datas em AAAA-MM-DD ou date; valores em reais; listas vazias/None não filtram.
+        """
+        filtros = []  # (tamanho, candidatas() -> linhas ordenadas, conferir(linhas) -> máscara)
+        if data_inicial is not None or data_final is not None:
+            inicial = _DATA_INVALIDA + 1 if data_inicial is None else _dia(data_inicial)
+            final = None if data_final is None else _dia(data_final)
+            filtros.append(_filtro_intervalo(self._ordem_data, self._datas_ordenadas, self._datas, inicial, final))
+        if valor_minimo is not None or valor_maximo is not None:
+            minimo = None if valor_minimo is None else int(centavos(valor_minimo))
+            maximo = None if valor_maximo is None else int(centavos(valor_maximo))
+            filtros.append(_filtro_intervalo(self._ordem_valor, self._valores_ordenados, self._valores, minimo, maximo))
+        for col, escolhidos in zip(COLUNAS_CATEGORICAS, (tipos, categorias, centros_custo)):
+            if escolhidos:
+                codigos, posicao, linhas, inicio = self._categorias[col]
+                grupos = np.array([posicao[v] for v in escolhidos if v in posicao], dtype="int64")
+                filtros.append(_filtro_grupos(codigos, linhas, inicio, grupos))
+        for termo in palavras(texto or ""):
+            achadas = self._palavra(termo)
+            filtros.append((len(achadas), lambda achadas=achadas: achadas, lambda l, achadas=achadas: _contem(achadas, l)))
+
+        if not filtros:
+            return np.arange(self._n)
+        filtros.sort(key=lambda f: f[0])
+        linhas = filtros[0][1]()
+        for _, _, conferir in filtros[1:]:
+            if len(linhas) == 0:
+                break
+            linhas = linhas[conferir(linhas)]
+        return linhas
+
+    def carregar(self, linhas):
+        """Lançamentos nas posições `linhas` (índice = id, "valor" em reais)."""
+        resultado = self.lancamentos.iloc[linhas].copy()
+        resultado["valor"] = reais(resultado["valor"].to_numpy())
+        return resultado
+
+    def soma_centavos(self, linhas):
+        return int(self._valores[linhas].sum())
+
+    def buscar(self, **filtros):
+        """Lançamentos que atendem aos filtros de buscar_linhas."""
+        return self.carregar(self.buscar_linhas(**filtros))
+
+
+class IndiceIncremental:
+    """
+    Índice do livro com as alterações feitas depois da última reconstrução:
+    `base` (IndiceLancamentos), o segmento `delta` com os lançamentos incluídos
+    depois (índice próprio, montado na primeira consulta) e as linhas da base
+    já removidas (máscara). As posições seguem a ordem do livro: primeiro as
+    da base (0 .. len(base) - 1), depois as do delta (ids maiores que os da base).
+
+    É imutável: incluir/remover devolvem uma nova versão que compartilha a base.
+    """
+
+    def __init__(self, base, delta=None, vivas=None, removidas=0):
+        self.base = base
+        self.delta = base.lancamentos.iloc[:0] if delta is None else delta
+        self._ids_base = base.lancamentos.index.to_numpy()
+        self._vivas = vivas  # None = todas as linhas da base continuam no livro
+        self._removidas = removidas
+        self._indice_delta = None
+
+    def __len__(self):
+        return len(self.base) - self._removidas + len(self.delta)
+
+    @property
+    def ultimo_id(self):
+        """Maior id presente (0 se vazio): as inclusões seguintes têm ids acima dele."""
+        if len(self.delta):
+            return int(self.delta.index[-1])
+        if self._vivas is None or self._vivas[-1]:
+            return int(self._ids_base[-1]) if len(self._ids_base) else 0
+        vivas = np.flatnonzero(self._vivas)
+        return int(self._ids_base[vivas[-1]]) if len(vivas) else 0
+
+    def alteracoes(self):
+        """Inclusões e remoções acumuladas desde a reconstrução."""
+        return len(self.delta) + self._removidas
+
+    def incluir(self, novos):
+        """Nova versão com `novos` (mesmo formato da base, ids maiores que ultimo_id) no delta."""
+        if novos.empty:
+            return self
+        delta = novos if self.delta.empty else pd.concat([self.delta, novos])
+        return IndiceIncremental(self.base, delta, self._vivas, self._removidas)
+
+    def remover(self, ids):
+        """Nova versão sem os lançamentos `ids` (ids ausentes são ignorados)."""
+        ids = np.asarray(ids, dtype="int64")
+        delta = self.delta.drop(ids, errors="ignore")
+        pos = np.searchsorted(self._ids_base, ids)
+        pos = pos[(pos < len(self._ids_base)) & (self._ids_base[np.minimum(pos, len(self._ids_base) - 1)] == ids)]
+        vivas, removidas = self._vivas, self._removidas
+        if len(pos):
+            vivas = np.ones(len(self._ids_base), dtype=bool) if vivas is None else vivas.copy()
+            removidas += int(vivas[pos].sum())
+            vivas[pos] = False
+        return IndiceIncremental(self.base, delta, vivas, removidas)
+
+    def _delta(self):
+        if self._indice_delta is None:
+            self._indice_delta = IndiceLancamentos(self.delta)
+        return self._indice_delta
+
+    def valores(self, coluna):
+        valores = set(self.base.valores(coluna))
+        if len(self.delta):
+            valores.update(self._delta().valores(coluna))
+        return sorted(valores)
+
+    def buscar_linhas(self, **filtros):
+        """Como IndiceLancamentos.buscar_linhas: base sem as linhas removidas, seguida do delta."""
+        linhas = self.base.buscar_linhas(**filtros)
+        if self._vivas is not None:
+            linhas = linhas[self._vivas[linhas]]
+        if len(self.delta):
+            linhas = np.concatenate([linhas, len(self.base) + self._delta().buscar_linhas(**filtros)])
+        return linhas
+
+    def carregar(self, linhas):
+        linhas = np.asarray(linhas, dtype="int64")
+        n = len(self.base)
+        na_base = linhas < n
+        if na_base.all():
+            return self.base.carregar(linhas)
+        return pd.concat([self.base.carregar(linhas[na_base]), self._delta().carregar(linhas[~na_base] - n)])
+
+    def soma_centavos(self, linhas):
+        linhas = np.asarray(linhas, dtype="int64")
+        n = len(self.base)
+        na_base = linhas < n
+        soma = self.base.soma_centavos(linhas[na_base])
+        if not na_base.all():
+            soma += self._delta().soma_centavos(linhas[~na_base] - n)
+        return soma
+
+    def buscar(self, **filtros):
+        return self.carregar(self.buscar_linhas(**filtros))
@@ -0,0 +1,406 @@
+"""
+Livro de lançamentos contábeis persistido em SQLite.
+
+Substitui o DataFrame em st.session_state da aba "Lançamentos Contábeis":
+inclusão em O(1) (um INSERT), índices nas colunas usadas em filtros,
+remoção por id estável e leitura para o pandas apenas das linhas exibidas.
+Os dados continuam disponíveis depois que a sessão do navegador termina.
+
+Os totais ficam em um cubo de agregados (tabela `cubo_lancamentos`): soma e
+quantidade por mês × tipo × categoria × centro de custo × cliente,
+atualizado na mesma transação de cada inclusão/remoção/limpeza e espelhado
+em memória. As métricas da aba, a DRE e as consultas do Dashboard leem o
+cubo, não o livro.
+
+Valores são gravados em centavos (INTEGER, dinheiro.py): o valor em reais é
+convertido ao entrar e os totais são somas exatas de inteiros.
+
+Filtros e busca da aba usam índices em memória sobre o livro inteiro
+(indice_lancamentos.py). Inclusões e remoções feitas por esta instância
+entram no índice como alterações (IndiceIncremental), sem refazê-lo; ele só
+é refeito quando as alterações se acumulam ou o banco muda por fora.
+"""
+import itertools
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+
+import pandas as pd
+
+from dinheiro import centavos, reais
+from indice_lancamentos import IndiceIncremental, IndiceLancamentos
+
+# colunas exibidas na aba (em português) e a coluna correspondente no banco
+COLUNAS = ["data", "descrição", "valor", "tipo", "conta", "categoria", "data_vencimento", "data_recebimento", "cliente", "fornecedor", "centro_custo"]
+COLUNAS_BANCO = [{"descrição": "descricao", "valor": "valor_centavos"}.get(c, c) for c in COLUNAS]
+COLUNAS_INDEXADAS = ["data", "tipo", "categoria", "centro_custo", "cliente", "fornecedor"]
+# dimensões do cubo de agregados ("mes" = AAAA-MM da data)
+DIMENSOES_CUBO = ["mes", "tipo", "categoria", "centro_custo", "cliente"]
+# linhas por consulta em carregar_em_blocos (exportações)
+TAMANHO_BLOCO_LEITURA = 50_000
+# lançamentos convertidos e gravados por vez em adicionar_varios
+TAMANHO_BLOCO_INCLUSAO = 50_000
+# o índice em memória é refeito do zero quando as inclusões/remoções acumuladas
+# passam do maior destes limites (absoluto ou fração do livro indexado)
+LIMITE_ALTERACOES_INDICE = 10_000
+FRACAO_ALTERACOES_INDICE = 0.02
+
+CAMINHO_PADRAO = os.environ.get(
+    "EFICICASH_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "eficicash.db")
+)
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS lancamentos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data TEXT NOT NULL,
+    descricao TEXT,
+    valor_centavos INTEGER NOT NULL,
+    tipo TEXT,
+    conta TEXT,
+    categoria TEXT,
+    data_vencimento TEXT,
+    data_recebimento TEXT,
+    cliente TEXT,
+    fornecedor TEXT,
+    centro_custo TEXT
+);
+CREATE TABLE IF NOT EXISTS cubo_lancamentos (
+    mes TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    centro_custo TEXT NOT NULL,
+    cliente TEXT NOT NULL,
+    soma_centavos INTEGER NOT NULL,
+    quantidade INTEGER NOT NULL,
+    PRIMARY KEY (mes, tipo, categoria, centro_custo, cliente)
+);
+""" + "".join(
+    f"CREATE INDEX IF NOT EXISTS idx_lancamentos_{c} ON lancamentos({c});\n" for c in COLUNAS_INDEXADAS
+)
+
+_UPSERT_TOTAIS = (
+    f"INSERT INTO cubo_lancamentos ({', '.join(DIMENSOES_CUBO)}, soma_centavos, quantidade) "
+    f"VALUES ({', '.join('?' * (len(DIMENSOES_CUBO) + 2))}) "
+    f"ON CONFLICT ({', '.join(DIMENSOES_CUBO)}) DO UPDATE SET "
+    "soma_centavos = soma_centavos + excluded.soma_centavos, quantidade = quantidade + excluded.quantidade"
+)
+_AGREGAR_LIVRO = (
+    "SELECT substr(data, 1, 7), "
+    + "".join(f"COALESCE({d}, ''), " for d in DIMENSOES_CUBO[1:])
+    + f"SUM(valor_centavos), COUNT(*) FROM lancamentos GROUP BY {', '.join(str(i + 1) for i in range(len(DIMENSOES_CUBO)))}"
+)
+
+
+def _chave_totais(lancamento):
+    """Célula do cubo de um lançamento: (mes, tipo, categoria, centro_custo, cliente)."""
+    return (str(lancamento.get("data") or "")[:7],) + tuple(lancamento.get(d) or "" for d in DIMENSOES_CUBO[1:])
+
+
+class LivroLancamentos:
+    """Acesso ao livro de lançamentos. Uma instância por processo (conexão compartilhada entre threads)."""
+
+    def __init__(self, caminho=CAMINHO_PADRAO):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(caminho, check_same_thread=False)
+        if caminho != ":memory:":
+            self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.executescript(_ESQUEMA)
+        self._con.commit()
+        self._versao = None
+        self._indice = None  # (PRAGMA data_version na montagem, IndiceIncremental)
+        self._geracao = 0  # alterações feitas por esta instância
+        with self._lock:
+            vazio = self._con.execute("SELECT NOT EXISTS (SELECT 1 FROM cubo_lancamentos)").fetchone()[0]
+        if vazio:
+            # cubo vazio: recalcula a partir do livro (em um banco novo não há o que somar)
+            self.reconstruir_totais()
+        self._sincronizar()
+
+    # ---------------- totais incrementais ----------------
+    def _carregar_totais(self):
+        self._totais = {
+            tuple(linha[:-2]): list(linha[-2:])
+            for linha in self._con.execute(
+                f"SELECT {', '.join(DIMENSOES_CUBO)}, soma_centavos, quantidade FROM cubo_lancamentos"
+            )
+        }
+        self._cubo = None
+        self._por_tipo = defaultdict(int)
+        self._por_categoria = defaultdict(int)
+        for (_, tipo, cat, *_), (soma, _) in self._totais.items():
+            self._por_tipo[tipo] += soma
+            self._por_categoria[cat] += soma
+
+    def _sincronizar(self):
+        """Recarrega o espelho em memória se outra conexão alterou o banco."""
+        with self._lock:
+            versao = self._con.execute("PRAGMA data_version").fetchone()[0]
+            if versao != self._versao:
+                self._carregar_totais()
+                self._versao = versao
+
+    def _acumular(self, chave, soma, quantidade):
+        """Aplica um delta (em centavos) em uma célula do cubo, dentro da transação corrente, e no espelho."""
+        self._con.execute(_UPSERT_TOTAIS, (*chave, soma, quantidade))
+        atual = self._totais.setdefault(chave, [0, 0])
+        atual[0] += soma
+        atual[1] += quantidade
+        if atual[1] <= 0:
+            self._con.execute(
+                f"DELETE FROM cubo_lancamentos WHERE {' AND '.join(f'{d} = ?' for d in DIMENSOES_CUBO)}", chave
+            )
+            del self._totais[chave]
+        self._cubo = None
+        self._por_tipo[chave[1]] += soma
+        self._por_categoria[chave[2]] += soma
+
+    def reconstruir_totais(self):
+        """Recalcula o cubo a partir do livro inteiro."""
+        with self._lock, self._con:
+            self._con.execute("DELETE FROM cubo_lancamentos")
+            self._con.execute(
+                f"INSERT INTO cubo_lancamentos ({', '.join(DIMENSOES_CUBO)}, soma_centavos, quantidade) " + _AGREGAR_LIVRO
+            )
+            self._carregar_totais()
+
+    def verificar_totais(self):
+        """
+        Compara o cubo mantido com o recalculado do zero.
+        Retorna a lista de divergências [(*célula, (centavos, qtd) mantido, recalculado)];
+        vazia = consistente. A comparação é exata (somas de inteiros).
+        """
+        self._sincronizar()
+        with self._lock:
+            recalculado = {tuple(l[:-2]): tuple(l[-2:]) for l in self._con.execute(_AGREGAR_LIVRO)}
+            mantido = {k: tuple(v) for k, v in self._totais.items()}
+        divergencias = []
+        for chave in sorted(set(recalculado) | set(mantido)):
+            m = mantido.get(chave, (0, 0))
+            r = recalculado.get(chave, (0, 0))
+            if m != r:
+                divergencias.append((*chave, m, r))
+        return divergencias
+
+    def _linha(self, lancamento):
+        return tuple(centavos(lancamento[c]) if c == "valor" else lancamento.get(c) for c in COLUNAS)
+
+    def adicionar(self, lancamento):
+        """
+        Inclui um lançamento (dicionário com as chaves de COLUNAS, "valor" em reais)
+        e retorna o id gerado.
+        """
+        self._sincronizar()
+        linha = self._linha(lancamento)
+        with self._lock, self._con:
+            cur = self._con.execute(
+                f"INSERT INTO lancamentos ({', '.join(COLUNAS_BANCO)}) VALUES ({', '.join('?' * len(COLUNAS))})",
+                linha,
+            )
+            self._acumular(_chave_totais(lancamento), linha[COLUNAS.index("valor")], 1)
+            self._incluir_no_indice()
+        return cur.lastrowid
+
+    def adicionar_varios(self, lancamentos):
+        """
+        Inclusão em lote (um único commit); `lancamentos` é um iterável de dicionários.
+        Lido em blocos de TAMANHO_BLOCO_INCLUSAO: o valor de cada bloco vai para
+        centavos numa só chamada e o INSERT recebe as colunas do bloco.
+        """
+        self._sincronizar()
+        delta = defaultdict(lambda: [0, 0])
+        lancamentos = iter(lancamentos)
+        sql = f"INSERT INTO lancamentos ({', '.join(COLUNAS_BANCO)}) VALUES ({', '.join('?' * len(COLUNAS))})"
+        incluidos = 0
+        with self._lock, self._con:
+            while True:
+                bloco = list(itertools.islice(lancamentos, TAMANHO_BLOCO_INCLUSAO))
+                if not bloco:
+                    break
+                valores = centavos([l["valor"] for l in bloco]).tolist()
+                colunas = [valores if c == "valor" else [l.get(c) for l in bloco] for c in COLUNAS]
+                incluidos += self._con.executemany(sql, zip(*colunas)).rowcount
+                for l, valor in zip(bloco, valores):
+                    d = delta[_chave_totais(l)]
+                    d[0] += valor
+                    d[1] += 1
+            for chave, (soma, qtd) in delta.items():
+                self._acumular(chave, soma, qtd)
+            self._incluir_no_indice()
+        return incluidos
+
+    def remover(self, lancamento_id):
+        """Remove pelo id. Retorna False se o id não existe."""
+        self._sincronizar()
+        with self._lock, self._con:
+            campos = ["data"] + DIMENSOES_CUBO[1:]
+            linha = self._con.execute(
+                f"SELECT {', '.join(campos)}, valor_centavos FROM lancamentos WHERE id = ?", (int(lancamento_id),)
+            ).fetchone()
+            if linha is None:
+                return False
+            self._con.execute("DELETE FROM lancamentos WHERE id = ?", (int(lancamento_id),))
+            self._acumular(_chave_totais(dict(zip(campos, linha))), -linha[-1], -1)
+            self._remover_do_indice(int(lancamento_id))
+        return True
+
+    def limpar(self):
+        with self._lock, self._con:
+            self._con.execute("DELETE FROM lancamentos")
+            self._con.execute("DELETE FROM cubo_lancamentos")
+            self._carregar_totais()
+            self._geracao += 1
+            self._indice = None
+
+    def contar(self):
+        with self._lock:
+            return self._con.execute("SELECT COUNT(*) FROM lancamentos").fetchone()[0]
+
+    def _consultar(self, sql, params=()):
+        with self._lock:
+            return self._con.execute(sql, params).fetchall()
+
+    def carregar(self, limite=None, deslocamento=0, em_centavos=False):
+        """
+        Lançamentos em ordem de inclusão, indexados pelo id; `limite`/`deslocamento` para paginar.
+        A coluna "valor" volta em reais; com `em_centavos`, fica em centavos (int64).
+        """
+        sql = f"SELECT id, {', '.join(COLUNAS_BANCO)} FROM lancamentos ORDER BY id"
+        params = ()
+        if limite is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = (int(limite), int(deslocamento))
+        return self._quadro(self._consultar(sql, params), em_centavos)
+
+    def carregar_em_blocos(self, tamanho_bloco=TAMANHO_BLOCO_LEITURA, em_centavos=False):
+        """
+        O livro inteiro em DataFrames de até `tamanho_bloco` linhas (mesmo formato de
+        carregar), lidos um de cada vez a partir do último id (sem OFFSET).
+        """
+        sql = f"SELECT id, {', '.join(COLUNAS_BANCO)} FROM lancamentos WHERE id > ? ORDER BY id LIMIT ?"
+        ultimo = 0
+        while True:
+            registros = self._consultar(sql, (ultimo, int(tamanho_bloco)))
+            if not registros:
+                return
+            ultimo = registros[-1][0]
+            yield self._quadro(registros, em_centavos)
+
+    @staticmethod
+    def _quadro(registros, em_centavos):
+        df = pd.DataFrame.from_records(registros, columns=["id"] + COLUNAS)
+        df["valor"] = df["valor"].astype("int64")
+        if not em_centavos:
+            df["valor"] = reais(df["valor"].to_numpy())
+        return df.set_index("id")
+
+    def indice(self):
+        """
+        Índices de filtro e busca (IndiceIncremental) sobre o livro inteiro.
+        Montados na primeira consulta; as inclusões e remoções desta instância
+        entram como alterações, e o índice só é refeito quando elas passam do
+        limite ou quando outra conexão altera o banco (PRAGMA data_version).
+        """
+        with self._lock:
+            versao = self._con.execute("PRAGMA data_version").fetchone()[0]
+            atual = self._indice
+        if atual is not None:
+            versao_indice, indice = atual
+            limite = max(LIMITE_ALTERACOES_INDICE, FRACAO_ALTERACOES_INDICE * len(indice.base))
+            if versao_indice == versao and indice.alteracoes() <= limite:
+                return indice
+        with self._lock:
+            geracao = self._geracao
+            versao = self._con.execute("PRAGMA data_version").fetchone()[0]
+            registros = self._con.execute(f"SELECT id, {', '.join(COLUNAS_BANCO)} FROM lancamentos ORDER BY id").fetchall()
+        indice = IndiceIncremental(IndiceLancamentos(self._quadro(registros, em_centavos=True)))
+        with self._lock:
+            # uma alteração durante a montagem não está no índice: ele vale só para esta consulta
+            if self._geracao == geracao:
+                self._indice = (versao, indice)
+        return indice
+
+    def _incluir_no_indice(self):
+        """Leva ao índice em memória, se já montado, os lançamentos com id acima do último indexado (com a trava)."""
+        self._geracao += 1
+        if self._indice is not None:
+            versao, indice = self._indice
+            registros = self._con.execute(
+                f"SELECT id, {', '.join(COLUNAS_BANCO)} FROM lancamentos WHERE id > ? ORDER BY id", (indice.ultimo_id,)
+            ).fetchall()
+            self._indice = (versao, indice.incluir(self._quadro(registros, em_centavos=True)))
+
+    def _remover_do_indice(self, lancamento_id):
+        self._geracao += 1
+        if self._indice is not None:
+            versao, indice = self._indice
+            self._indice = (versao, indice.remover([lancamento_id]))
+
+    def totais_centavos(self):
+        """Totais exibidos na aba, em centavos: por categoria Gasto/Ganho e por tipo receita/despesa."""
+        self._sincronizar()
+        return {
+            "gasto": self._por_categoria.get("Gasto", 0),
+            "ganho": self._por_categoria.get("Ganho", 0),
+            "receita": self._por_tipo.get("receita", 0),
+            "despesa": self._por_tipo.get("despesa", 0),
+        }
+
+    def totais(self):
+        """Mesmos totais de totais_centavos, em reais (sem varrer o livro)."""
+        return {k: reais(v) for k, v in self.totais_centavos().items()}
+
+    def cubo(self):
+        """Células do cubo (DIMENSOES_CUBO + soma_centavos e quantidade), reconstruídas só após alterações."""
+        self._sincronizar()
+        with self._lock:
+            if self._cubo is None:
+                linhas = [(*chave, soma, qtd) for chave, (soma, qtd) in self._totais.items()]
+                cubo = pd.DataFrame(linhas, columns=DIMENSOES_CUBO + ["soma_centavos", "quantidade"])
+                for d in DIMENSOES_CUBO:
+                    cubo[d] = cubo[d].astype("category")
+                cubo["soma_centavos"] = cubo["soma_centavos"].astype("int64")
+                cubo["quantidade"] = cubo["quantidade"].astype("int64")
+                self._cubo = cubo
+            return self._cubo
+
+    def consultar_cubo(self, linhas, colunas=None, filtros=None, mes_inicial=None, mes_final=None, medida="soma"):
+        """
+        Fatia o cubo: agrega `medida` ("soma" em reais, "soma_centavos" ou "quantidade")
+        pelas dimensões `linhas` (e `colunas`, em formato de tabela dinâmica).
+        `filtros` = {dimensão: valor ou lista de valores}; `mes_inicial`/`mes_final` em AAAA-MM (inclusivos).
+        """
+        cubo = self.cubo()
+        sel = pd.Series(True, index=cubo.index)
+        for dim, valores in (filtros or {}).items():
+            valores = valores if isinstance(valores, (list, tuple, set)) else [valores]
+            sel &= cubo[dim].isin(list(valores))
+        if mes_inicial:
+            sel &= cubo["mes"].astype(str) >= mes_inicial
+        if mes_final:
+            sel &= cubo["mes"].astype(str) <= mes_final
+        coluna = "quantidade" if medida == "quantidade" else "soma_centavos"
+        dims = list(linhas) + ([] if colunas is None else [colunas])
+        resultado = cubo.loc[sel].groupby(dims, observed=True)[coluna].sum()
+        # rótulos como texto simples (as categorias do cubo são um detalhe interno)
+        resultado.index = resultado.index.map(lambda k: tuple(map(str, k)) if isinstance(k, tuple) else str(k))
+        if len(dims) > 1:
+            resultado.index.names = dims
+        else:
+            resultado.index.name = dims[0]
+        if colunas is not None:
+            resultado = resultado.unstack(colunas, fill_value=0)
+        if medida == "soma":
+            resultado = resultado / 100.0
+        return resultado.rename(medida) if colunas is None else resultado
+
+    def totais_por_mes(self):
+        """DataFrame com soma (reais), soma_centavos e quantidade por mês, tipo e categoria."""
+        por_mes = self.consultar_cubo(["mes", "tipo", "categoria"], medida="soma_centavos").rename("soma_centavos").to_frame()
+        por_mes["quantidade"] = self.consultar_cubo(["mes", "tipo", "categoria"], medida="quantidade")
+        por_mes.insert(0, "soma", reais(por_mes["soma_centavos"].to_numpy()))
+        return por_mes.reset_index().astype({"mes": str, "tipo": str, "categoria": str})
+
+    def fechar(self):
+        self._con.close()
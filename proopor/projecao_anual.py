@@ -0,0 +1,145 @@
+"""
+Projeção anual da folha: custo do empregador de cada funcionário em cada mês
+do ano (regime de caixa), incluindo 13º salário, férias com 1/3, FGTS, INSS
+patronal e reajustes programados.
+
+O cálculo é uma grade funcionários x 12 meses em centavos (int64). O salário
+bruto de cada mês vem de calcular_base_lote aplicado ao salário base
+reajustado; como o salário só muda nos meses de reajuste, cada funcionário é
+calculado uma vez por faixa de meses com o mesmo salário, e não 12 vezes.
+
+Regras:
+- salário: o bruto do mês (folha_lote), a partir do mês de admissão;
+- férias: no mês de gozo o funcionário recebe a remuneração do mês mais 1/3;
+- 13º: 1ª parcela (metade) em novembro e o restante em dezembro, sobre o
+  bruto do mês do pagamento, proporcional aos meses trabalhados no ano (avos);
+- FGTS sobre salário, 1/3 de férias e cada parcela do 13º no mês em que é paga;
+- INSS patronal sobre salário e 1/3 de férias, e sobre o 13º inteiro em dezembro.
+
+Colunas opcionais da planilha (além das de CAMPOS_FOLHA): ver CAMPOS_PROJECAO.
+"""
+import numpy as np
+import pandas as pd
+
+from dinheiro import arredondar, centavos, reais
+from folha_lote import CAMPOS_FOLHA, calcular_base_lote
+
+MESES = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
+# coluna opcional: valor usado quando ausente ou vazia
+CAMPOS_PROJECAO = {
+    "mes_admissao": 1,  # 1-12; admitidos depois de janeiro entram no mês indicado
+    "mes_ferias": 0,  # 1-12; 0 = sem férias no ano
+    "mes_reajuste": 0,  # 1-12; reajuste individual a partir deste mês (0 = nenhum)
+    "reajuste_percent": 0.0,
+}
+# componentes do custo (chave, rótulo na tabela mensal)
+COMPONENTES = [
+    ("salario", "Salários"),
+    ("ferias_1_3", "1/3 de férias"),
+    ("decimo_terceiro", "13º salário"),
+    ("fgts", "FGTS"),
+    ("inss_patronal", "INSS patronal"),
+    ("custo_total_empregador", "Custo empregador"),
+]
+MES_1A_PARCELA_13 = 11
+MES_2A_PARCELA_13 = 12
+# funcionários x meses por bloco (limita a memória das grades)
+ELEMENTOS_POR_BLOCO = 600_000
+
+_MESES_NUM = np.arange(1, 13)
+
+
+def _campo(df, nome):
+    padrao = CAMPOS_PROJECAO[nome]
+    if nome not in df.columns:
+        return np.full(len(df), float(padrao))
+    return pd.to_numeric(df[nome], errors="coerce").fillna(float(padrao)).to_numpy(dtype="float64")
+
+
+def fatores_reajuste(reajustes):
+    """{mês: %} -> fator acumulado de cada mês (12 posições). Ex.: {5: 6.0} -> 1.0 até abril, 1.06 a partir de maio."""
+    fator = np.ones(12)
+    for mes, percent in sorted((reajustes or {}).items()):
+        fator[_MESES_NUM >= int(mes)] *= 1 + percent / 100.0
+    return fator
+
+
+def _projetar_bloco(funcionarios, fgts_percent, inss_patronal_percent, fator_geral):
+    """Grades funcionários x meses (centavos) de cada componente de COMPONENTES."""
+    n = len(funcionarios)
+    sb = pd.to_numeric(funcionarios["salario_base"], errors="coerce").to_numpy(dtype="float64")
+    mes_reajuste = _campo(funcionarios, "mes_reajuste")[:, None]
+    individual = np.where(
+        (mes_reajuste >= 1) & (_MESES_NUM >= mes_reajuste), 1 + _campo(funcionarios, "reajuste_percent")[:, None] / 100.0, 1.0
+    )
+    salario_base = arredondar(sb[:, None] * (fator_geral * individual))
+
+    # bruto uma vez por faixa de meses com o mesmo salário base
+    novo = np.ones((n, 12), dtype=bool)
+    novo[:, 1:] = salario_base[:, 1:] != salario_base[:, :-1]
+    linhas = np.repeat(np.arange(n), 12)[novo.ravel()]
+    entradas = funcionarios[[c for c in CAMPOS_FOLHA if c in funcionarios.columns]]
+    segmentos = entradas.iloc[linhas].assign(salario_base=salario_base[novo])
+    bruto_segmento = calcular_base_lote(segmentos)["salario_bruto"].to_numpy()
+    bruto = bruto_segmento[np.cumsum(novo.ravel()) - 1].reshape(n, 12)
+
+    mes_admissao = _campo(funcionarios, "mes_admissao")
+    ativo = _MESES_NUM >= mes_admissao[:, None]
+    c_salario = np.where(ativo, centavos(bruto), 0)
+    ferias = ativo & (_MESES_NUM == _campo(funcionarios, "mes_ferias")[:, None])
+    c_terco = np.where(ferias, centavos(arredondar(bruto / 3.0)), 0)
+
+    avos = np.clip(13 - mes_admissao, 0, 12)
+    i1, i2 = MES_1A_PARCELA_13 - 1, MES_2A_PARCELA_13 - 1
+    c_13_total = centavos(arredondar(bruto[:, i2] * avos / 12.0))
+    c_1a_parcela = np.where(ativo[:, i1], centavos(arredondar(bruto[:, i1] * avos / 12.0 / 2.0)), 0)
+    c_13 = np.zeros((n, 12), dtype="int64")
+    c_13[:, i1] = c_1a_parcela
+    c_13[:, i2] = c_13_total - c_1a_parcela
+
+    base_patronal = c_salario + c_terco
+    base_patronal[:, i2] += c_13_total
+    c_fgts = centavos(arredondar(reais(c_salario + c_terco + c_13) * (fgts_percent / 100.0)))
+    c_patronal = centavos(arredondar(reais(base_patronal) * (inss_patronal_percent / 100.0)))
+    return {
+        "salario": c_salario,
+        "ferias_1_3": c_terco,
+        "decimo_terceiro": c_13,
+        "fgts": c_fgts,
+        "inss_patronal": c_patronal,
+        "custo_total_empregador": c_salario + c_terco + c_13 + c_fgts + c_patronal,
+    }
+
+
+def projetar_ano(funcionarios, fgts_percent, inss_patronal_percent, reajustes=None, por_funcionario=False):
+    """
+    Projeção de 12 meses da folha (DataFrame no formato de calcular_folha_lote,
+    com as colunas opcionais de CAMPOS_PROJECAO). `reajustes`: {mês: %} para
+    todos os funcionários (ex.: dissídio {5: 6.0}), acumulado com o individual.
+
+    Retorna a tabela mensal: uma linha por mês com os componentes em reais.
+    Com `por_funcionario` retorna (mensal, custo), onde o custo tem uma linha
+    por funcionário (mesmo índice) com o custo de cada mês e o total do ano.
+    """
+    fator_geral = fatores_reajuste(reajustes)
+    n = len(funcionarios)
+    tamanho_bloco = max(1_000, ELEMENTOS_POR_BLOCO // 12)
+    somas = {c: np.zeros(12, dtype="int64") for c, _ in COMPONENTES}
+    custos = []
+    for i in range(0, n, tamanho_bloco):
+        grades = _projetar_bloco(funcionarios.iloc[i:i + tamanho_bloco], fgts_percent, inss_patronal_percent, fator_geral)
+        for c in somas:
+            somas[c] += grades[c].sum(axis=0, dtype="int64")
+        if por_funcionario:
+            custos.append(grades["custo_total_empregador"])
+
+    mensal = pd.DataFrame({"Mês": MESES})
+    for c, rotulo in COMPONENTES:
+        mensal[rotulo] = reais(somas[c])
+    if not por_funcionario:
+        return mensal
+
+    grade = np.concatenate(custos) if custos else np.zeros((0, 12), dtype="int64")
+    custo = pd.DataFrame(reais(grade), index=funcionarios.index, columns=MESES)
+    custo["Total"] = reais(grade.sum(axis=1, dtype="int64"))
+    return mensal, custo
@@ -0,0 +1,9 @@
+import os
+import sys
+
+PASTA_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# os módulos do app são importados pelo nome (o app roda a partir desta pasta)
+sys.path.insert(0, PASTA_APP)
+# financial-management-system (pacote `src`), para conferir o que ele duplica do app
+sys.path.insert(1, os.path.join(PASTA_APP, "financial-management-system"))
@@ -0,0 +1,54 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+import cenarios
+from cenarios import MEDIDAS, grade_cenarios, simular_cenarios
+from dados_sinteticos import gerar_dataframe
+from faixas import FAIXAS_IRRF_PADRAO
+from folha_lote import calcular_folha_lote
+
+
+def _grade():
+    nova = [dict(f) for f in FAIXAS_IRRF_PADRAO]
+    nova[0]["max"], nova[1]["min"] = 2259.20, 2259.21
+    return grade_cenarios(inss_patronal_percent=[20, 22], irrf_faixas={"atual": FAIXAS_IRRF_PADRAO, "nova": nova})
+
+
+def test_detalhe_igual_a_folha_lote_de_cada_cenario():
+    roster = gerar_dataframe("roster", 400, 3)
+    grade = _grade()
+    assert len(grade) == 4
+    comparacao, detalhe = simular_cenarios(roster, grade, processos=1, por_funcionario=True)
+    for c in grade:
+        esperado = calcular_folha_lote(
+            roster, c["inss_faixas"], c["irrf_faixas"], c["deducao_por_dependente"], c["fgts_percent"],
+            c["inss_patronal_percent"],
+        )
+        d = detalhe[detalhe["cenario"] == c["nome"]]
+        assert list(d["funcionario"]) == list(roster.index)
+        for m, rotulo in MEDIDAS:
+            assert (d[m].to_numpy() == esperado[m].to_numpy()).all(), (c["nome"], m)
+            linha = comparacao.loc[comparacao["Cenário"] == c["nome"], rotulo].item()
+            assert linha == pytest.approx(esperado[m].sum(), abs=0.005)
+
+
+def test_pool_em_varios_blocos_igual_ao_serial(monkeypatch):
+    roster = gerar_dataframe("roster", 2_500, 5)
+    grade = _grade()
+    serial, detalhe_serial = simular_cenarios(roster, grade, processos=1, por_funcionario=True)
+    # blocos de 1.000 funcionários e pool mesmo com poucos funcionários
+    monkeypatch.setattr(cenarios, "ELEMENTOS_POR_BLOCO", 1)
+    monkeypatch.setattr(cenarios, "MIN_FUNCIONARIOS_POOL", 0)
+    pools = []
+
+    def executor(**kwargs):
+        pools.append(kwargs["max_workers"])
+        return ProcessPoolExecutor(**kwargs)
+
+    monkeypatch.setattr(cenarios, "ProcessPoolExecutor", executor)
+    pool, detalhe_pool = simular_cenarios(roster, grade, processos=2, por_funcionario=True)
+    assert pools == [2]
+    pd.testing.assert_frame_equal(pool, serial)
+    pd.testing.assert_frame_equal(detalhe_pool, detalhe_serial)
@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+
+from dados_sinteticos import gravar_no_livro
+from livro_lancamentos import LivroLancamentos
+
+
+def _totais_do_livro(livro):
+    """totais() recalculado a partir dos lançamentos, sem o cubo."""
+    df = livro.carregar(em_centavos=True)
+
+    def soma(sel):
+        return int(df.loc[sel, "valor"].sum()) / 100.0
+
+    return {
+        "gasto": soma(df["categoria"] == "Gasto"),
+        "ganho": soma(df["categoria"] == "Ganho"),
+        "receita": soma(df["tipo"] == "receita"),
+        "despesa": soma(df["tipo"] == "despesa"),
+    }
+
+
+def _consistente(livro):
+    assert livro.verificar_totais() == []
+    assert livro.totais() == pytest.approx(_totais_do_livro(livro), abs=0.001)
+
+
+@pytest.fixture
+def livro(tmp_path):
+    livro = LivroLancamentos(str(tmp_path / "livro.db"))
+    gravar_no_livro(livro, 2_000, 5)
+    yield livro
+    livro.fechar()
+
+
+def test_cubo_corrompido_e_reconstruido(livro):
+    _consistente(livro)
+    celula = livro.cubo().sort_values("soma_centavos").iloc[-1]
+    # outra conexão altera uma célula do cubo, como um erro de gravação faria
+    with sqlite3.connect(livro.caminho) as con:
+        alteradas = con.execute(
+            "UPDATE cubo_lancamentos SET soma_centavos = soma_centavos + 12345, quantidade = quantidade + 1 "
+            "WHERE mes = ? AND tipo = ? AND categoria = ? AND centro_custo = ? AND cliente = ?",
+            [str(celula[d]) for d in ("mes", "tipo", "categoria", "centro_custo", "cliente")],
+        ).rowcount
+    assert alteradas == 1
+
+    divergencias = livro.verificar_totais()
+    assert len(divergencias) == 1
+    *chave, mantido, recalculado = divergencias[0]
+    assert mantido == (recalculado[0] + 12345, recalculado[1] + 1)
+    assert livro.totais() != pytest.approx(_totais_do_livro(livro), abs=0.001)
+
+    livro.reconstruir_totais()
+    _consistente(livro)
+
+
+def test_totais_acompanham_inclusao_remocao_e_limpeza(livro):
+    novo = {"data": "2024-02-10", "descrição": "Venda avulsa", "valor": 250.5, "tipo": "receita", "categoria": "Ganho"}
+    novo_id = livro.adicionar(novo)
+    _consistente(livro)
+    livro.adicionar_varios([dict(novo, valor=-10.01, tipo="despesa", categoria="Gasto")] * 3)
+    _consistente(livro)
+    assert livro.remover(novo_id)
+    assert not livro.remover(novo_id)
+    for lancamento_id in livro.carregar(limite=5).index:
+        livro.remover(lancamento_id)
+    _consistente(livro)
+
+    # outra instância (outra conexão) enxerga as alterações
+    outra = LivroLancamentos(livro.caminho)
+    assert outra.totais() == livro.totais()
+    outra.fechar()
+
+    livro.limpar()
+    _consistente(livro)
+    assert livro.totais() == {"gasto": 0.0, "ganho": 0.0, "receita": 0.0, "despesa": 0.0}
+    assert livro.cubo().empty
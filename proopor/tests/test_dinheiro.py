@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dinheiro import centavos, reais
+from faixas import FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO
+from folha_lote import calcular_folha_lote
+from livro_lancamentos import LivroLancamentos
+from src.processing import money
+
+
+def test_centavos_arredonda_meio_centavo_para_longe_do_zero():
+    assert centavos(1.005) == 101
+    assert centavos(-1.005) == -101
+    assert centavos(0.125) == 13
+
+
+def test_money_do_fms_segue_a_mesma_politica():
+    valores = np.array([0.0, 0.005, -0.005, 1.005, -2.675, 1234.565, 0.1 + 0.2, 1e9 + 0.015])
+    assert (money.to_cents(valores) == centavos(valores)).all()
+    assert money.to_cents(1.005) == centavos(1.005)
+    assert (money.from_cents(centavos(valores)) == reais(centavos(valores))).all()
+
+
+def test_valor_ausente_ou_nao_finito_gera_erro():
+    for valor in (np.nan, None, np.inf, np.array([1.0, np.nan]), np.array([-np.inf])):
+        with pytest.raises(ValueError):
+            centavos(valor)
+        with pytest.raises(ValueError):
+            money.to_cents(valor)
+
+
+def test_nan_nao_vira_int64_min_na_folha_nem_no_livro():
+    with pytest.raises(ValueError, match="salario_base"):
+        calcular_folha_lote(
+            pd.DataFrame({"salario_base": [3000.0, np.nan]}), FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO, 189.59, 8.0, 20.0
+        )
+
+    livro = LivroLancamentos(":memory:")
+    livro.adicionar({"data": "2024-01-10", "descrição": "ok", "valor": 50.0, "tipo": "receita"})
+    antes = livro.totais()
+    with pytest.raises(ValueError):
+        livro.adicionar({"data": "2024-01-11", "descrição": "vazio", "valor": np.nan, "tipo": "receita"})
+    with pytest.raises(ValueError):
+        livro.adicionar_varios([{"data": "2024-01-12", "descrição": "x", "valor": 1.0, "tipo": "despesa"},
+                                {"data": "2024-01-12", "descrição": "y", "valor": np.nan, "tipo": "despesa"}])
+    assert livro.totais() == antes
+    assert len(livro.carregar()) == 1
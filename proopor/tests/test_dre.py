@@ -0,0 +1,51 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from dinheiro import centavos
+from dre import montar_dre
+from src.processing.financial_processing import compute_dre
+
+LANCAMENTOS = pd.DataFrame({
+    "data": ["2024-01-05", "2024-01-20", "2024-02-02", "2024-02-10", "2024-02-11", "2024-03-01", "2024-03-02"],
+    "tipo": ["receita", " Receita", "DESPESA", "despesa", "Transferência", "despesa", "receita"],
+    "categoria": ["Vendas", "Vendas", "Impostos sobre vendas", "CMV", "Caixa", "Aluguel", "Serviços"],
+    "valor": [1500.00, 250.10, 120.35, 600.00, 999.99, 800.00, 300.05],
+})
+
+
+def _dre(lancamentos, **kwargs):
+    return montar_dre(lancamentos.assign(valor_centavos=centavos(lancamentos["valor"].to_numpy())), **kwargs)
+
+
+def test_tipo_normalizado_antes_de_classificar():
+    dre = _dre(LANCAMENTOS).set_index("Conta")["Total"]
+    assert dre["Receita Bruta"] == 2050.15
+    assert dre["Deduções da Receita"] == -120.35
+    assert dre["Custos"] == -600.00
+    assert dre["Despesas Operacionais"] == -800.00
+    assert dre["Resultado Operacional"] == 529.80
+
+
+def test_tipo_sem_grupo_gera_aviso(caplog):
+    lancamentos = LANCAMENTOS.assign(tipo=LANCAMENTOS["tipo"].replace({"despesa": "bonus"}))
+    with caplog.at_level(logging.WARNING, logger="eficicash"):
+        _dre(lancamentos)
+    assert "bonus" in caplog.text
+    assert "Transferência" not in caplog.text
+
+
+def test_compute_dre_do_fms_segue_a_hierarquia_de_montar_dre():
+    transacoes = pd.DataFrame({
+        "Date": pd.to_datetime(LANCAMENTOS["data"]),
+        "Type": LANCAMENTOS["tipo"],
+        "Category": LANCAMENTOS["categoria"],
+        "Amount": LANCAMENTOS["valor"],
+    })
+    for por_mes in (False, True):
+        esperado = _dre(LANCAMENTOS, por_mes=por_mes)
+        obtido = compute_dre(transacoes, by_month=por_mes)
+        assert obtido["Account"].tolist() == esperado["Conta"].tolist()
+        assert obtido["Level"].tolist() == esperado["Nível"].tolist()
+        assert np.array_equal(obtido.iloc[:, 2:].to_numpy(), esperado.iloc[:, 2:].to_numpy())
@@ -0,0 +1,17 @@
+import pytest
+
+from faixas import FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO, TabelaFaixas, carregar_tabela
+
+
+def test_tabela_vazia_e_invalida():
+    with pytest.raises(ValueError):
+        TabelaFaixas([])
+
+
+@pytest.mark.parametrize("padrao", [FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO])
+def test_json_vazio_usa_tabela_padrao(padrao):
+    tabela = carregar_tabela("[]", padrao)
+    esperada = TabelaFaixas(padrao)
+    assert tabela.chave == esperada.chave
+    assert tabela.inss(3500.0) == esperada.inss(3500.0)
+    assert tabela.irrf(3500.0) == esperada.irrf(3500.0)
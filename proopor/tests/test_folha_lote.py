@@ -0,0 +1,168 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dados_sinteticos import gerar_dataframe
+from faixas import FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO
+from folha import calc_holerite
+from folha_lote import (
+    CAMPOS_FOLHA, COLUNAS_RESULTADO, VT_PERCENT_PADRAO, calcular_folha_lote, contar_linhas_roster, ler_roster_em_blocos,
+    processar_roster, totais_folha, validar_roster,
+)
+
+PARAMETROS = (189.59, 8.0, 20.0)  # dedução por dependente, FGTS %, INSS patronal %
+
+
+def roster_variado(n=240, semente=7):
+    """Roster sintético com os casos de borda do formulário espalhados pelas linhas."""
+    df = gerar_dataframe("roster", n, semente)
+    i = np.arange(n)
+    # nenhuma forma de vale-transporte informada: vale o padrão do formulário
+    df.loc[i % 7 == 0, ["vale_transporte_percent", "vale_transporte_valor"]] = np.nan
+    # valor-hora informado, 0 (automático) ou vazio
+    df["valor_hora"] = np.select([i % 5 == 1, i % 5 == 2], [37.5, 0.0], np.nan)
+    df["horas_normais_mes"] = np.where(i % 11 == 3, 0.0, df["horas_normais_mes"])
+    df["possui_periculosidade"] = i % 4 == 0
+    df["possui_insalubridade"] = i % 6 == 0
+    df["insalubridade_percent"] = np.where(df["possui_insalubridade"], 20.0, df["insalubridade_percent"])
+    df["numero_dependentes"] = i % 4
+    df["pensao_alimenticia"] = np.where(i % 3 == 0, 450.55, 0.0)
+    df["faltas"] = i % 3
+    df["outros_proventos"] = np.where(i % 9 == 0, 123.45, 0.0)
+    return df
+
+
+def _inputs(registro):
+    """Linha do roster -> dicionário do formulário da aba "Folha de Pagamento"."""
+    inputs = {k: registro.get(k, v) for k, v in CAMPOS_FOLHA.items()}
+    vh = inputs["valor_hora"]
+    inputs["valor_hora"] = None if pd.isna(vh) or vh == 0 else float(vh)
+    pct, valor = inputs["vale_transporte_percent"], inputs["vale_transporte_valor"]
+    if pd.isna(pct) and pd.isna(valor):
+        pct = VT_PERCENT_PADRAO
+    inputs["vale_transporte_percent"] = None if pd.isna(pct) else float(pct)
+    inputs["vale_transporte_valor"] = None if not pd.isna(pct) else float(valor)
+    for campo in ("dias_uteis_mes", "numero_dependentes", "faltas", "atrasos_minutos"):
+        inputs[campo] = int(inputs[campo])
+    for campo in ("possui_periculosidade", "possui_insalubridade"):
+        inputs[campo] = bool(inputs[campo])
+    return inputs
+
+
+def _esperado(h):
+    prov = h["prov"]
+    return {
+        "valor_hora": h["det"]["valor_hora"],
+        "he50": h["det"]["he50"],
+        "he100": h["det"]["he100"],
+        "salario_bruto": h["salario_bruto"],
+        "inss": h["total_inss"],
+        "base_irrf": h["irrf_res"]["base"],
+        "irrf": h["irrf_res"]["irrf"],
+        "total_descontos": h["total_descontos"],
+        "salario_liquido": h["salario_liquido"],
+        "fgts": prov["fgts"],
+        "inss_patronal": prov["inss_patronal"],
+        "provision_13_mensal": prov["provision_13_mensal"],
+        "provision_ferias_mensal": prov["provision_ferias_mensal"],
+        "provision_ferias_1_3_mensal": prov["provision_ferias_1_3_mensal"],
+        "custo_total_empregador": h["custo_total_empregador"],
+    }
+
+
+def test_roster_cobre_os_casos_de_borda():
+    df = roster_variado()
+    assert (df["vale_transporte_percent"].isna() & df["vale_transporte_valor"].isna()).any()
+    assert (df["valor_hora"] == 0).any() and df["valor_hora"].isna().any()
+    assert (df["horas_normais_mes"] == 0).any()
+    assert df["possui_periculosidade"].any() and df["possui_insalubridade"].any()
+    assert (df["pensao_alimenticia"] > 0).any() and (df["numero_dependentes"] > 0).any()
+
+
+@pytest.mark.parametrize("semente", [7, 23])
+def test_lote_igual_ao_holerite_linha_a_linha(semente):
+    df = roster_variado(semente=semente)
+    lote = calcular_folha_lote(df, FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO, *PARAMETROS)
+    assert list(lote.index) == list(df.index)
+    for i, registro in zip(df.index, df.to_dict("records")):
+        esperado = _esperado(calc_holerite(_inputs(registro), FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO, *PARAMETROS))
+        obtido = {k: lote.at[i, k] for k in esperado}
+        assert obtido == esperado, f"linha {i}"
+
+
+# ---------------- Planilha de funcionários ----------------
+def test_validar_roster_conta_invalidos_por_coluna():
+    bloco = pd.DataFrame({
+        "salario_base": [3000.0, "", "abc", -5, 2000, 1800],
+        "horas_normais_mes": [220, 0, 220, 220, "x", None],
+        "faltas": ["1", 2, -1, 0, 0, None],
+    })
+    validos, contagem = validar_roster(bloco)
+    assert contagem == {"salario_base": 3, "horas_normais_mes": 2, "faltas": 1}
+    assert list(validos.index) == [0, 5]
+    assert validos["salario_base"].tolist() == [3000.0, 1800.0]
+    # vazio em coluna opcional não invalida a linha: vale o padrão do formulário
+    assert np.isnan(validos.at[5, "horas_normais_mes"])
+    assert calcular_folha_lote(validos, FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO, *PARAMETROS)["valor_hora"].tolist() == [
+        3000.0 / 220, 1800.0 / 220,
+    ]
+
+
+def test_validar_roster_sem_salario_base():
+    with pytest.raises(ValueError, match="salario_base"):
+        validar_roster(pd.DataFrame({"nome": ["Ana"]}))
+    validos, contagem = validar_roster(pd.DataFrame({"salario_base": [None, np.nan]}))
+    assert validos.empty and contagem == {"salario_base": 2}
+
+
+def _roster_com_invalidos():
+    df = gerar_dataframe("roster", 300, 5)
+    df["salario_base"] = df["salario_base"].astype(object)
+    df.loc[[3, 50], "salario_base"] = [None, "abc"]
+    df.loc[[7, 8, 9], "horas_normais_mes"] = 0.0
+    df.loc[200, "dias_uteis_mes"] = -1
+    return df
+
+
+def _xlsx(df):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(list(df.columns))
+    for linha in df.itertuples(index=False, name=None):
+        ws.append([None if pd.isna(v) else (v.item() if isinstance(v, np.generic) else v) for v in linha])
+    arq = io.BytesIO()
+    wb.save(arq)
+    return arq
+
+
+@pytest.mark.parametrize("formato", ["csv", "xlsx"])
+def test_processar_roster_em_blocos_igual_ao_calculo_unico(formato):
+    df = _roster_com_invalidos()
+    if formato == "csv":
+        arq = io.BytesIO(df.to_csv(index=False, sep=";").encode("utf-8"))
+    else:
+        arq = _xlsx(df)
+    assert contar_linhas_roster(arq, f"roster.{formato}") == len(df)
+    lidas = []
+    resultado, avisos = processar_roster(
+        ler_roster_em_blocos(arq, f"roster.{formato}", tamanho_bloco=37),
+        FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO, *PARAMETROS, progresso=lidas.append,
+    )
+    assert lidas[-1] == len(df) and len(lidas) == -(-len(df) // 37)
+    assert sorted(avisos) == [
+        "dias_uteis_mes: 1 linha(s) com valor inválido foram ignoradas",
+        "horas_normais_mes: 3 linha(s) com valor inválido foram ignoradas",
+        "salario_base: 2 linha(s) com valor inválido foram ignoradas",
+    ]
+
+    validos, _ = validar_roster(df)
+    esperado = calcular_folha_lote(validos, FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO, *PARAMETROS)
+    assert resultado["matricula"].tolist() == validos["matricula"].tolist()
+    assert resultado["salario_base"].tolist() == validos["salario_base"].tolist()
+    for col in COLUNAS_RESULTADO:
+        assert resultado[col].tolist() == esperado[col].tolist(), col
+    assert totais_folha(resultado).equals(totais_folha(esperado))
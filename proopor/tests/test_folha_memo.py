@@ -0,0 +1,104 @@
+import pandas as pd
+
+from dados_sinteticos import gerar_dataframe
+from faixas import FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO
+from folha import calc_holerite
+from folha_lote import calcular_folha_lote
+from folha_memo import MemoFolha
+
+PARAMETROS = (189.59, 8.0, 20.0)  # dedução por dependente, FGTS %, INSS patronal %
+ETAPAS = ["proventos", "inss", "irrf", "descontos", "provisoes"]
+
+FORMULARIO = {
+    "salario_base": 4200.0, "dias_uteis_mes": 30, "horas_normais_mes": 220.0, "horas_extra_50": 5.0,
+    "horas_extra_100": 0.0, "valor_hora": None, "horas_noturnas": 0.0, "adicional_noturno_percent": 20.0,
+    "possui_periculosidade": True, "periculosidade_percent": 30.0, "possui_insalubridade": False,
+    "insalubridade_percent": 0.0, "numero_dependentes": 2, "pensao_alimenticia": 300.0,
+    "vale_transporte_percent": 6.0, "vale_transporte_valor": None, "vale_refeicao": 0.0, "faltas": 0,
+    "atrasos_minutos": 0, "outros_proventos": 0.0,
+}
+
+
+def _irrf_alternativo():
+    tabela = [dict(f) for f in FAIXAS_IRRF_PADRAO]
+    tabela[0]["max"], tabela[1]["min"] = 2259.20, 2259.21
+    return tabela
+
+
+def _calculadas(memo, antes):
+    """Etapas recalculadas desde `antes` (cópia de memo.calculos)."""
+    return {e: memo.calculos.get(e, 0) - antes.get(e, 0) for e in memo.calculos if memo.calculos.get(e, 0) != antes.get(e, 0)}
+
+
+def test_holerite_recalcula_so_as_etapas_afetadas():
+    memo = MemoFolha()
+    irrf_nova = _irrf_alternativo()
+    passos = [
+        # (alteração, tabela IRRF, parâmetros, etapas recalculadas)
+        ({}, FAIXAS_IRRF_PADRAO, PARAMETROS, set(ETAPAS)),
+        ({}, FAIXAS_IRRF_PADRAO, PARAMETROS, set()),
+        ({}, FAIXAS_IRRF_PADRAO, (189.59, 8.5, 20.0), {"provisoes"}),
+        ({"faltas": 2}, FAIXAS_IRRF_PADRAO, (189.59, 8.5, 20.0), {"descontos"}),
+        ({"faltas": 2}, irrf_nova, (189.59, 8.5, 20.0), {"irrf", "descontos"}),
+        ({"faltas": 2, "horas_extra_50": 8.0}, irrf_nova, (189.59, 8.5, 20.0), set(ETAPAS)),
+        ({"faltas": 2, "numero_dependentes": 0}, irrf_nova, (189.59, 8.5, 20.0), {"irrf", "descontos"}),
+    ]
+    for alteracao, irrf, parametros, esperadas in passos:
+        inputs = dict(FORMULARIO, **alteracao)
+        antes = dict(memo.calculos)
+        obtido = memo.holerite(inputs, FAIXAS_INSS_PADRAO, irrf, *parametros)
+        assert obtido == calc_holerite(inputs, FAIXAS_INSS_PADRAO, irrf, *parametros), alteracao
+        assert set(_calculadas(memo, antes)) == esperadas, alteracao
+
+
+def test_holerite_volta_ao_cache_ao_desfazer_a_alteracao():
+    memo = MemoFolha()
+    memo.holerite(FORMULARIO, FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO, *PARAMETROS)
+    memo.holerite(dict(FORMULARIO, faltas=1), FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO, *PARAMETROS)
+    antes = dict(memo.calculos)
+    memo.holerite(FORMULARIO, FAIXAS_INSS_PADRAO, FAIXAS_IRRF_PADRAO, *PARAMETROS)
+    assert memo.calculos == antes
+
+
+def _confere_lote(memo, roster, irrf=FAIXAS_IRRF_PADRAO, parametros=PARAMETROS):
+    antes = dict(memo.calculos)
+    obtido = memo.folha_lote(roster, FAIXAS_INSS_PADRAO, irrf, *parametros)
+    pd.testing.assert_frame_equal(obtido, calcular_folha_lote(roster, FAIXAS_INSS_PADRAO, irrf, *parametros))
+    return _calculadas(memo, antes)
+
+
+def test_folha_lote_calcula_so_as_linhas_novas_ou_alteradas():
+    memo = MemoFolha()
+    roster = gerar_dataframe("roster", 500, 11)
+    assert _confere_lote(memo, roster) == {"base": 500, "encargos": 500}
+    assert _confere_lote(memo, roster) == {}
+
+    # edição parcial: 3 funcionários alterados
+    editado = roster.copy()
+    editado.loc[[4, 120, 333], "horas_extra_50"] += 2.0
+    assert _confere_lote(memo, editado) == {"base": 3, "encargos": 3}
+
+    # parâmetros novos: a base volta do cache, os encargos são recalculados
+    assert _confere_lote(memo, editado, parametros=(189.59, 8.0, 22.0)) == {"encargos": 500}
+    assert _confere_lote(memo, editado, irrf=_irrf_alternativo()) == {"encargos": 500}
+    assert _confere_lote(memo, editado) == {}
+
+    # outra ordem das linhas (o índice acompanha) e linhas repetidas
+    embaralhado = editado.sample(frac=1.0, random_state=1)
+    assert _confere_lote(memo, embaralhado) == {}
+    repetido = pd.concat([editado, editado.iloc[:10]], ignore_index=True)
+    assert _confere_lote(memo, repetido) == {}
+
+    # funcionário novo repetido: calculado uma vez por ocorrência nova, guardado uma vez
+    novo = editado.iloc[[0, 0]].assign(salario_base=9999.99)
+    com_novos = pd.concat([editado, novo], ignore_index=True)
+    assert _confere_lote(memo, com_novos) == {"base": 2, "encargos": 2}
+    assert _confere_lote(memo, com_novos) == {}
+
+
+def test_folha_lote_colunas_diferentes_nao_se_misturam():
+    memo = MemoFolha()
+    roster = gerar_dataframe("roster", 50, 2)
+    _confere_lote(memo, roster)
+    sem_vt = roster.drop(columns=["vale_transporte_percent", "vale_transporte_valor"])
+    assert _confere_lote(memo, sem_vt) == {"base": 50, "encargos": 50}
@@ -0,0 +1,9 @@
+import math
+
+from holerite_pdf import _identificacao, _nome_arquivo
+
+
+def test_campos_vazios_ficam_fora_da_identificacao():
+    reg = {"matricula": 7, "nome": math.nan, "cpf": None, "cargo": "Analista"}
+    assert _identificacao(reg) == "Matricula: 7  | Cargo: Analista"
+    assert _nome_arquivo(reg, 3) == "holerite_000003_7.pdf"